@@ -152,3 +152,79 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")  # Directory for collected static files
 
+
+# Trained price model versions (see `manage.py train_model`)
+MODEL_REGISTRY_DIR = os.path.join(BASE_DIR, 'model_registry')
+# Seconds between checks of the registry for a newly activated model
+MODEL_RELOAD_CHECK_INTERVAL = 2.0
+# 'compiled' scores linear models with plain arithmetic; 'estimator' calls model.predict
+PREDICTION_MODE = 'compiled'
+# Largest number of records accepted by /api/predict/batch/
+PREDICTION_MAX_BATCH_SIZE = 5000
+# Rows read and scored at a time by CSV bulk scoring
+PREDICTION_CSV_CHUNK_SIZE = 10000
+# Largest upload accepted by /api/predict/csv/, in bytes
+PREDICTION_CSV_MAX_BYTES = 50 * 1024 * 1024
+# Tokens that let scripts call /api/predict/ as "Authorization: Bearer <token>";
+# logged-in users need none but send the CSRF token like any form
+PREDICTION_API_TOKENS = [token for token in os.environ.get('PREDICTION_API_TOKENS', '').split(',') if token]
+# Memoized single predictions. BACKEND 'local' is a per-worker LRU;
+# 'django' shares entries across workers through the cache ALIAS.
+PREDICTION_CACHE = {
+    'BACKEND': 'local',
+    'ALIAS': 'default',
+    'MAX_ENTRIES': 10000,
+    'TTL': 3600,
+}
+
+# Typed .npy column cache of the training CSV (see `manage.py build_dataset_cache`)
+DATASET_CACHE_DIR = os.path.join(BASE_DIR, 'dataset_cache')
+
+# Seconds to batch Property saves before folding them into the model (0 disables)
+MODEL_REFRESH_INTERVAL = 60
+# A refresh moving predictions by less than this fraction of the mean price publishes nothing yet
+MODEL_REFRESH_MIN_CHANGE = 0.001
+# Registry versions kept on disk; older ones (never the active one) are pruned on publish
+MODEL_REGISTRY_KEEP = 10
+# Seconds a worker batches listing changes and model swaps before
+# re-estimating stale Property.estimated_price values (0 disables)
+MODEL_REESTIMATE_INTERVAL = 120
+# 'export' serves linear models from their NumPy-only export.json; 'joblib' always unpickles
+PREDICTION_RUNTIME = 'export'
+# Served predictions are buffered per worker and written by a background
+# thread with bulk_create every BATCH_SIZE records or FLUSH_INTERVAL seconds.
+# A full buffer makes requests wait up to BLOCK_TIMEOUT seconds, then drops.
+PREDICTION_AUDIT = {
+    'ENABLED': True,
+    'MAX_BUFFER': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 2.0,
+    'BLOCK_TIMEOUT': 0.05,
+    # Record every row of a CSV scoring job rather than one summary line per job
+    'CSV_ROWS': False,
+}
+# Seconds the dashboard may serve cached counters; changes also invalidate them
+DASHBOARD_STATS_CACHE_TTL = 30
+# Show an approximate listing total (table statistics on MySQL, else a cached COUNT)
+PROPERTY_LISTING_SHOW_TOTAL = True
+# Seconds to keep listing facet counts; any Property change retires them sooner
+PROPERTY_FACET_CACHE_TTL = 600
+# Ranked matches shown for a listing search (?q=)
+PROPERTY_SEARCH_RESULTS = 45
+# Comparable listings shown on detail and prediction pages, and how often
+# (seconds) a worker may rebuild its nearest-neighbour index after changes
+SIMILAR_HOMES_COUNT = 4
+SIMILAR_HOMES_REBUILD_INTERVAL = 300
+# Seconds rendered listing/detail pages and individual listing cards stay
+# cached; Property saves and deletes invalidate the affected entries sooner
+PROPERTY_PAGE_CACHE_TTL = 300
+PROPERTY_CARD_CACHE_TTL = 3600
+
+# Resized copies of Property.image / profile_pic uploads for srcset
+# (price_page/images.py); BACKGROUND=False generates them inline
+IMAGE_VARIANTS = {
+    'WIDTHS': (320, 640, 1280),
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': 80,
+    'BACKGROUND': True,
+}
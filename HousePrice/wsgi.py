@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'HousePrice.settings')
 
 application = get_wsgi_application()
+
+# Load the active price model once per worker at boot instead of on first request
+from HousePricePrediction import registry  # noqa: E402
+from HousePricePrediction.model_cache import holder  # noqa: E402
+
+try:
+    holder.get()
+except registry.ModelNotFound as e:
+    import logging
+    logging.getLogger(__name__).warning("%s", e)
@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import PredictionLog
+
+
+@admin.register(PredictionLog)
+class PredictionLogAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'predicted_price', 'model_version', 'latency_ms', 'source')
+    list_filter = ('source', 'model_version')
+    date_hierarchy = 'created_at'
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class HousepricepredictionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'HousePricePrediction'  # must match folder name exactly
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,206 @@
+"""
+Asynchronous, batched audit log of served predictions.
+
+Request handlers only append the scored rows to a bounded in-process
+buffer; a daemon thread builds PredictionLog rows from it and writes
+them with bulk_create once BATCH_SIZE records are waiting or
+FLUSH_INTERVAL seconds have passed, whichever comes first. When the
+buffer is full, a request waits up to BLOCK_TIMEOUT for room
+(backpressure) and then drops what does not fit, counting it, rather
+than stall the response. Whatever is still buffered is
+written at interpreter exit, so a worker that shuts down cleanly loses
+nothing. Configured by settings.PREDICTION_AUDIT.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.dispatch import Signal
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Sent after each bulk write with count=<rows written> and interactive=<how many of
+# them were not from BULK_SOURCES>; bulk_create sends no post_save
+predictions_logged = Signal()
+
+# Sources that score files rather than serve users; kept out of the prediction counter
+BULK_SOURCES = ('csv',)
+
+
+class AuditLog:
+
+    def __init__(self, max_buffer=10000, batch_size=500, flush_interval=2.0, block_timeout=0.05,
+                 enabled=True, background=True):
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.enabled = enabled
+        self.background = background
+
+        # Chunks of (rows, prices, model_version, latency_ms, source, created_at);
+        # the bound is on buffered records, so one batch request is one chunk
+        self._chunks = deque()
+        self._buffered = 0
+        self._space = threading.Condition()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def _ensure_flusher(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if not self.background or (self._thread is not None and self._pid == os.getpid()):
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='prediction-audit', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                # This thread's connection lives for the worker; drop it if the server closed it
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("Prediction audit flush failed")
+
+    def record(self, features, predicted_price, model_version, latency_ms, source):
+        """Queue one prediction; returns False if it was dropped because the buffer stayed full"""
+        return self.record_many([features], [predicted_price], model_version, latency_ms, source) == 1
+
+    def record_many(self, rows, prices, model_version, latency_ms, source):
+        """
+        Queue a scored batch (latency_ms is the per-row share) and return
+        how many rows were accepted. Rows that do not fit once
+        BLOCK_TIMEOUT has passed are dropped.
+        """
+        if not self.enabled or not len(rows):
+            return 0
+        self._ensure_flusher()
+        count = len(rows)
+
+        with self._space:
+            deadline = time.monotonic() + self.block_timeout
+            while self._buffered + count > self.max_buffer:
+                self._wake.set()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._space.wait(remaining):
+                    break
+            accepted = min(count, self.max_buffer - self._buffered)
+            if accepted > 0:
+                self._chunks.append((
+                    rows[:accepted], prices[:accepted], model_version, latency_ms, source, timezone.now(),
+                ))
+                self._buffered += accepted
+            accepted = max(accepted, 0)
+            buffered = self._buffered
+            self.recorded += accepted
+            self.dropped += count - accepted
+
+        if buffered >= self.batch_size:
+            self._wake.set()
+        return accepted
+
+    def _take(self):
+        with self._space:
+            chunks, self._chunks = self._chunks, deque()
+            self._buffered = 0
+            self._space.notify_all()
+        return chunks
+
+    def flush(self):
+        """Write everything buffered so far in bulk_create batches; returns the number written"""
+        from .models import PredictionLog
+
+        written = 0
+        with self._flush_lock:
+            entries = [
+                PredictionLog(
+                    bedrooms=bedrooms, bathrooms=bathrooms, stories=stories, area=area,
+                    guestroom=guestroom, parking=parking, predicted_price=float(price),
+                    model_version=version, latency_ms=latency_ms, source=source, created_at=created_at,
+                )
+                for rows, prices, version, latency_ms, source, created_at in self._take()
+                for (bedrooms, bathrooms, stories, area, guestroom, parking), price
+                in zip(np.asarray(rows, dtype=np.float64).tolist(), prices)
+            ]
+            for start in range(0, len(entries), self.batch_size):
+                batch = entries[start:start + self.batch_size]
+                try:
+                    PredictionLog.objects.bulk_create(batch)
+                except DatabaseError as e:
+                    # Not re-queued: a persistent error would otherwise pin the buffer full
+                    self.failed += len(batch)
+                    logger.error("Dropped %d prediction audit records: %s", len(batch), e)
+                    continue
+                written += len(batch)
+                self.flushes += 1
+                predictions_logged.send(
+                    sender=PredictionLog, count=len(batch),
+                    interactive=sum(1 for entry in batch if entry.source not in BULK_SOURCES),
+                )
+        self.written += written
+        return written
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'buffered': self._buffered,
+            'recorded': self.recorded,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'flushes': self.flushes,
+        }
+
+
+def build_audit_log():
+    config = getattr(settings, 'PREDICTION_AUDIT', {})
+    return AuditLog(
+        max_buffer=config.get('MAX_BUFFER', 10000),
+        batch_size=config.get('BATCH_SIZE', 500),
+        flush_interval=config.get('FLUSH_INTERVAL', 2.0),
+        block_timeout=config.get('BLOCK_TIMEOUT', 0.05),
+        enabled=config.get('ENABLED', True),
+    )
+
+
+_audit_log = None
+_audit_lock = threading.Lock()
+
+
+def get_audit_log():
+    global _audit_log
+    if _audit_log is None:
+        with _audit_lock:
+            if _audit_log is None:
+                _audit_log = build_audit_log()
+                atexit.register(_flush_at_exit, _audit_log)
+    return _audit_log
+
+
+def _flush_at_exit(audit_log):
+    try:
+        audit_log.flush()
+    except Exception:
+        logger.exception("Prediction audit flush at exit failed")
@@ -0,0 +1,94 @@
+"""
+Column-wise validation and vectorized scoring for many houses at once.
+"""
+import numpy as np
+
+from .features import FLAG_FEATURES, FLAG_WORDS, RAW_FEATURES
+
+
+def _to_number(value, is_flag):
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if is_flag and text in FLAG_WORDS:
+            return FLAG_WORDS[text]
+        try:
+            return float(text)
+        except ValueError:
+            return np.nan
+    return np.nan
+
+
+def validate_records(records):
+    """
+    Validate a list of feature dicts one column at a time.
+
+    Returns (rows, errors): rows is an (n, 6) int64 array in RAW_FEATURES
+    order and errors maps row index -> message for rows that must not be
+    scored.
+    """
+    count = len(records)
+    rows = np.zeros((count, len(RAW_FEATURES)), dtype=np.int64)
+    errors = {}
+
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors[index] = "record must be an object"
+
+    for col, name in enumerate(RAW_FEATURES):
+        is_flag = name in FLAG_FEATURES
+        column = np.array(
+            [_to_number(r.get(name), is_flag) if isinstance(r, dict) else 0.0 for r in records],
+            dtype=np.float64,
+        )
+
+        # 'inf' and 'nan' parse as floats (and JSON allows Infinity/NaN); neither is a feature value
+        finite = np.isfinite(column)
+        column = np.where(finite, column, 0.0)
+        checks = [
+            (~finite, f"{name} is missing or not a number"),
+            (column != np.floor(column), f"{name} must be an integer"),
+            (column < 0, f"{name} must not be negative"),
+        ]
+        if is_flag:
+            checks.append((column > 1, f"{name} must be 0 or 1"))
+
+        for mask, message in checks:
+            for index in np.flatnonzero(mask):
+                errors.setdefault(int(index), message)
+
+        rows[:, col] = column.astype(np.int64)
+
+    return rows, errors
+
+
+def score_rows(loaded, rows):
+    """Score validated raw rows with a single predict call"""
+    if len(rows) == 0:
+        return np.zeros(0)
+    if loaded.predictor is not None:
+        return loaded.predictor.predict_many(rows)
+    return loaded.model.predict(loaded.encoder.transform_rows(rows))
+
+
+def predict_records(loaded, records, on_scored=None):
+    """
+    Validate and score records, returning one result dict per input record.
+
+    `on_scored(rows, prices)` is called with the valid raw rows and their
+    predictions, e.g. to audit them.
+    """
+    rows, errors = validate_records(records)
+    valid = np.array([i not in errors for i in range(len(records))], dtype=bool)
+    prices = score_rows(loaded, rows[valid])
+    if on_scored is not None:
+        on_scored(rows[valid], prices)
+
+    results = [{'index': i, 'price': None, 'error': message} for i, message in sorted(errors.items())]
+    for index, price in zip(np.flatnonzero(valid), prices):
+        results.append({'index': int(index), 'price': round(float(price), 2), 'error': None})
+    results.sort(key=lambda item: item['index'])
+    return results
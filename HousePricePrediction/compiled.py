@@ -0,0 +1,47 @@
+"""
+Compiled scoring for linear price models.
+
+A fitted LinearRegression is just ``intercept_ + coef_ . x``. Rather than
+building a DataFrame and encoding a single row on every request, the
+coefficients are bound to the encoder's frozen column order once and each
+request is scored with plain arithmetic.
+"""
+import numpy as np
+
+from .features import RAW_FEATURES
+
+
+class CompiledPredictor:
+
+    def __init__(self, coef, intercept, encoder):
+        self.feature_columns = encoder.output_columns
+        self.intercept = float(intercept)
+
+        sources = encoder.source_index
+        self.terms = tuple(
+            (sources[column], float(weight))
+            for column, weight in zip(self.feature_columns, coef)
+        )
+        self.weights = np.zeros(len(RAW_FEATURES))
+        for index, weight in self.terms:
+            self.weights[index] += weight
+
+    @classmethod
+    def from_estimator(cls, model, encoder):
+        """Build from a fitted linear estimator, or return None if it is not linear"""
+        coef = getattr(model, 'coef_', None)
+        intercept = getattr(model, 'intercept_', None)
+        if coef is None or intercept is None or np.ndim(coef) != 1:
+            return None
+        return cls(coef, intercept, encoder)
+
+    def predict_one(self, features):
+        """Score one validated feature tuple"""
+        total = self.intercept
+        for index, weight in self.terms:
+            total += weight * features[index]
+        return total
+
+    def predict_many(self, rows):
+        """Score an (n, 6) array of raw feature rows in one matrix-vector product"""
+        return np.asarray(rows, dtype=np.float64) @ self.weights + self.intercept
@@ -0,0 +1,207 @@
+"""
+Typed, columnar cache of the training CSV.
+
+The CSV is parsed once and every column is written to its own ``.npy``
+file with a compact dtype (small counts as uint8, yes/no flags as uint8
+0/1). Later loads memory-map those files instead of re-parsing text.
+The cache is rebuilt automatically when the source file changes. A
+build is written to a staging directory and renamed into place, so a
+crash or a concurrent build never leaves a half-written cache behind.
+Free-text columns have no numeric form: a known Housing.csv column
+holding text is an error, any other is left out and listed in the
+manifest under 'skipped'.
+
+    <DATASET_CACHE_DIR>/<csv stem>-<path hash>/
+        manifest.json
+        price.npy, area.npy, bedrooms.npy, ...
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+
+import numpy as np
+from django.conf import settings
+
+from .features import FLAG_WORDS
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+# Bumped whenever the stored columns or dtypes change, so caches built by older code are rebuilt
+CACHE_FORMAT = 3
+
+# Narrowest dtype each Housing.csv column is stored as; widened automatically
+# if the data does not fit. A column with gaps is stored as float32 if its
+# values fit 16 bits (float32 holds those exactly), otherwise as float64, so
+# prices and areas are never rounded.
+COLUMN_DTYPES = {
+    'price': 'int64',
+    'area': 'uint32',
+    'bedrooms': 'uint8',
+    'bathrooms': 'uint8',
+    'stories': 'uint8',
+    'mainroad': 'uint8',
+    'guestroom': 'uint8',
+    'parking': 'uint8',
+}
+FLAG_COLUMNS = ('mainroad', 'guestroom', 'parking')
+
+
+def cache_root():
+    return str(getattr(settings, 'DATASET_CACHE_DIR', os.path.join(settings.BASE_DIR, 'dataset_cache')))
+
+
+def cache_dir_for(csv_path):
+    csv_path = os.path.abspath(csv_path)
+    digest = hashlib.sha1(csv_path.encode()).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_root(), f"{stem}-{digest}")
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _compact(values, target):
+    """Downcast a float column to `target`, widening only if needed"""
+    dtype = np.dtype(target)
+    if np.isnan(values).any():
+        exact = dtype.kind in 'iu' and dtype.itemsize <= 2 and np.nanmax(np.abs(values), initial=0) < 2 ** 16
+        return values.astype('float32' if exact else 'float64')
+    if dtype.kind in 'iu' and len(values):
+        if (values != np.floor(values)).any():
+            return values
+        low, high = int(values.min()), int(values.max())
+        dtype = np.promote_types(dtype, np.result_type(np.min_scalar_type(low), np.min_scalar_type(high)))
+    return values.astype(dtype)
+
+
+def read_csv_frame(csv_path):
+    """The pandas parse the cache replaces (default dtypes, normalised headers)"""
+    import pandas as pd
+
+    frame = pd.read_csv(csv_path)
+    frame.columns = frame.columns.str.strip().str.lower()
+    return frame
+
+
+def _column_values(name, series):
+    """A column as float64 with NaN gaps, or None if it holds free text"""
+    import pandas as pd
+
+    if name not in FLAG_COLUMNS and pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype='float64', na_value=np.nan)
+    words = {str(v).strip().lower() for v in series if isinstance(v, str) and v.strip()}
+    if name not in FLAG_COLUMNS and not words <= FLAG_WORDS.keys():
+        return None
+    # In a flag column an unknown word is one bad value, not a reason to drop the column
+    return np.array(
+        [FLAG_WORDS.get(v.strip().lower(), np.nan) if isinstance(v, str) else float(v) for v in series],
+        dtype='float64',
+    )
+
+
+def _replace_dir(staging, directory):
+    """Move a finished build to `directory`, retiring any cache already there"""
+    retired = f"{directory}.retired-{uuid.uuid4().hex}"
+    try:
+        os.replace(directory, retired)
+    except FileNotFoundError:
+        retired = None
+    try:
+        os.replace(staging, directory)
+    except OSError:
+        # A concurrent build moved in first; it read the same source, so keep it
+        shutil.rmtree(staging, ignore_errors=True)
+    if retired is not None:
+        shutil.rmtree(retired, ignore_errors=True)
+
+
+def build_cache(csv_path):
+    """Parse the CSV once and write one .npy file per column"""
+    frame = read_csv_frame(csv_path)
+    directory = cache_dir_for(csv_path)
+    os.makedirs(cache_root(), exist_ok=True)
+    staging = tempfile.mkdtemp(dir=cache_root(), prefix='.build-')
+
+    try:
+        columns, skipped = {}, []
+        for name in frame.columns:
+            values = _column_values(name, frame[name])
+            if values is None:
+                if name in COLUMN_DTYPES:
+                    raise ValueError(f"{csv_path}: column '{name}' must be numeric or yes/no, found text")
+                skipped.append(name)
+                continue
+            array = _compact(values, COLUMN_DTYPES.get(name, 'float64'))
+            np.save(os.path.join(staging, f"{name}.npy"), array)
+            columns[name] = str(array.dtype)
+        if skipped:
+            logger.warning("Dataset cache of %s leaves out free-text columns: %s", csv_path, ', '.join(skipped))
+
+        manifest = {
+            'format': CACHE_FORMAT,
+            'source': _source_signature(csv_path),
+            'rows': int(len(frame)),
+            'columns': columns,
+            'skipped': skipped,
+            'bytes': sum(os.path.getsize(os.path.join(staging, f"{name}.npy")) for name in columns),
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as fh:
+            json.dump(manifest, fh, indent=2)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _replace_dir(staging, directory)
+    return manifest
+
+
+def ensure_cache(csv_path):
+    """Return the manifest, rebuilding the cache if the CSV changed since it was built"""
+    try:
+        with open(os.path.join(cache_dir_for(csv_path), MANIFEST_FILE)) as fh:
+            manifest = json.load(fh)
+        if manifest.get('format') == CACHE_FORMAT and manifest['source'] == _source_signature(csv_path):
+            return manifest
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    return build_cache(csv_path)
+
+
+def load_columns(csv_path, mmap=True):
+    """Return {column: array}, memory-mapped from the cache by default"""
+    manifest = ensure_cache(csv_path)
+    directory = cache_dir_for(csv_path)
+    mode = 'r' if mmap else None
+    return {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+        for name in manifest['columns']
+    }
+
+
+def load_frame(csv_path, columns=None):
+    """DataFrame view of the cached columns for code that needs pandas"""
+    import pandas as pd
+
+    arrays = load_columns(csv_path)
+    names = columns or list(arrays)
+    return pd.DataFrame({name: arrays[name] for name in names}, copy=False)
+
+
+def memory_report(csv_path):
+    """Bytes used by a default pandas parse versus the typed columnar cache"""
+    frame = read_csv_frame(csv_path)
+    arrays = load_columns(csv_path)
+    return {
+        'rows': int(len(frame)),
+        'csv_bytes': os.path.getsize(csv_path),
+        'pandas_bytes': int(frame.memory_usage(deep=True, index=False).sum()),
+        'cache_bytes': int(sum(array.nbytes for array in arrays.values())),
+        'dtypes_before': {name: str(dtype) for name, dtype in frame.dtypes.items()},
+        'dtypes_after': {name: str(array.dtype) for name, array in arrays.items()},
+    }
@@ -0,0 +1,166 @@
+"""
+Batch re-estimation of every price_page Property with the active model.
+
+Listings are read with .iterator(chunk_size) as narrow values() rows.
+Each row's model inputs are hashed and compared with the hash and model
+version stored with its last estimate, so only rows whose features or
+model version changed are scored. Each chunk of those is scored with a
+single vectorized predict. The estimates are written back with
+bulk_update, which leaves updated_at alone, so re-estimation never looks
+like a listing edit to refresh.py.
+
+Listing saves and model swaps only schedule a run, as does a worker's
+first model load; that run first checks whether any listing carries
+another version, so loading a model never waits on the database. A scheduled run
+starts at most once every MODEL_REESTIMATE_INTERVAL seconds per worker,
+or from `manage.py reestimate_properties`. Passes hold a registry lock,
+so workers reacting to the same swap run one after another. Each pass
+after the first finds the rows current and scores nothing.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import registry
+from .batch import score_rows
+from .model_cache import holder
+from .refresh import property_features
+
+logger = logging.getLogger(__name__)
+
+FEATURE_FIELDS = ('bedrooms', 'bathrooms', 'area', 'parking')
+
+
+def estimate_inputs(row):
+    """Short hash of the features a values() row is scored from"""
+    key = '|'.join(str(row[name]) for name in FEATURE_FIELDS)
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def _write_estimates(loaded, rows):
+    """Score one chunk with a single predict and store the results; returns the changed slugs"""
+    from price_page.models import Property
+
+    raw = np.array([property_features(row) for row in rows], dtype=np.float64)
+    # Stories and guestroom are not listed; the encoder fills them like any other gap
+    prices = score_rows(loaded, loaded.encoder.transform_rows(raw))
+    estimates = [
+        Property(pk=row['pk'], estimated_price=round(float(price), 2), estimate_inputs=row['inputs'])
+        for row, price in zip(rows, prices)
+    ]
+    # bulk_update builds a CASE per row and field; the values shared by the chunk go in one plain UPDATE
+    with transaction.atomic():
+        Property.objects.bulk_update(estimates, ['estimated_price', 'estimate_inputs'], batch_size=500)
+        Property.objects.filter(pk__in=[row['pk'] for row in rows]).update(
+            model_version=loaded.version, estimated_at=timezone.now(),
+        )
+    return [row['slug'] for row in rows]
+
+
+def has_stale_estimates(version):
+    """Whether any listing's estimate is missing or from a version other than `version`"""
+    from price_page.models import Property
+
+    return Property.objects.exclude(model_version=version).exists()
+
+
+def reestimate_properties(loaded=None, chunk_size=2000, force=False):
+    """
+    Bring every listing's estimate up to date with `loaded` (default: the
+    active model); `force` re-scores rows that look current too.
+    """
+    with registry.lock(registry.REESTIMATE_LOCK_FILE):
+        return _reestimate(loaded, chunk_size, force)
+
+
+def _reestimate(loaded, chunk_size, force):
+    from price_page.facets import bump_generation
+    from price_page.models import Property
+
+    loaded = loaded or holder.get()
+    started = time.perf_counter()
+    scanned = 0
+    slugs = []
+    # One bulk_update per chunk, not one long transaction holding every row it touched
+    listings = Property.objects.order_by('pk').values(
+        'pk', 'slug', 'model_version', 'estimate_inputs', *FEATURE_FIELDS,
+    )
+    pending = []
+    for row in listings.iterator(chunk_size=chunk_size):
+        scanned += 1
+        row['inputs'] = estimate_inputs(row)
+        if force or row['model_version'] != loaded.version or row['estimate_inputs'] != row['inputs']:
+            pending.append(row)
+        if len(pending) >= chunk_size:
+            slugs += _write_estimates(loaded, pending)
+            pending = []
+    if pending:
+        slugs += _write_estimates(loaded, pending)
+
+    if slugs:
+        # bulk_update sends no post_save: retire the cached listings here. Detail pages and
+        # cards are keyed by estimated_at, which the update above already moved
+        transaction.on_commit(bump_generation)
+
+    return {
+        'version': loaded.version,
+        'scanned': scanned,
+        'rescored': len(slugs),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def scheduled_pass(scan_required=True, loaded=None):
+    """
+    What a scheduled run does: re-estimate, unless it was only asked to
+    check for stale estimates and there are none. Returns the
+    reestimate_properties() summary, or None if it skipped.
+    """
+    loaded = loaded or holder.get()
+    if not scan_required and not has_stale_estimates(loaded.version):
+        return None
+    return reestimate_properties(loaded)
+
+
+_timer = None
+_timer_lock = threading.Lock()
+_scan_required = False
+
+
+def schedule_reestimate(only_if_stale=False):
+    """
+    Run reestimate_properties once after MODEL_REESTIMATE_INTERVAL seconds,
+    batching all triggers until then. If every trigger passed
+    `only_if_stale`, the run first checks has_stale_estimates and skips
+    the scan when nothing is stale.
+    """
+    global _timer, _scan_required
+    interval = getattr(settings, 'MODEL_REESTIMATE_INTERVAL', 120)
+    if not interval:
+        return
+    with _timer_lock:
+        _scan_required = _scan_required or not only_if_stale
+        if _timer is not None:
+            return
+        _timer = threading.Timer(interval, _run_scheduled)
+        _timer.daemon = True
+        _timer.start()
+
+
+def _run_scheduled():
+    global _timer, _scan_required
+    with _timer_lock:
+        _timer = None
+        scan_required, _scan_required = _scan_required, False
+    try:
+        scheduled_pass(scan_required)
+    except Exception:
+        logger.exception("Scheduled re-estimation failed")
+    finally:
+        connections.close_all()  # this thread's connections only
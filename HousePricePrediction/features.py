@@ -0,0 +1,160 @@
+"""
+Feature encoding shared by training and serving.
+
+The encoder is fitted once on the training frame and stored next to the
+model in the registry (encoder.json). It declares the input schema,
+fills missing values with the training means and turns the yes/no
+columns into 0/1 ``<name>_yes`` columns in a fixed order. Serving
+applies the same transform instead of rebuilding dummies and realigning
+columns on every request.
+"""
+import json
+
+import numpy as np
+
+# Raw input columns, in the order of the validated feature tuple
+INPUT_SCHEMA = (
+    ('bedrooms', 'int'),
+    ('bathrooms', 'int'),
+    ('stories', 'int'),
+    ('area', 'int'),
+    ('guestroom', 'flag'),
+    ('parking', 'flag'),
+)
+RAW_FEATURES = tuple(name for name, _ in INPUT_SCHEMA)
+FLAG_FEATURES = tuple(name for name, kind in INPUT_SCHEMA if kind == 'flag')
+
+FLAG_WORDS = {'yes': 1.0, 'no': 0.0, 'true': 1.0, 'false': 0.0}
+OUTPUT_DTYPE = 'float64'
+
+
+def normalize_columns(frame):
+    """Strip and lowercase the headers (Housing.csv ships 'Parking')"""
+    frame = frame.copy()
+    frame.columns = frame.columns.str.strip().str.lower()
+    return frame
+
+
+def _parse_flag(value):
+    if isinstance(value, str) and value.strip().lower() in FLAG_WORDS:
+        return FLAG_WORDS[value.strip().lower()]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def normalize_features(bedrooms, bathrooms, stories, area, guestroom, parking):
+    """Validate raw form values and return them as a tuple of ints in RAW_FEATURES order"""
+    values = []
+    for name, value in zip(RAW_FEATURES, (bedrooms, bathrooms, stories, area, guestroom, parking)):
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be an integer")
+        if number < 0:
+            raise ValueError(f"{name} must not be negative")
+        if name in FLAG_FEATURES and number not in (0, 1):
+            raise ValueError(f"{name} must be 0 or 1")
+        values.append(number)
+    return tuple(values)
+
+
+class FeatureEncoder:
+
+    def __init__(self, fill_values=None):
+        self.set_fill_values(fill_values or {})
+
+    def set_fill_values(self, fill_values):
+        # Value used for a missing input, per raw column
+        self.fill_values = dict(fill_values)
+        self._fill = np.array([self.fill_values.get(name, 0.0) for name in RAW_FEATURES])
+
+    @property
+    def output_columns(self):
+        return [name if kind == 'int' else f'{name}_yes' for name, kind in INPUT_SCHEMA]
+
+    @property
+    def source_index(self):
+        """Output column -> position in the raw feature tuple"""
+        return {column: index for index, column in enumerate(self.output_columns)}
+
+    def raw_matrix(self, frame):
+        """Raw inputs as an (n, 6) float array in schema order, NaN where missing"""
+        frame = normalize_columns(frame)
+        missing = [name for name in RAW_FEATURES if name not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing input columns: {', '.join(missing)}")
+
+        matrix = np.empty((len(frame), len(INPUT_SCHEMA)), dtype=OUTPUT_DTYPE)
+        for index, (name, kind) in enumerate(INPUT_SCHEMA):
+            column = frame[name]
+            if column.dtype.kind in 'biuf':
+                matrix[:, index] = column.to_numpy(dtype=OUTPUT_DTYPE, na_value=np.nan)
+                continue
+
+            # Text flags: vectorised yes/no lookup, then a per-value pass over the leftovers
+            values = column.astype(str).str.strip().str.lower().map(FLAG_WORDS).to_numpy(dtype=OUTPUT_DTYPE, na_value=np.nan)
+            unknown = np.isnan(values)
+            if unknown.any():
+                values[unknown] = [_parse_flag(value) for value in column[unknown]]
+            matrix[:, index] = values
+        return matrix
+
+    def fit(self, frame):
+        """Learn the fill values from a raw training frame"""
+        matrix = self.raw_matrix(frame)
+        present = ~np.isnan(matrix)
+        return self.fit_from_sums(np.where(present, matrix, 0).sum(axis=0), present.sum(axis=0))
+
+    def fit_from_sums(self, sums, counts):
+        """Learn the fill values from per-column sums and non-missing counts (for chunked fits)"""
+        fill_values = {}
+        for index, (name, kind) in enumerate(INPUT_SCHEMA):
+            # Numeric gaps take the training mean; an unknown flag counts as "no",
+            # which is what get_dummies produced for NaN.
+            if kind == 'int' and counts[index]:
+                fill_values[name] = float(sums[index] / counts[index])
+            else:
+                fill_values[name] = 0.0
+        self.set_fill_values(fill_values)
+        return self
+
+    def transform_rows(self, rows):
+        """Encode an (n, 6) array of raw feature rows; NaN marks a missing value"""
+        rows = np.array(rows, dtype=OUTPUT_DTYPE, ndmin=2)
+        missing = np.isnan(rows)
+        if missing.any():
+            rows[missing] = np.broadcast_to(self._fill, rows.shape)[missing]
+        return rows
+
+    def transform(self, frame):
+        """Encode a raw DataFrame with the Housing.csv column names"""
+        return self.transform_rows(self.raw_matrix(frame))
+
+    def fit_transform(self, frame):
+        return self.fit(frame).transform(frame)
+
+    def to_dict(self):
+        return {
+            'input_schema': [list(item) for item in INPUT_SCHEMA],
+            'output_columns': self.output_columns,
+            'output_dtype': OUTPUT_DTYPE,
+            'fill_values': self.fill_values,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        schema = [tuple(item) for item in data.get('input_schema', INPUT_SCHEMA)]
+        if tuple(schema) != INPUT_SCHEMA:
+            raise ValueError(f"Encoder schema {schema} does not match this code's schema")
+        return cls(data.get('fill_values'))
+
+    def save(self, path):
+        with open(path, 'w') as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            return cls.from_dict(json.load(fh))
@@ -0,0 +1,84 @@
+"""
+Sufficient statistics for ordinary least squares.
+
+Only the row count, the column sums and the cross products XᵀX, Xᵀy (and
+yᵀy for error reporting) are kept, so any number of rows can be folded
+in chunk by chunk and the fit is the same as LinearRegression on the
+whole dataset at once.
+"""
+import numpy as np
+
+from .runtime import LinearModel
+
+
+class LeastSquaresAccumulator:
+
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.count = 0
+        self.x_sum = np.zeros(n_features)
+        self.y_sum = 0.0
+        self.xtx = np.zeros((n_features, n_features))
+        self.xty = np.zeros(n_features)
+        self.yty = 0.0
+
+    def add(self, X, y, sign=1):
+        """Fold rows in (sign=1) or take previously added rows back out (sign=-1)"""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.count += sign * len(y)
+        self.x_sum += sign * X.sum(axis=0)
+        self.y_sum += sign * float(y.sum())
+        self.xtx += sign * (X.T @ X)
+        self.xty += sign * (X.T @ y)
+        self.yty += sign * float(y @ y)
+
+    def remove(self, X, y):
+        self.add(X, y, sign=-1)
+
+    def merge(self, other):
+        self.count += other.count
+        self.x_sum += other.x_sum
+        self.y_sum += other.y_sum
+        self.xtx += other.xtx
+        self.xty += other.xty
+        self.yty += other.yty
+
+    def solve(self):
+        """Return (coef, intercept) of the least-squares fit with an intercept"""
+        if self.count < 1:
+            raise ValueError("No rows to fit")
+        x_mean = self.x_sum / self.count
+        y_mean = self.y_sum / self.count
+
+        # Centre the statistics so the intercept does not hurt conditioning
+        cxx = self.xtx - self.count * np.outer(x_mean, x_mean)
+        cxy = self.xty - self.count * x_mean * y_mean
+        coef = np.linalg.lstsq(cxx, cxy, rcond=None)[0]
+        return coef, float(y_mean - x_mean @ coef)
+
+    def to_estimator(self):
+        """A fitted linear model carrying the solved coefficients"""
+        coef, intercept = self.solve()
+        return LinearModel(coef, intercept)
+
+    def to_arrays(self):
+        return {
+            'count': np.array(self.count),
+            'x_sum': self.x_sum,
+            'y_sum': np.array(self.y_sum),
+            'xtx': self.xtx,
+            'xty': self.xty,
+            'yty': np.array(self.yty),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        stats = cls(len(arrays['x_sum']))
+        stats.count = int(arrays['count'])
+        stats.x_sum = np.array(arrays['x_sum'], dtype=np.float64)
+        stats.y_sum = float(arrays['y_sum'])
+        stats.xtx = np.array(arrays['xtx'], dtype=np.float64)
+        stats.xty = np.array(arrays['xty'], dtype=np.float64)
+        stats.yty = float(arrays['yty'])
+        return stats
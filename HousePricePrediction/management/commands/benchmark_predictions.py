@@ -0,0 +1,186 @@
+import json
+import os
+import random
+import secrets
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from HousePricePrediction import audit
+
+# Metric name -> True when a larger value is better
+HIGHER_IS_BETTER = {
+    'cold_start_import_ms': False,
+    'cold_start_rss_mb': False,
+    'prediction_p50_ms': False,
+    'prediction_p95_ms': False,
+    'prediction_p99_ms': False,
+    'batch_rows_per_s': True,
+}
+
+# Django setup, the prediction views and the active model, as a fresh worker sees them
+COLD_START_SCRIPT = (
+    "import time, resource; t = time.perf_counter(); "
+    "import django; django.setup(); import HousePricePrediction.views as views; "
+    "from HousePricePrediction.registry import ModelNotFound\n"
+    "try: views.model_holder.get()\n"
+    "except ModelNotFound: pass\n"
+    "print(time.perf_counter() - t, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+def random_form(rng):
+    return {
+        'bedroom': rng.randint(1, 6),
+        'bathroom': rng.randint(1, 4),
+        'stories': rng.randint(1, 4),
+        'area': rng.randint(1650, 16200),
+        'guestroom': rng.randint(0, 1),
+        'parking': rng.randint(0, 1),
+    }
+
+
+def random_record(rng):
+    form = random_form(rng)
+    return {
+        'bedrooms': form['bedroom'], 'bathrooms': form['bathroom'], 'stories': form['stories'],
+        'area': form['area'], 'guestroom': form['guestroom'], 'parking': form['parking'],
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark prediction cold start, latency and batch throughput; optionally compare to a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='benchmark_results.json')
+        parser.add_argument('--baseline', help="Earlier results file to compare against")
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help="Allowed relative regression per metric before failing (0.2 = 20%%)",
+        )
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--cold-start-runs', type=int, default=3)
+        parser.add_argument('--batch-sizes', default='1,10,100,1000,5000')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # The batch endpoint needs a login or an API token; this run brings its own token
+        token = secrets.token_urlsafe()
+        client = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        metrics = {}
+        metrics['cold_start_import_ms'], metrics['cold_start_rss_mb'] = self.cold_start(options['cold_start_runs'])
+
+        # The views audit what they serve; a run would otherwise write ~25k PredictionLog rows
+        served_audit_log, audit._audit_log = audit._audit_log, audit.AuditLog(enabled=False)
+        try:
+            with override_settings(PREDICTION_API_TOKENS=[token]):
+                metrics.update(self.latency(client, rng, options['requests']))
+                batch = self.batch_throughput(client, rng, options['batch_sizes'])
+        finally:
+            audit._audit_log = served_audit_log
+
+        # The largest batch is the headline throughput figure
+        metrics['batch_rows_per_s'] = batch[max(batch, key=int)]
+
+        report = {
+            'commit': self.git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'metrics': metrics,
+            'batch_rows_per_s_by_size': batch,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+
+        for name, value in metrics.items():
+            self.stdout.write(f"{name:>24}: {value:,.3f}")
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            self.compare(options['baseline'], metrics, options['threshold'])
+
+    def git_commit(self):
+        try:
+            out = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            )
+            return out.stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def cold_start(self, runs):
+        """Median time and peak RSS to import and load the prediction stack in a fresh interpreter"""
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'HousePrice.settings'))
+        timings, rss = [], []
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, '-c', COLD_START_SCRIPT],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+            )
+            seconds, max_rss_kb = out.stdout.strip().splitlines()[-1].split()
+            timings.append(float(seconds) * 1000)
+            rss.append(int(max_rss_kb) / 1024)
+        return statistics.median(timings), statistics.median(rss)
+
+    def latency(self, client, rng, count):
+        url = reverse('result')
+        client.post(url, random_form(rng))  # warm up model load
+
+        timings = []
+        for _ in range(count):
+            form = random_form(rng)
+            started = time.perf_counter()
+            response = client.post(url, form)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"/prediction/ returned {response.status_code}")
+
+        p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+        return {'prediction_p50_ms': float(p50), 'prediction_p95_ms': float(p95), 'prediction_p99_ms': float(p99)}
+
+    def batch_throughput(self, client, rng, sizes):
+        url = reverse('predict_batch')
+        limit = getattr(settings, 'PREDICTION_MAX_BATCH_SIZE', 5000)
+        results = {}
+        for size in (int(s) for s in sizes.split(',')):
+            size = min(size, limit)
+            body = json.dumps([random_record(rng) for _ in range(size)])
+            repeats = max(1, 5000 // size)
+
+            started = time.perf_counter()
+            for _ in range(repeats):
+                response = client.post(url, body, content_type='application/json')
+                if response.status_code != 200:
+                    raise CommandError(f"Batch endpoint returned {response.status_code}")
+            elapsed = time.perf_counter() - started
+            results[str(size)] = size * repeats / elapsed
+        return results
+
+    def compare(self, baseline_path, metrics, threshold):
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)['metrics']
+
+        regressions = []
+        for name, higher_is_better in HIGHER_IS_BETTER.items():
+            if name not in baseline or not baseline[name]:
+                continue
+            change = (metrics[name] - baseline[name]) / baseline[name]
+            regressed = change < -threshold if higher_is_better else change > threshold
+            label = "REGRESSION" if regressed else "ok"
+            self.stdout.write(f"{name:>24}: {baseline[name]:,.3f} -> {metrics[name]:,.3f} ({change:+.1%}) {label}")
+            if regressed:
+                regressions.append(name)
+
+        if regressions:
+            raise CommandError(f"Performance regressions beyond {threshold:.0%}: {', '.join(regressions)}")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction import dataset
+from HousePricePrediction.training import DATA_PATH
+
+
+class Command(BaseCommand):
+    help = "Convert the training CSV into the typed columnar cache and report the memory saved"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data', default=DATA_PATH, help="Path to the CSV")
+
+    def handle(self, *args, **options):
+        manifest = dataset.build_cache(options['data'])
+        report = dataset.memory_report(options['data'])
+
+        self.stdout.write(f"Cache: {dataset.cache_dir_for(options['data'])} ({manifest['rows']:,} rows)")
+        self.stdout.write(f"{'column':<12}{'before':>10}{'after':>10}")
+        for name, after in report['dtypes_after'].items():
+            self.stdout.write(f"{name:<12}{report['dtypes_before'].get(name, '-'):>10}{after:>10}")
+
+        saved = 1 - report['cache_bytes'] / report['pandas_bytes'] if report['pandas_bytes'] else 0
+        self.stdout.write(f"CSV on disk:      {report['csv_bytes']:>12,} bytes")
+        self.stdout.write(f"pandas DataFrame: {report['pandas_bytes']:>12,} bytes")
+        self.stdout.write(self.style.SUCCESS(
+            f"Columnar cache:   {report['cache_bytes']:>12,} bytes ({saved:.0%} smaller)"
+        ))
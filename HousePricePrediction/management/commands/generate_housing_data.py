@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction.dataset import read_csv_frame
+from HousePricePrediction.training import DATA_PATH
+
+FLAG_COLUMNS = ('mainroad', 'guestroom', 'parking')
+
+
+class Command(BaseCommand):
+    help = "Write a synthetic CSV with Housing.csv's schema, scaled to any number of rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="CSV file to write")
+        parser.add_argument('--rows', type=int, default=10_000_000)
+        parser.add_argument('--chunk-size', type=int, default=500_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--source', default=DATA_PATH, help="CSV whose rows are resampled")
+
+    def handle(self, *args, **options):
+        source = read_csv_frame(options['source'])
+        header = ['price', 'area', 'bedrooms', 'bathrooms', 'stories', 'mainroad', 'guestroom', 'Parking']
+        rng = np.random.default_rng(options['seed'])
+
+        # Resample real rows, jitter the area and move price with it so the
+        # synthetic data keeps Housing.csv's distributions and price signal.
+        area = source['area'].to_numpy(dtype=np.float64)
+        price = source['price'].to_numpy(dtype=np.float64)
+        price_per_sqft = np.median(price / area)
+
+        started = time.perf_counter()
+        written = 0
+        with open(options['output'], 'w', newline='') as fh:
+            while written < options['rows']:
+                size = min(options['chunk_size'], options['rows'] - written)
+                picks = rng.integers(0, len(source), size)
+                chunk = source.iloc[picks].reset_index(drop=True)
+
+                new_area = np.maximum(area[picks] * rng.normal(1.0, 0.1, size), 500).round()
+                noise = rng.normal(0, 0.05 * price[picks])
+                chunk['price'] = (price[picks] + (new_area - area[picks]) * price_per_sqft + noise).round().astype(np.int64)
+                chunk['area'] = new_area.astype(np.int64)
+
+                chunk = chunk[['price', 'area', 'bedrooms', 'bathrooms', 'stories', *FLAG_COLUMNS]]
+                chunk.to_csv(fh, header=header if written == 0 else False, index=False)
+                written += size
+                self.stderr.write(f"\r{written:,} rows", ending='')
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written:,} rows to {options['output']} in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)"
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from HousePricePrediction import registry
+from HousePricePrediction.estimates import reestimate_properties
+
+
+class Command(BaseCommand):
+    help = "Score every Property whose features or model version changed and store its estimated price"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows per predict call and bulk_update")
+        parser.add_argument('--model-version', help="Registry version to score with (default: the active one)")
+        parser.add_argument('--force', action='store_true', help="Re-score rows whose estimate looks current")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        try:
+            loaded = registry.load(options['model_version']) if options['model_version'] else None
+            result = reestimate_properties(loaded, chunk_size=options['chunk_size'], force=options['force'])
+        except registry.ModelNotFound as e:
+            raise CommandError(str(e))
+
+        rate = result['scanned'] / max(result['seconds'], 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-estimated {result['rescored']} of {result['scanned']} listings with {result['version']} "
+            f"in {result['seconds']:.1f}s ({rate:,.0f} listings/s scanned)"
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction import registry
+from HousePricePrediction.refresh import refresh_from_properties
+
+
+class Command(BaseCommand):
+    help = "Fold new and changed Property listings into the active model and publish the result"
+
+    def handle(self, *args, **options):
+        parent = registry.active_version()
+        version = refresh_from_properties()
+        if version is None:
+            self.stdout.write(f"Nothing to refresh (active model: {parent})")
+            return
+
+        metrics = registry.load_meta(version)['metrics']
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {version} from {parent}: {metrics['refreshed_rows']} changed, "
+            f"{metrics['removed_rows']} removed listings in {metrics['refresh_ms']} ms"
+        ))
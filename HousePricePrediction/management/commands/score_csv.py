@@ -0,0 +1,47 @@
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from HousePricePrediction import registry
+from HousePricePrediction.bulk_scoring import score_csv
+from HousePricePrediction.model_cache import holder
+
+
+class Command(BaseCommand):
+    help = "Score a CSV with the Housing.csv columns and write it back with a predicted_price column"
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="CSV to score")
+        parser.add_argument('output', help="Where to write the scored CSV ('-' for stdout)")
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=getattr(settings, 'PREDICTION_CSV_CHUNK_SIZE', 10000),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            loaded = holder.get()
+        except registry.ModelNotFound as e:
+            raise CommandError(str(e))
+
+        stats = {}
+        started = time.perf_counter()
+
+        with open(options['input'], newline='') as source:
+            output = sys.stdout if options['output'] == '-' else open(options['output'], 'w', newline='')
+            try:
+                for text in score_csv(source, loaded, options['chunk_size'], stats):
+                    output.write(text)
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+
+        elapsed = time.perf_counter() - started
+        rows = stats.get('rows', 0)
+        rate = rows / elapsed if elapsed else 0
+        self.stderr.write(
+            f"Scored {rows:,} rows ({stats.get('errors', 0):,} errors) with model {loaded.version} "
+            f"in {elapsed:.2f}s - {rate:,.0f} rows/s"
+        )
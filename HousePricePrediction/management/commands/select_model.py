@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from HousePricePrediction.features import RAW_FEATURES, FeatureEncoder
+from HousePricePrediction.model_selection import CANDIDATES, cross_validate
+from HousePricePrediction.training import DATA_PATH, TARGET_COLUMN, load_dataset
+
+
+class Command(BaseCommand):
+    help = "Cross-validate candidate regressors in parallel and report accuracy against inference latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data', default=DATA_PATH, help="Path to the training CSV")
+        parser.add_argument('--folds', type=int, default=5)
+        parser.add_argument('--jobs', type=int, default=0, help="Worker processes (default: all cores)")
+        parser.add_argument(
+            '--candidates', default=','.join(CANDIDATES),
+            help=f"Comma separated subset of: {', '.join(CANDIDATES)}",
+        )
+        parser.add_argument(
+            '--latency-budget-ms', type=float, default=None,
+            help="Only recommend candidates whose single-row predict fits this budget",
+        )
+        parser.add_argument('--output', help="Write the full report as JSON")
+
+    def handle(self, *args, **options):
+        candidates = [name.strip() for name in options['candidates'].split(',') if name.strip()]
+        unknown = set(candidates) - set(CANDIDATES)
+        if unknown:
+            raise CommandError(f"Unknown candidates: {', '.join(sorted(unknown))}")
+
+        data = load_dataset(options['data']).dropna(subset=[TARGET_COLUMN])
+        raw = FeatureEncoder().raw_matrix(data[list(RAW_FEATURES)])
+        y = data[TARGET_COLUMN].to_numpy(dtype=float)
+
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as workdir:
+            reports = cross_validate(
+                raw, y, workdir, candidates,
+                folds=options['folds'], jobs=options['jobs'] or os.cpu_count(),
+            )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{'candidate':<20}{'params':<46}{'RMSE':>12}{'± std':>11}{'R²':>7}{'1-row ms':>10}{'ms/row':>10}"
+        )
+        for report in reports:
+            params = ', '.join(f"{k}={v}" for k, v in report['params'].items() if k != 'random_state')
+            self.stdout.write(
+                f"{report['candidate']:<20}{params[:45]:<46}{report['rmse']:>12,.0f}{report['rmse_std']:>11,.0f}"
+                f"{report['r2']:>7.3f}{report['predict_one_ms']:>10.3f}{report['predict_per_row_ms']:>10.5f}"
+            )
+        self.stdout.write(f"{len(reports)} configurations x {options['folds']} folds in {elapsed:.1f}s")
+
+        budget = options['latency_budget_ms']
+        eligible = [r for r in reports if budget is None or r['predict_one_ms'] <= budget]
+        if eligible:
+            best = eligible[0]
+            self.stdout.write(self.style.SUCCESS(
+                f"Best{' within budget' if budget is not None else ''}: {best['candidate']} {best['params']} "
+                f"(RMSE {best['rmse']:,.0f}, {best['predict_one_ms']:.3f} ms per prediction)"
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(f"No candidate predicts within {budget} ms"))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'folds': options['folds'], 'seconds': elapsed, 'results': reports}, fh, indent=2)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from HousePricePrediction import registry
+from HousePricePrediction.training import DATA_PATH, train_model, train_model_chunked
+
+
+class Command(BaseCommand):
+    help = "Train the house price model and publish it as a new registry version"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data', default=DATA_PATH, help="Path to the training CSV")
+        parser.add_argument('--test-size', type=float, default=0.2)
+        parser.add_argument('--random-state', type=int, default=42)
+        parser.add_argument(
+            '--chunk-size', type=int, default=0,
+            help="Stream the CSV in chunks of this many rows (out-of-core); 0 loads it in memory",
+        )
+        parser.add_argument(
+            '--no-activate', action='store_true',
+            help="Publish the version without making it the one workers serve",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        train = train_model_chunked if options['chunk_size'] else train_model
+        kwargs = {'chunk_size': options['chunk_size']} if options['chunk_size'] else {}
+        model, encoder, metrics, stats = train(
+            options['data'],
+            test_size=options['test_size'],
+            random_state=options['random_state'],
+            **kwargs
+        )
+        metrics['train_seconds'] = round(time.perf_counter() - started, 3)
+
+        version = registry.publish(
+            model, encoder, metrics,
+            stats=stats,
+            activate_version=not options['no_activate'],
+        )
+
+        self.stdout.write(f"Features: {', '.join(encoder.output_columns)}")
+        self.stdout.write(f"Rows: {metrics['train_rows']:,} train / {metrics['test_rows']:,} test in {metrics['train_seconds']}s")
+        self.stdout.write(f"MAE: {metrics['mae']:,.0f}  RMSE: {metrics['rmse']:,.0f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Published model {version}" + ("" if options['no_activate'] else " (active)")
+        ))
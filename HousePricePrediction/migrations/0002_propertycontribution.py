@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HousePricePrediction', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('property_id', models.BigIntegerField(unique=True)),
+                ('base_version', models.CharField(max_length=20)),
+                ('bedrooms', models.FloatField(null=True)),
+                ('bathrooms', models.FloatField(null=True)),
+                ('stories', models.FloatField(null=True)),
+                ('area', models.FloatField(null=True)),
+                ('guestroom', models.FloatField(null=True)),
+                ('parking', models.FloatField(null=True)),
+                ('price', models.FloatField()),
+                ('folded_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
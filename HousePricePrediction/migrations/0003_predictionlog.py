@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('HousePricePrediction', '0002_propertycontribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bedrooms', models.FloatField(null=True)),
+                ('bathrooms', models.FloatField(null=True)),
+                ('stories', models.FloatField(null=True)),
+                ('area', models.FloatField(null=True)),
+                ('guestroom', models.FloatField(null=True)),
+                ('parking', models.FloatField(null=True)),
+                ('predicted_price', models.FloatField()),
+                ('model_version', models.CharField(max_length=20)),
+                ('latency_ms', models.FloatField()),
+                ('source', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,123 @@
+"""
+Process-wide holder for the deserialized price model.
+
+The estimator stays in memory between requests. Every few seconds the
+holder stats the registry's ACTIVE pointer; when a new version has been
+published it is loaded off to the side and swapped in with a single
+reference assignment, so in-flight requests keep the model they started
+with and workers never need a restart after retraining.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.dispatch import Signal
+
+from . import registry
+
+logger = logging.getLogger(__name__)
+
+# Sent with version=<new> and previous=<old> when a worker swaps in a newly activated version,
+# and with previous=None when a worker loads its first model
+model_swapped = Signal()
+
+
+class ModelHolder:
+
+    def __init__(self, check_interval=None):
+        self._check_interval = check_interval
+        self._current = None
+        self._active_mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+        self.load_count = 0
+        self.failed_reloads = 0
+        self.last_load_seconds = 0.0
+        self.total_load_seconds = 0.0
+        self.loaded_at = None
+
+    @property
+    def check_interval(self):
+        if self._check_interval is not None:
+            return self._check_interval
+        return getattr(settings, 'MODEL_RELOAD_CHECK_INTERVAL', 2.0)
+
+    def _active_pointer(self):
+        path = os.path.join(registry.registry_dir(), registry.ACTIVE_FILE)
+        try:
+            return os.stat(path).st_mtime_ns, registry.active_version()
+        except FileNotFoundError:
+            return None, None
+
+    def _load(self, version, mtime):
+        started = time.perf_counter()
+        loaded = registry.load(version)
+        elapsed = time.perf_counter() - started
+
+        previous = self._current
+        self._current = loaded  # atomic swap
+        self._active_mtime = mtime
+
+        self.load_count += 1
+        self.last_load_seconds = elapsed
+        self.total_load_seconds += elapsed
+        self.loaded_at = time.time()
+        logger.info(
+            "Loaded model %s in %.1f ms (previous: %s)",
+            loaded.version, elapsed * 1000, previous.version if previous else None,
+        )
+        return {'version': loaded.version, 'previous': previous.version if previous else None}
+
+    def get(self):
+        """Return the current LoadedModel, reloading it if a new version was activated"""
+        current = self._current
+        now = time.monotonic()
+        if current is not None and now < self._next_check:
+            return current
+
+        swapped = None
+        with self._lock:
+            if self._current is not None and now < self._next_check:
+                return self._current
+            self._next_check = now + self.check_interval
+
+            mtime, version = self._active_pointer()
+            if self._current is None:
+                swapped = self._load(version, mtime)
+            elif mtime != self._active_mtime and version and version != self._current.version:
+                try:
+                    swapped = self._load(version, mtime)
+                except registry.ModelNotFound as e:
+                    # Keep serving the model we have
+                    self.failed_reloads += 1
+                    logger.error("Model reload failed: %s", e)
+            else:
+                self._active_mtime = mtime
+            current = self._current
+
+        if swapped:
+            # Outside the lock: receivers must not hold up (or deadlock) other threads' get()
+            model_swapped.send(sender=self.__class__, **swapped)
+        return current
+
+    def stats(self):
+        current = self._current
+        return {
+            'version': current.version if current else None,
+            'load_count': self.load_count,
+            'reload_count': max(self.load_count - 1, 0),
+            'failed_reloads': self.failed_reloads,
+            'last_load_ms': round(self.last_load_seconds * 1000, 3),
+            'total_load_ms': round(self.total_load_seconds * 1000, 3),
+            'loaded_at': self.loaded_at,
+        }
+
+
+holder = ModelHolder()
+
+
+def get_model():
+    return holder.get()
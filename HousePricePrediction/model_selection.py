@@ -0,0 +1,140 @@
+"""
+Parallel k-fold cross-validation over candidate regressors.
+
+The raw feature matrix and target are written once as .npy files and
+every worker process memory-maps them, so the dataset is not pickled
+into each task. A task is one (candidate, hyperparameters, fold) fit.
+"""
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.tree import DecisionTreeRegressor
+
+from .features import FeatureEncoder
+
+# name -> (estimator class, hyperparameter grid)
+CANDIDATES = {
+    'linear': (LinearRegression, {}),
+    'ridge': (Ridge, {'alpha': [0.1, 1.0, 10.0, 100.0]}),
+    'lasso': (Lasso, {'alpha': [1.0, 100.0, 1000.0], 'max_iter': [10000]}),
+    'decision_tree': (DecisionTreeRegressor, {'max_depth': [3, 5, 8], 'random_state': [0]}),
+    'random_forest': (RandomForestRegressor, {'n_estimators': [100, 300], 'max_depth': [None, 8], 'random_state': [0]}),
+    'gradient_boosting': (GradientBoostingRegressor, {'n_estimators': [100, 300], 'learning_rate': [0.05, 0.1], 'random_state': [0]}),
+}
+
+_X = None
+_y = None
+
+
+def expand_grid(grid):
+    keys = sorted(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def _init_worker(x_path, y_path):
+    global _X, _y
+    _X = np.load(x_path, mmap_mode='r')
+    _y = np.load(y_path, mmap_mode='r')
+
+
+def _encode_fold(train_index, test_index):
+    train_raw = np.asarray(_X[train_index])
+    present = ~np.isnan(train_raw)
+    encoder = FeatureEncoder().fit_from_sums(np.where(present, train_raw, 0).sum(axis=0), present.sum(axis=0))
+    return encoder.transform_rows(train_raw), encoder.transform_rows(_X[test_index])
+
+
+def run_fold(name, params, train_index, test_index):
+    """Fit one candidate on one fold inside a worker; returns its scores"""
+    estimator_class, _ = CANDIDATES[name]
+    X_train, X_test = _encode_fold(train_index, test_index)
+    y_train, y_test = _y[train_index], _y[test_index]
+
+    started = time.perf_counter()
+    model = estimator_class(**params).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+    y_pred = model.predict(X_test)
+
+    return {
+        'rmse': float(mean_squared_error(y_test, y_pred) ** 0.5),
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'r2': float(r2_score(y_test, y_pred)),
+        'fit_seconds': fit_seconds,
+    }
+
+
+def measure_latency(model, X, repeats=200):
+    """Median single-row predict latency and per-row latency of a full batch, in milliseconds"""
+    row = X[:1]
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    model.predict(X)
+    batch = time.perf_counter() - started
+    return float(np.median(timings) * 1000), float(batch / len(X) * 1000)
+
+
+def cross_validate(raw, y, workdir, candidates=None, folds=5, jobs=None, seed=42):
+    """
+    Cross-validate every candidate/grid point across a process pool.
+
+    `raw` is the (n, 6) raw feature matrix (NaN for gaps). Returns one
+    report dict per (candidate, params), best RMSE first.
+    """
+    x_path = os.path.join(workdir, 'X.npy')
+    y_path = os.path.join(workdir, 'y.npy')
+    np.save(x_path, np.asarray(raw, dtype=np.float64))
+    np.save(y_path, np.asarray(y, dtype=np.float64))
+
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(raw))
+    tasks = [
+        (name, params, fold)
+        for name in (candidates or CANDIDATES)
+        for params in expand_grid(CANDIDATES[name][1])
+        for fold in range(folds)
+    ]
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(x_path, y_path)) as pool:
+        futures = [pool.submit(run_fold, name, params, *splits[fold]) for name, params, fold in tasks]
+        scores = [future.result() for future in futures]
+
+    grouped = {}
+    for (name, params, _), score in zip(tasks, scores):
+        grouped.setdefault((name, tuple(sorted(params.items()))), []).append(score)
+
+    # Final fits for latency run in this process on the full (mapped) data
+    _init_worker(x_path, y_path)
+    full_X, _ = _encode_fold(np.arange(len(_y)), np.arange(0))
+
+    reports = []
+    for (name, params), fold_scores in grouped.items():
+        params = dict(params)
+        model = CANDIDATES[name][0](**params).fit(full_X, _y)
+        single_ms, per_row_ms = measure_latency(model, full_X)
+        rmse = [s['rmse'] for s in fold_scores]
+        reports.append({
+            'candidate': name,
+            'params': params,
+            'rmse': float(np.mean(rmse)),
+            'rmse_std': float(np.std(rmse)),
+            'mae': float(np.mean([s['mae'] for s in fold_scores])),
+            'r2': float(np.mean([s['r2'] for s in fold_scores])),
+            'fit_seconds': float(np.mean([s['fit_seconds'] for s in fold_scores])),
+            'predict_one_ms': single_ms,
+            'predict_per_row_ms': per_row_ms,
+        })
+    reports.sort(key=lambda report: report['rmse'])
+    return reports
@@ -9,4 +9,37 @@ class UserProfile(models.Model):
     password = models.CharField(max_length=128)
 
     def __str__(self):
-        return self.full_name
\ No newline at end of file
+        return self.full_name
+
+class PropertyContribution(models.Model):
+    """Raw features of a price_page Property as last folded into the model's training statistics"""
+    property_id = models.BigIntegerField(unique=True)  # plain id: the row must outlive a deleted Property
+    base_version = models.CharField(max_length=20)  # lineage the contribution belongs to
+    bedrooms = models.FloatField(null=True)
+    bathrooms = models.FloatField(null=True)
+    stories = models.FloatField(null=True)
+    area = models.FloatField(null=True)
+    guestroom = models.FloatField(null=True)
+    parking = models.FloatField(null=True)
+    price = models.FloatField()
+    folded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Property {self.property_id} in {self.base_version}"
+
+class PredictionLog(models.Model):
+    """One served prediction, written in batches by the audit flusher (see audit.py)"""
+    bedrooms = models.FloatField(null=True)
+    bathrooms = models.FloatField(null=True)
+    stories = models.FloatField(null=True)
+    area = models.FloatField(null=True)
+    guestroom = models.FloatField(null=True)
+    parking = models.FloatField(null=True)
+    predicted_price = models.FloatField()
+    model_version = models.CharField(max_length=20)
+    latency_ms = models.FloatField()
+    source = models.CharField(max_length=10)  # 'form', 'batch' or 'csv'
+    created_at = models.DateTimeField(db_index=True)  # when predicted, not when flushed
+
+    def __str__(self):
+        return f"{self.predicted_price:,.0f} by {self.model_version}"
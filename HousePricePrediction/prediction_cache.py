@@ -0,0 +1,126 @@
+"""
+Memoized predictions keyed by (model version, normalized feature tuple).
+
+Because the model version is part of the key, publishing a new model
+invalidates every cached price without an explicit flush. Two backends
+are available through settings.PREDICTION_CACHE:
+
+    'local'  - bounded in-process LRU with a TTL (per worker)
+    'django' - any Django cache alias, shared across workers
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+
+    def __init__(self, max_entries=10000, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+
+    def __init__(self, alias='default', ttl=3600):
+        self.alias = alias
+        self.ttl = ttl
+
+    def get(self, key):
+        return caches[self.alias].get(key, _MISSING)
+
+    def set(self, key, value):
+        caches[self.alias].set(key, value, self.ttl)
+
+    def clear(self):
+        # Entries are versioned by model and expire on their own
+        pass
+
+
+class PredictionCache:
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(version, features):
+        return "price:%s:%s" % (version, ",".join(str(value) for value in features))
+
+    def get_or_compute(self, version, features, compute):
+        key = self.make_key(version, features)
+        value = self.backend.get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute()
+        self.backend.set(key, value)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def build_cache():
+    config = getattr(settings, 'PREDICTION_CACHE', {})
+    ttl = config.get('TTL', 3600)
+    if config.get('BACKEND', 'local') == 'django':
+        backend = DjangoCacheBackend(config.get('ALIAS', 'default'), ttl)
+    else:
+        backend = LocalLRUCache(config.get('MAX_ENTRIES', 10000), ttl)
+    return PredictionCache(backend)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = build_cache()
+    return _cache
@@ -0,0 +1,224 @@
+"""
+Incremental model refresh from price_page Property listings.
+
+Each registry version keeps the least-squares statistics it was solved
+from. A refresh takes the active version's statistics, subtracts the
+previous contribution of every Property changed or deleted since the
+version's watermark, adds the current values, re-solves the 6x6 system
+and publishes the result as a new version. The model holder in each
+worker then picks it up like any other publish.
+
+A refresh that would move predictions by less than
+MODEL_REFRESH_MIN_CHANGE (a fraction of the mean price) publishes
+nothing and leaves the watermark where it was. The pending changes are
+then folded in by a later refresh, once together they matter. Each
+publish makes every worker swap models and re-estimate every listing,
+so a single small edit must not trigger one.
+
+Saves and deletes only schedule a refresh; it runs at most once every
+MODEL_REFRESH_INTERVAL seconds per worker, or from `manage.py refresh_model`.
+"""
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+
+from . import registry
+from .models import PropertyContribution
+
+logger = logging.getLogger(__name__)
+
+RAW_FIELDS = ('bedrooms', 'bathrooms', 'stories', 'area', 'guestroom', 'parking')
+NO_PARKING = {'', 'no', 'none', 'n/a', 'na', '0', 'false'}
+
+
+def parse_parking(text):
+    """Turn Property.parking free text ('2 cars', 'yes', 'none') into a 0/1 flag"""
+    text = (text or '').strip().lower()
+    if not text:
+        return np.nan
+    if text in NO_PARKING:
+        return 0.0
+    match = re.search(r'\d+', text)
+    if match:
+        return 1.0 if int(match.group()) > 0 else 0.0
+    return 1.0
+
+
+def property_features(row):
+    """Raw feature tuple for a Property values() row; stories and guestroom are not listed so stay NaN"""
+    return (
+        float(row['bedrooms']),
+        float(row['bathrooms']),
+        np.nan,
+        float(row['area']),
+        np.nan,
+        parse_parking(row['parking']),
+    )
+
+
+def _contribution_features(contribution):
+    return tuple(np.nan if getattr(contribution, name) is None else getattr(contribution, name) for name in RAW_FIELDS)
+
+
+def _is_lineage_head(version, base_version):
+    for other in reversed(registry.list_versions()):
+        if other == version:
+            return True
+        try:
+            meta = registry.load_meta(other)
+        except registry.ModelNotFound:
+            continue
+        if meta.get('lineage', {}).get('base_version') == base_version:
+            return False
+    return True
+
+
+def refresh_from_properties():
+    """Fold Property changes since the active version into a new version; returns it, or None"""
+    from price_page.models import Property
+
+    started = time.perf_counter()
+    with registry.lock():
+        parent = registry.active_version()
+        if not parent:
+            logger.info("Model refresh skipped: no active model")
+            return None
+        loaded = registry.load(parent)
+        stats = registry.load_stats(parent)
+        if stats is None:
+            logger.warning("Model refresh skipped: %s has no stored training statistics", parent)
+            return None
+
+        lineage = loaded.meta.get('lineage', {})
+        base_version = lineage.get('base_version', parent)
+        if not _is_lineage_head(parent, base_version):
+            logger.warning("Model refresh skipped: %s is not the newest version of lineage %s", parent, base_version)
+            return None
+
+        changed = Property.objects.all()
+        watermark = lineage.get('property_watermark')
+        if watermark:
+            changed = changed.filter(updated_at__gt=datetime.fromisoformat(watermark))
+        changed = list(changed.values('id', 'price', 'updated_at', 'bedrooms', 'bathrooms', 'area', 'parking'))
+
+        contributions = PropertyContribution.objects.filter(base_version=base_version)
+        previous = {c.property_id: c for c in contributions.filter(property_id__in=[row['id'] for row in changed])}
+        deleted = list(contributions.exclude(property_id__in=Property.objects.values('id')))
+
+        if not changed and not deleted:
+            return None
+
+        encoder = loaded.encoder
+        outgoing = list(previous.values()) + deleted
+        if outgoing:
+            stats.remove(
+                encoder.transform_rows([_contribution_features(c) for c in outgoing]),
+                [c.price for c in outgoing],
+            )
+        if changed:
+            stats.add(
+                encoder.transform_rows([property_features(row) for row in changed]),
+                [row['price'] for row in changed],
+            )
+
+        model = stats.to_estimator()
+        change = _prediction_change(loaded.model, model, stats, encoder, changed)
+        if change < getattr(settings, 'MODEL_REFRESH_MIN_CHANGE', 0.001):
+            logger.info(
+                "Model refresh deferred: %d changed / %d deleted listings move predictions by %.4f%%",
+                len(changed), len(deleted), change * 100,
+            )
+            return None
+
+        new_watermark = max([row['updated_at'] for row in changed], default=None)
+        metrics = {
+            'train_rows': int(stats.count),
+            'refreshed_rows': len(changed),
+            'removed_rows': len(deleted),
+            'refresh_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+
+        with transaction.atomic():
+            _save_contributions(changed, base_version)
+            PropertyContribution.objects.filter(pk__in=[c.pk for c in deleted]).delete()
+            # Rows folded under an older lineage are not part of these statistics
+            PropertyContribution.objects.exclude(base_version=base_version).exclude(
+                property_id__in=Property.objects.values('id')).delete()
+
+            version = registry.publish(model, encoder, metrics, stats=stats, lineage={
+                'base_version': base_version,
+                'parent_version': parent,
+                'property_watermark': (new_watermark.isoformat() if new_watermark else watermark),
+            })
+
+    logger.info(
+        "Refreshed model %s -> %s with %d changed / %d deleted listings in %.1f ms",
+        parent, version, len(changed), len(deleted), (time.perf_counter() - started) * 1000,
+    )
+    return version
+
+
+def _prediction_change(old, new, stats, encoder, changed):
+    """Largest change in predicted price, as a fraction of the mean price, at the mean house and the changed rows"""
+    points = [stats.x_sum / stats.count]
+    if changed:
+        points.extend(encoder.transform_rows([property_features(row) for row in changed]))
+    points = np.asarray(points, dtype=np.float64)
+    scale = max(abs(stats.y_sum / stats.count), 1.0)
+    return float(np.max(np.abs(new.predict(points) - old.predict(points))) / scale)
+
+
+def _save_contributions(rows, base_version):
+    existing = {
+        c.property_id: c
+        for c in PropertyContribution.objects.filter(property_id__in=[row['id'] for row in rows])
+    }
+    to_create, to_update = [], []
+    for row in rows:
+        values = dict(zip(RAW_FIELDS, property_features(row)))
+        contribution = existing.get(row['id']) or PropertyContribution(property_id=row['id'])
+        contribution.base_version = base_version
+        contribution.price = row['price']
+        for name, value in values.items():
+            setattr(contribution, name, None if np.isnan(value) else value)
+        (to_update if contribution.pk else to_create).append(contribution)
+
+    PropertyContribution.objects.bulk_create(to_create, batch_size=1000)
+    PropertyContribution.objects.bulk_update(
+        to_update, ['base_version', 'price', *RAW_FIELDS], batch_size=1000)
+
+
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def schedule_refresh():
+    """Run refresh_from_properties once after MODEL_REFRESH_INTERVAL seconds, batching all saves until then"""
+    global _timer
+    interval = getattr(settings, 'MODEL_REFRESH_INTERVAL', 60)
+    if not interval:
+        return
+    with _timer_lock:
+        if _timer is not None:
+            return
+        _timer = threading.Timer(interval, _run_scheduled)
+        _timer.daemon = True
+        _timer.start()
+
+
+def _run_scheduled():
+    global _timer
+    with _timer_lock:
+        _timer = None
+    try:
+        refresh_from_properties()
+    except Exception:
+        logger.exception("Scheduled model refresh failed")
+    finally:
+        connections.close_all()  # this thread's connections only
@@ -0,0 +1,274 @@
+"""
+Versioned on-disk registry for the trained price model.
+
+Layout:
+    <MODEL_REGISTRY_DIR>/
+        ACTIVE              -> name of the version workers should serve
+        v0001/model.joblib
+        v0001/export.json   -> NumPy-only copy of linear models (see runtime.py)
+        v0001/encoder.json  -> fitted FeatureEncoder (input schema, fill values)
+        v0001/stats.npz     -> least-squares sufficient statistics (for refreshes)
+        v0001/meta.json     -> feature columns, metrics, lineage, created_at
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+from django.conf import settings
+
+from .compiled import CompiledPredictor
+from .features import FeatureEncoder
+from .least_squares import LeastSquaresAccumulator
+from .runtime import EXPORT_FILE, load_export, save_export
+
+try:
+    import fcntl
+except ImportError:  # Windows: lock() falls back to an exclusively created file
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FILE = 'ACTIVE'
+MODEL_FILE = 'model.joblib'
+META_FILE = 'meta.json'
+ENCODER_FILE = 'encoder.json'
+STATS_FILE = 'stats.npz'
+LOCK_FILE = '.lock'
+REESTIMATE_LOCK_FILE = '.reestimate.lock'
+# Without flock, a lock file older than this was left by a process that died holding it
+STALE_LOCK_SECONDS = 3600
+
+# predictor is the CompiledPredictor for linear models, None otherwise
+LoadedModel = namedtuple('LoadedModel', ['version', 'model', 'encoder', 'feature_columns', 'meta', 'predictor'])
+
+
+class ModelNotFound(Exception):
+    pass
+
+
+def registry_dir():
+    return str(getattr(settings, 'MODEL_REGISTRY_DIR', os.path.join(settings.BASE_DIR, 'model_registry')))
+
+
+def _write_atomic(path, text):
+    """Write text next to path then rename, so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'w') as fh:
+        fh.write(text)
+    os.replace(tmp_path, path)
+
+
+def list_versions():
+    root = registry_dir()
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if name.startswith('v') and os.path.isfile(os.path.join(root, name, META_FILE))
+    )
+
+
+def active_version():
+    try:
+        with open(os.path.join(registry_dir(), ACTIVE_FILE)) as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def activate(version):
+    if version not in list_versions():
+        raise ModelNotFound(f"Unknown model version: {version}")
+    _write_atomic(os.path.join(registry_dir(), ACTIVE_FILE), version)
+    logger.info("Activated model version %s", version)
+
+
+_held = threading.local()
+
+
+@contextmanager
+def lock(name=LOCK_FILE):
+    """
+    Exclusive cross-process lock on the registry (held while publishing);
+    re-entrant per thread. Other jobs that must run one at a time across
+    workers pass their own lock file `name`.
+    """
+    depths = _held.__dict__.setdefault('depths', {})
+    if depths.get(name):
+        depths[name] += 1
+        try:
+            yield
+        finally:
+            depths[name] -= 1
+        return
+
+    root = registry_dir()
+    os.makedirs(root, exist_ok=True)
+    with _exclusive(os.path.join(root, name)):
+        depths[name] = 1
+        try:
+            yield
+        finally:
+            depths[name] = 0
+
+
+@contextmanager
+def _exclusive(path):
+    if fcntl is not None:
+        with open(path, 'w') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+        return
+
+    # Whoever creates the file holds the lock; it is removed on release
+    held = path + '.held'
+    while True:
+        try:
+            os.close(os.open(held, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(held) > STALE_LOCK_SECONDS:
+                    os.remove(held)
+                    logger.warning("Removed stale registry lock %s", held)
+                    continue
+            except FileNotFoundError:
+                continue  # released between the two calls
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.remove(held)
+
+
+def publish(model, encoder, metrics=None, activate_version=True, stats=None, lineage=None):
+    """
+    Store a trained model as the next version and (optionally) make it active.
+
+    `stats` is the LeastSquaresAccumulator the model was solved from and
+    `lineage` records what the version was derived from; both are kept so
+    the version can later be refreshed incrementally.
+    """
+    with lock():
+        return _publish(model, encoder, metrics, activate_version, stats, lineage)
+
+
+def _publish(model, encoder, metrics, activate_version, stats, lineage):
+    root = registry_dir()
+    versions = list_versions()
+    next_number = int(versions[-1][1:]) + 1 if versions else 1
+    version = f"v{next_number:04d}"
+
+    # Build the version in a temp dir and rename it into place in one step
+    staging = tempfile.mkdtemp(dir=root, prefix='.staging-')
+    import joblib  # training-side dependency only
+
+    joblib.dump(model, os.path.join(staging, MODEL_FILE))
+    encoder.save(os.path.join(staging, ENCODER_FILE))
+    save_export(os.path.join(staging, EXPORT_FILE), model, encoder)
+    if stats is not None:
+        np.savez(os.path.join(staging, STATS_FILE), **stats.to_arrays())
+
+    lineage = dict(lineage or {})
+    lineage.setdefault('base_version', version)  # a full training run starts its own lineage
+    meta = {
+        'version': version,
+        'feature_columns': encoder.output_columns,
+        'metrics': metrics or {},
+        'lineage': lineage,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(staging, META_FILE), 'w') as fh:
+        json.dump(meta, fh, indent=2)
+    os.rename(staging, os.path.join(root, version))
+
+    if activate_version:
+        activate(version)
+    prune()
+    return version
+
+
+def prune(keep=None):
+    """
+    Delete all but the newest `keep` versions (MODEL_REGISTRY_KEEP,
+    default 10), never the active one. Returns the deleted versions.
+    """
+    keep = keep if keep is not None else getattr(settings, 'MODEL_REGISTRY_KEEP', 10)
+    if not keep:
+        return []
+    root = registry_dir()
+    with lock():
+        active = active_version()
+        doomed = [version for version in list_versions()[:-keep] if version != active]
+        for version in doomed:
+            # Renamed away first, so no reader ever sees a half-deleted version
+            trash = tempfile.mkdtemp(dir=root, prefix='.pruned-')
+            os.rename(os.path.join(root, version), os.path.join(trash, version))
+            shutil.rmtree(trash, ignore_errors=True)
+    if doomed:
+        logger.info("Pruned model versions %s", ', '.join(doomed))
+    return doomed
+
+
+def load_meta(version):
+    try:
+        with open(os.path.join(registry_dir(), version, META_FILE)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        raise ModelNotFound(f"Model version {version} is missing from {registry_dir()}")
+
+
+def load(version=None):
+    """
+    Deserialize a model version (the active one by default).
+
+    Linear versions load from export.json with NumPy alone; anything else
+    (or PREDICTION_RUNTIME = 'joblib') unpickles model.joblib, which needs
+    scikit-learn.
+    """
+    version = version or active_version()
+    if not version:
+        raise ModelNotFound("No active model version. Run `manage.py train_model` first.")
+
+    meta = load_meta(version)
+    path = os.path.join(registry_dir(), version)
+    export_path = os.path.join(path, EXPORT_FILE)
+    try:
+        if getattr(settings, 'PREDICTION_RUNTIME', 'export') == 'export' and os.path.exists(export_path):
+            model, encoder = load_export(export_path)
+        else:
+            import joblib
+
+            model = joblib.load(os.path.join(path, MODEL_FILE))
+            encoder = FeatureEncoder.load(os.path.join(path, ENCODER_FILE))
+    except FileNotFoundError:
+        raise ModelNotFound(f"Model version {version} is incomplete or missing from {registry_dir()}")
+    except ValueError as e:
+        raise ModelNotFound(f"Model version {version} cannot be loaded: {e}")
+
+    if meta['feature_columns'] != encoder.output_columns:
+        raise ModelNotFound(f"Model version {version} was trained on columns {meta['feature_columns']}")
+
+    predictor = CompiledPredictor.from_estimator(model, encoder)
+    return LoadedModel(version, model, encoder, encoder.output_columns, meta, predictor)
+
+
+
+def load_stats(version):
+    """The sufficient statistics stored with a version, or None if it has none"""
+    try:
+        with np.load(os.path.join(registry_dir(), version, STATS_FILE)) as arrays:
+            return LeastSquaresAccumulator.from_arrays(arrays)
+    except FileNotFoundError:
+        return None
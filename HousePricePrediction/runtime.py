@@ -0,0 +1,66 @@
+"""
+NumPy-only runtime for exported linear price models.
+
+Every linear registry version is also written as export.json: the
+coefficients, intercept, encoded column order and the encoder's fill
+values. Loading that needs neither scikit-learn, pandas nor joblib, so
+web workers import and hold only NumPy. Those libraries are needed for
+training alone.
+"""
+import json
+
+import numpy as np
+
+from .features import FeatureEncoder
+
+EXPORT_FILE = 'export.json'
+EXPORT_FORMAT = 'houseprice-linear/1'
+
+
+class LinearModel:
+    """Minimal stand-in for a fitted LinearRegression: coef_, intercept_ and predict()"""
+
+    def __init__(self, coef, intercept):
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.n_features_in_ = len(self.coef_)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+def export_model(model, encoder):
+    """Serializable description of a linear model, or None if the model is not linear"""
+    coef = getattr(model, 'coef_', None)
+    intercept = getattr(model, 'intercept_', None)
+    if coef is None or intercept is None or np.ndim(coef) != 1:
+        return None
+    return {
+        'format': EXPORT_FORMAT,
+        'feature_columns': encoder.output_columns,
+        'coef': [float(value) for value in coef],
+        'intercept': float(intercept),
+        'encoder': encoder.to_dict(),
+    }
+
+
+def save_export(path, model, encoder):
+    exported = export_model(model, encoder)
+    if exported is None:
+        return False
+    with open(path, 'w') as fh:
+        json.dump(exported, fh, indent=2)
+    return True
+
+
+def load_export(path):
+    """Return (LinearModel, FeatureEncoder) from an export.json"""
+    with open(path) as fh:
+        exported = json.load(fh)
+    if exported.get('format') != EXPORT_FORMAT:
+        raise ValueError(f"Unsupported export format: {exported.get('format')}")
+
+    encoder = FeatureEncoder.from_dict(exported['encoder'])
+    if exported['feature_columns'] != encoder.output_columns:
+        raise ValueError("Exported coefficients do not match the encoder's columns")
+    return LinearModel(exported['coef'], exported['intercept']), encoder
@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from price_page.importer import import_finished, listings_imported
+
+from . import registry
+from .estimates import reestimate_properties, schedule_reestimate
+from .model_cache import model_swapped
+from .refresh import refresh_from_properties, schedule_refresh
+
+
+@receiver(post_save, sender='price_page.Property')
+@receiver(post_delete, sender='price_page.Property')
+@receiver(listings_imported)
+def property_changed(sender, **kwargs):
+    """Listing changes are folded into the model and re-estimated in batches, never inside the save itself"""
+    transaction.on_commit(schedule_refresh)
+    transaction.on_commit(schedule_reestimate)
+
+
+@receiver(import_finished)
+def refresh_after_import(sender, **kwargs):
+    """An import command exits before scheduled work would run, so refresh and re-estimate now"""
+    version = refresh_from_properties()
+    try:
+        loaded = registry.load(version)
+    except registry.ModelNotFound:
+        return {'model refresh': "skipped, no active model"}
+    result = reestimate_properties(loaded)
+    return {
+        'model version': f"{loaded.version} ({'refreshed' if version else 'unchanged'})",
+        'estimates updated': result['rescored'],
+    }
+
+
+@receiver(model_swapped)
+def model_version_changed(sender, version, previous, **kwargs):
+    # After a swap every stored estimate names the old version. On a worker's first load they
+    # may too (activated while it was down); the scheduled run looks before scanning, so
+    # loading a model never needs the database
+    schedule_reestimate(only_if_stale=previous is None)
@@ -1,3 +1,680 @@
-from django.test import TestCase
+import copy
+import csv
+import functools
+import io
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import KFold
+from sklearn.tree import DecisionTreeRegressor
+
+from price_page.models import Property
+
+from . import audit, estimates, registry
+from .audit import AuditLog
+from .bulk_scoring import score_csv
+from .compiled import CompiledPredictor
+from .dataset import build_cache, cache_dir_for, ensure_cache, load_columns, read_csv_frame
+from .estimates import reestimate_properties
+from .features import RAW_FEATURES, FeatureEncoder, normalize_features
+from .model_cache import ModelHolder
+from .model_selection import cross_validate
+from .models import PredictionLog, UserProfile
+from .prediction_cache import LocalLRUCache, PredictionCache
+from .refresh import property_features, refresh_from_properties
+from .runtime import EXPORT_FILE, LinearModel
+from .training import DATA_PATH, TARGET_COLUMN, load_dataset, train_model, train_model_chunked
+
+
+@functools.cache
+def trained_model():
+    """(model, encoder, metrics, stats) trained on Housing.csv, once per test run"""
+    return train_model()
+
+
+class RegistryMixin:
+    """Points MODEL_REGISTRY_DIR at an empty temporary registry for each test"""
+
+    def setUp(self):
+        super().setUp()
+        registry_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(registry_dir.cleanup)
+        self.enterContext(override_settings(MODEL_REGISTRY_DIR=registry_dir.name))
+        self.registry_dir = registry_dir.name
+
+    def publish_model(self, **options):
+        """Publish and activate the Housing.csv model; returns it loaded"""
+        model, encoder, metrics, _ = trained_model()
+        return registry.load(registry.publish(model, encoder, metrics, **options))
+
+
+def log_in(client):
+    """Sign `client` in the way the login view does"""
+    user = UserProfile.objects.create(
+        full_name="Analyst", email=f"analyst{UserProfile.objects.count()}@example.com", phone="1",
+        address="x", password="x",
+    )
+    session = client.session
+    session['user_id'] = user.id
+    session.save()
+
+
+class CompiledPredictorParityTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model, cls.encoder, _, _ = trained_model()
+        cls.predictor = CompiledPredictor.from_estimator(cls.model, cls.encoder)
+
+    def test_matches_estimator(self):
+        grid = itertools.product([1, 3, 6], [1, 2, 4], [1, 2, 4], [1650, 5000, 16200], [0, 1], [0, 1])
+        for features in grid:
+            with self.subTest(features=features):
+                expected = self.model.predict(self.encoder.transform_rows([features]))[0]
+                actual = self.predictor.predict_one(features)
+                self.assertAlmostEqual(actual, expected, delta=abs(expected) * 1e-9)
+
+    def test_predict_many_matches_predict_one(self):
+        rows = [(3, 2, 2, 5000, 1, 0), (4, 1, 1, 3000, 0, 1)]
+        batch = self.predictor.predict_many(rows)
+        for row, value in zip(rows, batch):
+            self.assertAlmostEqual(value, self.predictor.predict_one(row), places=3)
+
+    def test_normalize_features_rejects_bad_input(self):
+        self.assertEqual(normalize_features('3', '2', '1', '5000', '1', '0'), (3, 2, 1, 5000, 1, 0))
+        with self.assertRaises(ValueError):
+            normalize_features('3', '2', '1', 'big', '1', '0')
+        with self.assertRaises(ValueError):
+            normalize_features(3, 2, 1, 5000, 2, 0)
+        with self.assertRaises(ValueError):
+            normalize_features(-1, 2, 1, 5000, 1, 0)
+
+
+class FeatureEncoderTests(SimpleTestCase):
+
+    def test_matches_get_dummies_encoding(self):
+        raw = read_csv_frame(DATA_PATH)[list(RAW_FEATURES)]
+        expected = pd.get_dummies(raw, drop_first=True)
+
+        encoder = FeatureEncoder().fit(raw)
+        self.assertEqual(encoder.output_columns, list(expected.columns))
+        np.testing.assert_array_equal(encoder.transform(raw), expected.to_numpy(dtype=float))
+
+        # The typed columnar cache stores flags as 0/1 and must encode identically
+        cached = load_dataset()[list(RAW_FEATURES)]
+        np.testing.assert_array_equal(encoder.transform(cached), expected.to_numpy(dtype=float))
+
+    def test_round_trip_and_imputation(self):
+        raw = pd.DataFrame({
+            'Bedrooms': [2, 4], 'bathrooms': [1, 3], 'stories': [1, 1],
+            'area': [1000, 3000], 'guestroom': ['yes', 'no'], 'Parking': ['no', 'yes'],
+        })
+        encoder = FeatureEncoder.from_dict(FeatureEncoder().fit(raw).to_dict())
+        encoded = encoder.transform_rows([(np.nan, 2, 1, np.nan, 1, np.nan)])
+        np.testing.assert_array_equal(encoded, [[3, 2, 1, 2000, 1, 0]])
+
+
+class PredictionCacheTests(SimpleTestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PredictionCache(LocalLRUCache(max_entries=2))
+        calls = []
+
+        def price(features):
+            return cache.get_or_compute('v1', features, lambda: calls.append(features) or sum(features))
+
+        price((3, 2)), price((4, 2))
+        price((3, 2))  # now the most recent
+        price((5, 2))  # evicts (4, 2)
+        self.assertEqual(price((3, 2)), 5)
+        self.assertEqual(price((4, 2)), 6)
+        self.assertEqual(calls, [(3, 2), (4, 2), (5, 2), (4, 2)])
+        self.assertEqual(len(cache.backend), 2)
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (2, 4))
+
+    def test_entries_expire_and_versions_do_not_share(self):
+        cache = PredictionCache(LocalLRUCache(ttl=0.05))
+        self.assertEqual(cache.get_or_compute('v1', (3, 2), lambda: 1.0), 1.0)
+        self.assertEqual(cache.get_or_compute('v1', (3, 2), lambda: 2.0), 1.0)
+        self.assertEqual(cache.get_or_compute('v2', (3, 2), lambda: 3.0), 3.0)
+
+        time.sleep(0.06)
+        self.assertEqual(cache.get_or_compute('v1', (3, 2), lambda: 4.0), 4.0)
+
+
+class DatasetCacheTests(SimpleTestCase):
+
+    def test_columns_with_gaps_keep_exact_prices(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.enterContext(override_settings(DATASET_CACHE_DIR=os.path.join(workdir.name, 'cache')))
+        path = os.path.join(workdir.name, 'houses.csv')
+        with open(path, 'w') as fh:
+            fh.write("price,area,bedrooms,guestroom\n123456789,16777217,3,yes\n,5000,,no\n4410001,,2,\n")
+
+        columns = load_columns(path)
+        self.assertEqual(columns['price'].dtype, np.float64)
+        self.assertEqual(columns['price'][0], 123456789)  # float32 would store 123456792
+        self.assertEqual(columns['area'][0], 16777217)
+        self.assertEqual(columns['bedrooms'].dtype, np.float32)  # small counts stay compact
+        self.assertEqual(columns['guestroom'].dtype, np.float32)
+        self.assertTrue(np.isnan(columns['price'][1]))
+
+    def test_free_text_columns_are_left_out_and_builds_replace_the_cache_whole(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        cache_root = os.path.join(workdir.name, 'cache')
+        self.enterContext(override_settings(DATASET_CACHE_DIR=cache_root))
+        path = os.path.join(workdir.name, 'houses.csv')
+        with open(path, 'w') as fh:
+            fh.write("price,area,basement,furnishing\n4410000,5000,yes,semi-furnished\n3500000,3000,no,\n")
+
+        with self.assertLogs('HousePricePrediction.dataset', 'WARNING'):
+            manifest = build_cache(path)
+        self.assertEqual((list(manifest['columns']), manifest['skipped']), (['price', 'area', 'basement'], ['furnishing']))
+        self.assertEqual(load_columns(path)['basement'].tolist(), [1, 0])
+
+        # A rebuild swaps in a complete directory and leaves no staging behind
+        os.utime(path, ns=(0, 0))
+        with self.assertLogs('HousePricePrediction.dataset', 'WARNING'):
+            self.assertEqual(ensure_cache(path)['source']['mtime_ns'], 0)
+        self.assertEqual(os.listdir(cache_root), [os.path.basename(cache_dir_for(path))])
+
+        with open(path, 'w') as fh:
+            fh.write("price,area\n4410000,large\n")
+        with self.assertRaisesMessage(ValueError, "column 'area' must be numeric"):
+            build_cache(path)
+        self.assertEqual(os.listdir(cache_root), [os.path.basename(cache_dir_for(path))])
+
+
+class ChunkedTrainingTests(SimpleTestCase):
+
+    def test_matches_in_memory_linear_regression(self):
+        raw = load_dataset()[list(RAW_FEATURES)]
+        y = load_dataset()['price'].to_numpy(dtype=float)
+        encoder = FeatureEncoder().fit(raw)
+        expected = LinearRegression().fit(encoder.transform(raw), y)
+
+        model, chunked_encoder, metrics, _ = train_model_chunked(DATA_PATH, chunk_size=50, test_size=0.0)
+        self.assertEqual(metrics['train_rows'], len(y))
+        self.assertEqual(chunked_encoder.fill_values, encoder.fill_values)
+        np.testing.assert_allclose(model.coef_, expected.coef_, rtol=1e-6)
+        self.assertAlmostEqual(model.intercept_, expected.intercept_, delta=abs(expected.intercept_) * 1e-6)
+
+
+class ExportRuntimeTests(RegistryMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.raw = load_dataset()[list(RAW_FEATURES)].to_numpy()
+
+    def test_export_predicts_like_the_joblib_model(self):
+        exported = self.publish_model()
+        version = exported.version
+        self.assertIsInstance(exported.model, LinearModel)
+        with self.settings(PREDICTION_RUNTIME='joblib'):
+            pickled = registry.load(version)
+        self.assertIsInstance(pickled.model, LinearRegression)
+
+        self.assertEqual(exported.feature_columns, pickled.feature_columns)
+        expected = pickled.model.predict(pickled.encoder.transform_rows(self.raw))
+        np.testing.assert_allclose(exported.model.predict(exported.encoder.transform_rows(self.raw)), expected, rtol=1e-9)
+        np.testing.assert_allclose(exported.predictor.predict_many(self.raw), expected, rtol=1e-9)
+
+    def test_non_linear_models_fall_back_to_joblib(self):
+        _, encoder, metrics, _ = trained_model()
+        y = load_dataset()['price'].to_numpy(dtype=float)
+        tree = DecisionTreeRegressor(max_depth=4, random_state=0).fit(encoder.transform_rows(self.raw), y)
+        version = registry.publish(tree, encoder, metrics)
+
+        self.assertFalse(os.path.exists(os.path.join(registry.registry_dir(), version, EXPORT_FILE)))
+        loaded = registry.load(version)
+        self.assertIsInstance(loaded.model, DecisionTreeRegressor)
+        self.assertIsNone(loaded.predictor)
+
+
+class RegistryLockTests(RegistryMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # As on Windows, where fcntl does not exist
+        self.addCleanup(setattr, registry, 'fcntl', registry.fcntl)
+        registry.fcntl = None
+        self.held = os.path.join(self.registry_dir, registry.LOCK_FILE + '.held')
+
+    def test_lock_file_fallback_excludes_other_threads(self):
+        acquired = []
+
+        def contend():
+            with registry.lock():
+                acquired.append(time.monotonic())
+
+        with registry.lock():
+            with registry.lock():  # re-entrant in the holding thread
+                self.assertTrue(os.path.exists(self.held))
+            other = threading.Thread(target=contend)
+            other.start()
+            time.sleep(0.2)
+            self.assertEqual(acquired, [])
+            released = time.monotonic()
+        other.join(5)
+        self.assertGreaterEqual(acquired[0], released)
+        self.assertFalse(os.path.exists(self.held))
+
+    def test_stale_lock_file_is_broken(self):
+        os.makedirs(os.path.dirname(self.held), exist_ok=True)
+        open(self.held, 'w').close()
+        stale = time.time() - registry.STALE_LOCK_SECONDS - 1
+        os.utime(self.held, (stale, stale))
+        with self.assertLogs('HousePricePrediction.registry', 'WARNING'):
+            with registry.lock():
+                pass
+        self.assertFalse(os.path.exists(self.held))
+
+
+@override_settings(MODEL_REESTIMATE_INTERVAL=0)
+class ModelHolderTests(RegistryMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.model, self.encoder, self.metrics, _ = trained_model()
+
+    def test_swaps_in_a_newly_activated_version(self):
+        first = registry.publish(self.model, self.encoder, self.metrics)
+        holder = ModelHolder(check_interval=0)
+        served = holder.get()
+        self.assertEqual(served.version, first)
+        self.assertIs(holder.get(), served)  # no new version, no reload
+
+        second = registry.publish(self.model, self.encoder, self.metrics)
+        self.assertEqual(holder.get().version, second)
+        self.assertEqual(served.version, first)  # requests holding the old model keep it
+        self.assertEqual((holder.stats()['load_count'], holder.stats()['reload_count']), (2, 1))
+
+        registry.activate(first)
+        self.assertEqual(holder.get().version, first)
+
+    def test_keeps_serving_when_the_active_version_cannot_be_loaded(self):
+        version = registry.publish(self.model, self.encoder, self.metrics)
+        holder = ModelHolder(check_interval=0)
+        holder.get()
+
+        registry._write_atomic(os.path.join(registry.registry_dir(), registry.ACTIVE_FILE), 'v999')
+        with self.assertLogs('HousePricePrediction.model_cache', 'ERROR'):
+            self.assertEqual(holder.get().version, version)
+        self.assertEqual(holder.stats()['failed_reloads'], 1)
+
+    def test_waits_for_the_check_interval(self):
+        registry.publish(self.model, self.encoder, self.metrics)
+        holder = ModelHolder(check_interval=3600)
+        served = holder.get()
+        registry.publish(self.model, self.encoder, self.metrics)
+        self.assertIs(holder.get(), served)
+
+
+class ModelSelectionTests(SimpleTestCase):
+
+    def test_cross_validation_matches_a_serial_run(self):
+        data = load_dataset().dropna(subset=[TARGET_COLUMN])
+        raw = FeatureEncoder().raw_matrix(data[list(RAW_FEATURES)])
+        y = data[TARGET_COLUMN].to_numpy(dtype=float)
+
+        with tempfile.TemporaryDirectory() as workdir:
+            reports = cross_validate(raw, y, workdir, ['linear', 'ridge'], folds=3, jobs=2)
+        self.assertEqual(len(reports), 5)  # linear plus four ridge alphas
+        self.assertEqual([r['rmse'] for r in reports], sorted(r['rmse'] for r in reports))
+
+        # Each fold imputes from its own training rows only
+        rmse = []
+        for train, test in KFold(n_splits=3, shuffle=True, random_state=42).split(raw):
+            present = ~np.isnan(raw[train])
+            encoder = FeatureEncoder().fit_from_sums(np.where(present, raw[train], 0).sum(axis=0), present.sum(axis=0))
+            model = LinearRegression().fit(encoder.transform_rows(raw[train]), y[train])
+            rmse.append(mean_squared_error(y[test], model.predict(encoder.transform_rows(raw[test]))) ** 0.5)
+        linear = next(r for r in reports if r['candidate'] == 'linear')
+        self.assertAlmostEqual(linear['rmse'], np.mean(rmse), delta=np.mean(rmse) * 1e-9)
+        self.assertGreater(linear['predict_one_ms'], 0)
+
+    def test_command_reports_the_best_candidate_within_budget(self):
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'report.json')
+            call_command('select_model', candidates='linear,decision_tree', folds=2, jobs=1,
+                         latency_budget_ms=1000, output=path, stdout=out)
+            with open(path) as fh:
+                report = json.load(fh)
+        self.assertEqual(len(report['results']), 4)
+        self.assertIn("Best within budget: %s" % report['results'][0]['candidate'], out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('select_model', candidates='linear,perceptron', stdout=io.StringIO())
+
+
+@override_settings(MODEL_REFRESH_INTERVAL=0)
+class PropertyRefreshTests(RegistryMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        model, self.encoder, metrics, stats = trained_model()
+        self.base_stats = copy.deepcopy(stats)  # the tests fold rows into it
+        registry.publish(model, self.encoder, metrics, stats=self.base_stats)
+
+    def make_property(self, i, **fields):
+        values = dict(
+            title=f"House {i}", location="Lahore", price=3000000 + i * 100000, bedrooms=2 + i % 3,
+            bathrooms=1 + i % 2, area=3000 + i * 50, year_built=2000, parking=['2 cars', 'none'][i % 2],
+            slug=f"house-{i}",
+        )
+        values.update(fields)
+        return Property.objects.create(**values)
+
+    def test_refresh_matches_full_refit(self):
+        listings = [self.make_property(i) for i in range(10)]
+        self.assertIsNotNone(refresh_from_properties())
+        self.assertIsNone(refresh_from_properties())
+
+        listings[0].price = 9000000
+        listings[0].save()
+        listings[1].delete()
+        version = refresh_from_properties()
+
+        rows = list(Property.objects.values('price', 'bedrooms', 'bathrooms', 'area', 'parking'))
+        self.base_stats.add(self.encoder.transform_rows([property_features(r) for r in rows]), [r['price'] for r in rows])
+        coef, intercept = self.base_stats.solve()
+
+        refreshed = registry.load(version).model
+        np.testing.assert_allclose(refreshed.coef_, coef, rtol=1e-6)
+        self.assertAlmostEqual(refreshed.intercept_, intercept, delta=abs(intercept) * 1e-6)
+
+    def test_small_changes_are_deferred_until_they_matter(self):
+        listings = [self.make_property(i) for i in range(10)]
+        first = refresh_from_properties()
+        self.assertIsNotNone(first)
+
+        listings[0].title = "Repainted"
+        listings[0].price += 1000
+        listings[0].save()
+        with self.assertLogs('HousePricePrediction.refresh', 'INFO'):
+            self.assertIsNone(refresh_from_properties())
+        self.assertEqual(registry.active_version(), first)
+
+        for listing in listings[1:]:
+            listing.price *= 3
+            listing.save()
+        version = refresh_from_properties()
+        # The deferred edit is folded in with the later ones
+        self.assertEqual(registry.load_meta(version)['metrics']['refreshed_rows'], 10)
+
+    @override_settings(MODEL_REGISTRY_KEEP=2)
+    def test_publishing_prunes_old_versions_but_never_the_active_one(self):
+        active = registry.active_version()
+        model, encoder, metrics, _ = trained_model()
+        versions = [registry.publish(model, encoder, metrics, activate_version=False) for _ in range(3)]
+        self.assertEqual(registry.list_versions(), [active] + versions[1:])
+        self.assertEqual(registry.load().version, active)
+
+
+@override_settings(MODEL_REFRESH_INTERVAL=0, MODEL_REESTIMATE_INTERVAL=0)
+class PropertyEstimateTests(RegistryMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loaded = self.publish_model()
+
+        for i in range(5):
+            Property.objects.create(
+                title=f"House {i}", location="Lahore", price=3000000 + i * 100000, bedrooms=2 + i % 3,
+                bathrooms=1 + i % 2, area=3000 + i * 50, year_built=2000, parking=['2 cars', 'none'][i % 2],
+                slug=f"house-{i}",
+            )
+
+    def test_only_changed_features_or_versions_are_rescored(self):
+        self.assertEqual(reestimate_properties(self.loaded, chunk_size=2)['rescored'], 5)
+        rows = list(Property.objects.order_by('pk').values('estimated_price', 'bedrooms', 'bathrooms', 'area', 'parking'))
+        expected = self.loaded.model.predict(self.loaded.encoder.transform_rows([property_features(r) for r in rows]))
+        np.testing.assert_allclose([r['estimated_price'] for r in rows], expected, atol=0.01)
+        self.assertEqual(set(Property.objects.values_list('model_version', flat=True)), {self.loaded.version})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(reestimate_properties(self.loaded)['rescored'], 0)
+
+        Property.objects.filter(slug='house-0').update(title="Renamed")
+        Property.objects.filter(slug='house-1').update(area=9000)
+        result = reestimate_properties(self.loaded)
+        self.assertEqual((result['scanned'], result['rescored']), (5, 1))
+
+        Property.objects.filter(slug='house-2').update(model_version='older')
+        self.assertEqual(reestimate_properties(self.loaded)['rescored'], 1)
+        self.assertEqual(reestimate_properties(self.loaded, force=True)['rescored'], 5)
+
+    def test_a_worker_starting_on_a_new_version_schedules_a_checked_pass(self):
+        if estimates._timer is not None:
+            estimates._timer.cancel()  # left by listing saves in other tests
+        estimates._timer, estimates._scan_required = None, False
+
+        # A freshly started worker's first load: no database access, just a scheduled run
+        with self.settings(MODEL_REESTIMATE_INTERVAL=3600), self.assertNumQueries(0):
+            ModelHolder().get()
+        timer, estimates._timer = estimates._timer, None
+        self.addCleanup(timer.cancel)
+        self.assertFalse(estimates._scan_required)
+
+        self.assertEqual(estimates.scheduled_pass(False, self.loaded)['rescored'], 5)
+        with self.assertNumQueries(1):
+            self.assertIsNone(estimates.scheduled_pass(False, self.loaded))
+
+
+class AuditLogTests(RegistryMixin, TestCase):
+
+    def test_flush_writes_buffered_records_in_batches(self):
+        audit = AuditLog(batch_size=2, background=False)
+        for i in range(5):
+            self.assertTrue(audit.record((3, 2, 2, 5000 + i, 1, 0), 4e6, '20260101', 0.5, 'form'))
+        self.assertEqual(PredictionLog.objects.count(), 0)
+
+        self.assertEqual(audit.flush(), 5)
+        self.assertEqual(PredictionLog.objects.count(), 5)
+        self.assertEqual(audit.stats()['flushes'], 3)
+        self.assertEqual(audit.stats()['buffered'], 0)
+
+    def test_full_buffer_drops_after_timeout(self):
+        audit = AuditLog(max_buffer=2, block_timeout=0.01, background=False)
+        results = [audit.record((3, 2, 2, 5000, 1, 0), 4e6, '20260101', 0.5, 'batch') for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(audit.stats()['dropped'], 1)
+
+    def test_csv_jobs_are_summarised_unless_rows_are_opted_in(self):
+        loaded = self.publish_model()
+        self.addCleanup(setattr, audit, '_audit_log', audit._audit_log)
+        audit._audit_log = AuditLog(background=False)
+
+        lines = ["bedrooms,bathrooms,stories,area,guestroom,parking", "3,2,2,5000,yes,no", "3,2,2,huge,no,no"]
+        with self.assertLogs('HousePricePrediction.bulk_scoring', 'INFO') as logs:
+            list(score_csv(lines, loaded))
+        self.assertIn(f"2 rows, 1 errors, model {loaded.version}", logs.output[0])
+        self.assertEqual(audit._audit_log.stats()['recorded'], 0)
+
+        list(score_csv(lines, loaded, audit_rows=True))
+        audit._audit_log.flush()
+        logged = PredictionLog.objects.get()
+        self.assertEqual((logged.source, logged.model_version, logged.area), ('csv', loaded.version, 5000))
+
+
+class PredictBatchTests(RegistryMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loaded = self.publish_model()
+        self.addCleanup(setattr, audit, '_audit_log', audit._audit_log)
+        audit._audit_log = AuditLog(background=False)
+        log_in(self.client)
+
+    def post(self, body):
+        return self.client.post(reverse('predict_batch'), body, content_type='application/json')
+
+    def test_scores_valid_rows_and_reports_the_rest(self):
+        house = {'bedrooms': 3, 'bathrooms': 2, 'stories': 2, 'area': 5000, 'guestroom': 'yes', 'parking': 0}
+        records = [
+            house,
+            dict(house, area='inf'),
+            dict(house, bathrooms='nan'),
+            dict(house, area=float('inf')),  # sent as the JSON literal Infinity
+            dict(house, stories=2.5),
+            dict(house, bedrooms=-1),
+            dict(house, guestroom=2),
+            {k: v for k, v in house.items() if k != 'area'},
+            "not a record",
+        ]
+        response = self.post(json.dumps(records))
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['model_version'], body['count'], body['errors']), (self.loaded.version, 9, 8))
+
+        results = body['results']
+        expected = self.loaded.model.predict(self.loaded.encoder.transform_rows([(3, 2, 2, 5000, 1, 0)]))[0]
+        self.assertAlmostEqual(results[0]['price'], expected, delta=0.01)
+        self.assertEqual([item['error'] for item in results[1:]], [
+            "area is missing or not a number",
+            "bathrooms is missing or not a number",
+            "area is missing or not a number",
+            "stories must be an integer",
+            "bedrooms must not be negative",
+            "guestroom must be 0 or 1",
+            "area is missing or not a number",
+            "record must be an object",
+        ])
+        self.assertTrue(all(item['price'] is None for item in results[1:]))
+
+        self.assertEqual(audit._audit_log.flush(), 1)
+        self.assertEqual(PredictionLog.objects.get().source, 'batch')
+
+    @override_settings(PREDICTION_MAX_BATCH_SIZE=2)
+    def test_rejects_bad_bodies(self):
+        self.assertEqual(self.post("{not json").status_code, 400)
+        self.assertEqual(self.post(json.dumps({'records': 'none'})).status_code, 400)
+        self.assertEqual(self.post(json.dumps([{}, {}, {}])).status_code, 413)
+
+    @override_settings(PREDICTION_API_TOKENS=['s3cret'])
+    def test_needs_a_login_with_csrf_or_an_api_token(self):
+        body = json.dumps([{'bedrooms': 3, 'bathrooms': 2, 'stories': 2, 'area': 5000, 'guestroom': 1, 'parking': 0}])
+        url = reverse('predict_batch')
+        anonymous = Client(enforce_csrf_checks=True)
+        self.assertEqual(anonymous.post(url, body, content_type='application/json').status_code, 401)
+        self.assertEqual(anonymous.post(url, body, content_type='application/json',
+                                        HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.assertEqual(anonymous.post(url, body, content_type='application/json',
+                                        HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+        # A logged-in browser is held to the CSRF check a cross-site form would fail
+        browser = Client(enforce_csrf_checks=True)
+        log_in(browser)
+        self.assertEqual(browser.post(url, body, content_type='application/json').status_code, 403)
+        browser.get(reverse('predict'))  # the form page sets the CSRF cookie
+        response = browser.post(url, body, content_type='application/json',
+                                HTTP_X_CSRFTOKEN=browser.cookies['csrftoken'].value)
+        self.assertEqual(response.status_code, 200)
+
+
+class CsvScoringTests(RegistryMixin, TestCase):
+
+    lines = [
+        "Bedrooms,bathrooms,stories,area,guestroom,Parking,note",
+        "3,2,2,5000,yes,no,first",
+        "3,2,2,,yes,no,no area",
+        "4,1,1,3000,maybe,no,bad flag",
+        "2,1,1,1650,no,yes,last",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.loaded = self.publish_model()
+        self.addCleanup(setattr, audit, '_audit_log', audit._audit_log)
+        audit._audit_log = AuditLog(background=False)
+        log_in(self.client)
+
+    def test_appends_prices_and_row_errors_in_input_order(self):
+        stats = {}
+        output = list(csv.reader(io.StringIO(''.join(score_csv(self.lines, self.loaded, chunk_size=2, stats=stats)))))
+
+        self.assertEqual(output[0], self.lines[0].split(',') + ['predicted_price', 'prediction_error'])
+        self.assertEqual([row[6] for row in output[1:]], ['first', 'no area', 'bad flag', 'last'])
+        expected = self.loaded.model.predict(self.loaded.encoder.transform_rows([(3, 2, 2, 5000, 1, 0), (2, 1, 1, 1650, 0, 1)]))
+        self.assertAlmostEqual(float(output[1][7]), expected[0], delta=0.01)
+        self.assertAlmostEqual(float(output[4][7]), expected[1], delta=0.01)
+        self.assertEqual(output[2][7:], ['', 'area is missing or not a number'])
+        self.assertEqual(output[3][7:], ['', 'guestroom is missing or not a number'])
+        self.assertEqual(stats, {'rows': 4, 'errors': 2})
+
+        # Chunking changes nothing but memory use
+        self.assertEqual(''.join(score_csv(self.lines, self.loaded, chunk_size=100)),
+                         ''.join(score_csv(self.lines, self.loaded, chunk_size=1)))
+
+    def test_upload_is_streamed_back(self):
+        upload = SimpleUploadedFile('houses.csv', '\n'.join(self.lines).encode(), content_type='text/csv')
+        response = self.client.post(reverse('predict_csv'), {'file': upload})
+        self.assertEqual(response['X-Model-Version'], self.loaded.version)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body, ''.join(score_csv(self.lines, self.loaded)))
+        self.assertEqual(self.client.post(reverse('predict_csv')).status_code, 400)
+
+        with override_settings(PREDICTION_CSV_MAX_BYTES=10):
+            upload = SimpleUploadedFile('houses.csv', '\n'.join(self.lines).encode(), content_type='text/csv')
+            self.assertEqual(self.client.post(reverse('predict_csv'), {'file': upload}).status_code, 413)
+        upload = SimpleUploadedFile('houses.csv', '\n'.join(self.lines).encode(), content_type='text/csv')
+        self.assertEqual(Client().post(reverse('predict_csv'), {'file': upload}).status_code, 401)
+
+
+class BenchmarkCommandTests(RegistryMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.publish_model()
+        self.output = os.path.join(self.registry_dir, 'results.json')
+
+    def benchmark(self, **options):
+        out = io.StringIO()
+        call_command(
+            'benchmark_predictions', output=self.output, requests=5, cold_start_runs=1,
+            batch_sizes='10,1000', stdout=out, **options,
+        )
+        return out.getvalue()
+
+    def test_reports_metrics_and_compares_them_to_a_baseline(self):
+        self.addCleanup(setattr, audit, '_audit_log', audit._audit_log)
+        audit._audit_log = served_audit_log = AuditLog(background=False)
+        out = self.benchmark()
+        with open(self.output) as fh:
+            report = json.load(fh)
+        self.assertEqual(set(report['metrics']), {
+            'cold_start_import_ms', 'cold_start_rss_mb', 'prediction_p50_ms', 'prediction_p95_ms',
+            'prediction_p99_ms', 'batch_rows_per_s',
+        })
+        self.assertEqual(set(report['batch_rows_per_s_by_size']), {'10', '1000'})
+        self.assertIn(f"Results written to {self.output}", out)
+        # The run serves thousands of predictions without auditing any of them
+        self.assertIs(audit._audit_log, served_audit_log)
+        self.assertEqual(served_audit_log.stats()['recorded'], 0)
+
+        baseline = os.path.join(os.path.dirname(self.output), 'baseline.json')
+        with open(baseline, 'w') as fh:
+            json.dump(report, fh)
+        out = self.benchmark(baseline=baseline, threshold=100)
+        self.assertNotIn("REGRESSION", out)
+
+        report['metrics']['prediction_p50_ms'] = report['metrics']['prediction_p50_ms'] / 1000
+        with open(baseline, 'w') as fh:
+            json.dump(report, fh)
+        with self.assertRaisesMessage(CommandError, "prediction_p50_ms"):
+            self.benchmark(baseline=baseline, threshold=100)
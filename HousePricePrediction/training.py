@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+from . import dataset
+from .features import RAW_FEATURES, FeatureEncoder
+from .least_squares import LeastSquaresAccumulator
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), 'static', 'Housing.csv')
+TARGET_COLUMN = 'price'
+
+
+def load_dataset(path=DATA_PATH):
+    """Housing.csv as a DataFrame, memory-mapped from the typed columnar cache"""
+    return dataset.load_frame(path)
+
+
+def train_model(path=DATA_PATH, test_size=0.2, random_state=42):
+    """
+    Fit the feature encoder and the LinearRegression price model.
+
+    Returns (model, encoder, metrics, stats). The encoder carries the
+    frozen input schema and encoded column order the model was fitted on;
+    stats holds the least-squares sufficient statistics of the training
+    rows so the model can be refreshed incrementally later.
+    """
+    data = load_dataset(path)
+    data = data.dropna(subset=[TARGET_COLUMN])
+
+    X = data[list(RAW_FEATURES)]
+    y = data[TARGET_COLUMN]
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state
+    )
+
+    encoder = FeatureEncoder()
+    X_train = encoder.fit_transform(X_train)
+    X_test = encoder.transform(X_test)
+
+    model = LinearRegression()
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    stats = LeastSquaresAccumulator(X_train.shape[1])
+    stats.add(X_train, y_train)
+
+    metrics = {
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'rmse': float(mean_squared_error(y_test, y_pred) ** 0.5),
+        'train_rows': int(len(X_train)),
+        'test_rows': int(len(X_test)),
+    }
+    return model, encoder, metrics, stats
+
+
+def iter_chunks(path, chunk_size):
+    """Yield (raw feature matrix, target) per chunk of the CSV, never holding the whole file"""
+    import pandas as pd
+
+    encoder = FeatureEncoder()
+    for frame in pd.read_csv(path, chunksize=chunk_size):
+        frame.columns = frame.columns.str.strip().str.lower()
+        frame = frame.dropna(subset=[TARGET_COLUMN])
+        yield encoder.raw_matrix(frame), frame[TARGET_COLUMN].to_numpy(dtype=np.float64)
+
+
+def _holdout_masks(path, chunk_size, test_size, random_state):
+    """Same per-row train/test assignment on every pass, whatever the chunk size"""
+    rng = np.random.default_rng(random_state)
+    for raw, y in iter_chunks(path, chunk_size):
+        yield raw, y, rng.random(len(y)) < test_size
+
+
+def train_model_chunked(path=DATA_PATH, chunk_size=100000, test_size=0.2, random_state=42):
+    """
+    Out-of-core version of train_model for CSVs larger than memory.
+
+    Streams the file three times: once for the encoder's fill values,
+    once to accumulate XᵀX and Xᵀy for the training rows, and once to
+    score the holdout rows. Returns (model, encoder, metrics, stats) like
+    train_model.
+    """
+    encoder = FeatureEncoder()
+    width = len(encoder.output_columns)
+
+    sums, counts = np.zeros(width), np.zeros(width)
+    for raw, y, holdout in _holdout_masks(path, chunk_size, test_size, random_state):
+        train = raw[~holdout]
+        present = ~np.isnan(train)
+        sums += np.where(present, train, 0).sum(axis=0)
+        counts += present.sum(axis=0)
+    encoder.fit_from_sums(sums, counts)
+
+    stats = LeastSquaresAccumulator(width)
+    for raw, y, holdout in _holdout_masks(path, chunk_size, test_size, random_state):
+        stats.add(encoder.transform_rows(raw[~holdout]), y[~holdout])
+    model = stats.to_estimator()
+
+    test_rows, abs_error, squared_error = 0, 0.0, 0.0
+    for raw, y, holdout in _holdout_masks(path, chunk_size, test_size, random_state):
+        if holdout.any():
+            residual = model.predict(encoder.transform_rows(raw[holdout])) - y[holdout]
+            test_rows += len(residual)
+            abs_error += float(np.abs(residual).sum())
+            squared_error += float(residual @ residual)
+
+    metrics = {
+        'mae': abs_error / test_rows if test_rows else 0.0,
+        'rmse': (squared_error / test_rows) ** 0.5 if test_rows else 0.0,
+        'train_rows': int(stats.count),
+        'test_rows': int(test_rows),
+        'chunk_size': chunk_size,
+    }
+    return model, encoder, metrics, stats
@@ -6,6 +6,9 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('predict/', views.predict, name='predict'),
     path('prediction/', views.result, name='result'),
+    path('api/predict/batch/', views.predict_batch, name='predict_batch'),
+    path('api/predict/csv/', views.predict_csv, name='predict_csv'),
+    path('model/status/', views.model_status, name='model_status'),
     path('register/', views.register, name='register'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
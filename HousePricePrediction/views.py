@@ -1,25 +1,35 @@
-import pandas as pd
-import numpy as np
-from sklearn.impute import SimpleImputer
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-import joblib
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_protect
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.conf import settings
-from sklearn.preprocessing import OneHotEncoder
 import os
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.hashers import make_password, check_password
 from .models import UserProfile
-from .models import UserProfile
+from . import registry
+from .model_cache import holder as model_holder
+from .features import normalize_features
+from .batch import predict_records
+from .bulk_scoring import score_csv
+from .prediction_cache import get_cache as get_prediction_cache
+from .audit import get_audit_log
+from price_page.similar import similar_homes
+import hmac
+import io
+import logging
+import time
+from functools import wraps
+from django.http import StreamingHttpResponse
+import json
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_POST
 from django.contrib.auth.hashers import make_password, check_password
 
 from django.views.decorators.cache import never_cache  # ✅ THIS IMPORT IS REQUIRED
 
+logger = logging.getLogger(__name__)
+
 
 
 @csrf_protect
@@ -173,127 +183,168 @@ def result(request):
     return render(request, 'result.html', context)
 
 
-
-
-
-
-
-file_path = os.path.join(os.path.dirname(__file__), 'static', 'Housing.csv')
-data = pd.read_csv(file_path)
-data = pd.read_csv(file_path)
-#data = data.drop(columns=['price'])
-#data.head()
-
-#print("Missing values before handling:")
-#print(data.isnull().sum())
-imputer = SimpleImputer(strategy="mean")
-
-numeric_columns = data.select_dtypes(include=['number']).columns
-non_numeric_columns = data.select_dtypes(exclude=['number']).columns
-
-
-data[numeric_columns] = pd.DataFrame(
-imputer.fit_transform(data[numeric_columns]),
-columns=numeric_columns
-)
-
-#print("Missing values after handling:")
-#print(data.isnull().sum())
-
-data.columns = data.columns.str.strip().str.lower()  # Remove spaces and convert to lowercase
-
-#print(data.columns)
-
-
-X = ['bedrooms', 'bathrooms', 'stories', 'area', 'guestroom', 'parking']
-columns_to_select = ['bedrooms', 'bathrooms', 'stories', 'area', 'guestroom', 'parking']
-try:
-        X = data[columns_to_select]
-        #print("Columns selected successfully!")
-except KeyError as e:
-        print(f"Error selecting columns: {e}")
-    #print(X.head())
-y = data['price'] 
-test_size = 0.2  # 80% for training and 20% for testing
-random_state = 42
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
-
-#print(X_train.isnull().sum())  # For features
-#print(y_train.isnull().sum()) 
-
-X_train = X_train.dropna()
-y_train = y_train[X_train.index]
-
-X_train = pd.get_dummies(X_train, drop_first=True)
-X_test = pd.get_dummies(X_test, drop_first=True)
-
-print(X_train.shape)
-print(y_train.shape)
-
-model = LinearRegression()
-model.fit(X_train, y_train)
-y_pred = model.predict(X_test)
-
-joblib.dump(model, 'housing_model.pkl')
-print("Model trained and saved successfully.")
-
+def predict_price(loaded, features):
+    """Score one validated feature tuple, using the compiled predictor when available"""
+    if loaded.predictor is not None and getattr(settings, 'PREDICTION_MODE', 'compiled') == 'compiled':
+        return loaded.predictor.predict_one(features)
+    return loaded.model.predict(loaded.encoder.transform_rows([features]))[0]
 
 
 def result(request):
-    # Load the pre-trained model
+    # Active model version, kept in memory and hot-reloaded on publish
     try:
-        model = joblib.load('housing_model.pkl')
-    except FileNotFoundError:
+        loaded = model_holder.get()
+    except registry.ModelNotFound:
         return HttpResponse("Model not found. Please train the model first.", status=500)
 
     if request.method == 'POST':
         try:
-            # Retrieving input values and ensuring they're converted to integers
-            bedroom = int(request.POST.get('bedroom'))
-            bathroom = int(request.POST.get('bathroom'))
-            stories = int(request.POST.get('stories'))
-            area = int(request.POST.get('area'))
-        
             # Get guestroom and parking values as integers (1 or 0)
-            guestroom = int(request.POST.get('guestroom'))  # Will be 1 or 0 based on the selection
-            parking = int(request.POST.get('parking'))     # Will be 1 or 0 based on the selection
+            features = normalize_features(
+                request.POST.get('bedroom'),
+                request.POST.get('bathroom'),
+                request.POST.get('stories'),
+                request.POST.get('area'),
+                request.POST.get('guestroom'),  # Will be 1 or 0 based on the selection
+                request.POST.get('parking'),    # Will be 1 or 0 based on the selection
+            )
+        except ValueError as e:
+            return HttpResponse(f"Invalid input: {e}", status=400)
 
-            
-# New input data (ensure values for bedroom, bathroom, stories, area, guestroom, and parking are provided)
-            new_data = pd.DataFrame({
-                                        'bedrooms': [bedroom],
-                                        'bathrooms': [bathroom],
-                                        'stories': [stories],
-                                        'area': [area],
-                                        'guestroom_yes': [guestroom ],  # Correct ternary logic
-                                        'parking_yes': [parking],    # Correct ternary logic
-                                    })
+        try:
+            started = time.perf_counter()
+            predicted_price = get_prediction_cache().get_or_compute(
+                loaded.version, features, lambda: predict_price(loaded, features)
+            )
+            latency_ms = (time.perf_counter() - started) * 1000
+            get_audit_log().record(features, predicted_price, loaded.version, latency_ms, 'form')
+
+            rounded_predicted_price = round(predicted_price)
+            readable_price = f"{rounded_predicted_price:,}"
 
+            # Listings closest to the described house at the predicted price
+            bedrooms, bathrooms, _, area, _, _ = features
+            try:
+                similar = similar_homes([bedrooms, bathrooms, area, predicted_price])
+            except Exception:
+                # The prediction stands on its own; show it without comparables
+                logger.exception("Similar-homes lookup failed")
+                similar = []
 
-            imputer = SimpleImputer(strategy="mean")
-            new_data_imputed = pd.DataFrame(imputer.fit_transform(new_data), columns=new_data.columns)
+            return render(request, 'pridct.html', {'predicted_price': readable_price, 'similar_homes': similar})
 
+        except Exception as e:
+            return HttpResponse(f"Error during prediction: {e}", status=500)
 
-            new_data_encoded = pd.get_dummies(new_data_imputed, drop_first=True)
 
 
-            new_data_encoded = new_data_encoded.reindex(columns=X_train.columns, fill_value=0)
-            # Find missing columns between new data and model's columns
-            predicted_price = model.predict(new_data_encoded)
+    return HttpResponse("Invalid request method.", status=405)
 
-            
-            rounded_predicted_price = round(predicted_price[0])
-            readable_price = f"{rounded_predicted_price:,}"
+def pridct(request):
+    return render(request, 'pridct.html')
+
+
+def _has_api_token(request):
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return False
+    return any(
+        hmac.compare_digest(token.encode(), allowed.encode())
+        for allowed in getattr(settings, 'PREDICTION_API_TOKENS', ())
+    )
+
+
+def prediction_api(view):
+    """
+    Let in logged-in users, with the usual CSRF check, and scripts
+    sending a PREDICTION_API_TOKENS bearer token. A header token is not
+    sent by browsers on their own, so those requests skip the CSRF check.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if _has_api_token(request):
+            return view(request, *args, **kwargs)
+        if not request.session.get('user_id'):
+            return JsonResponse({'error': "Log in or send an API token"}, status=401)
+        return protected(request, *args, **kwargs)
+    return wrapped
+
+
+@prediction_api
+@require_POST
+def predict_batch(request):
+    """
+    Score many houses in one request.
+
+    Body: {"records": [{"bedrooms": 3, "bathrooms": 2, "stories": 2,
+    "area": 5000, "guestroom": 1, "parking": 0}, ...]} (a bare list works too).
+    """
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': "Body must be valid JSON"}, status=400)
 
-            return render(request, 'pridct.html', {'predicted_price': readable_price })
+    records = payload.get('records') if isinstance(payload, dict) else payload
+    if not isinstance(records, list):
+        return JsonResponse({'error': "Expected a list of records"}, status=400)
 
-        except Exception as e:
-            return HttpResponse(f"Error during prediction: {e}", status=500)
+    max_batch = getattr(settings, 'PREDICTION_MAX_BATCH_SIZE', 5000)
+    if len(records) > max_batch:
+        return JsonResponse({'error': f"Batch too large: {len(records)} records, limit is {max_batch}"}, status=413)
+
+    try:
+        loaded = model_holder.get()
+    except registry.ModelNotFound:
+        return JsonResponse({'error': "Model not found. Please train the model first."}, status=500)
+
+    started = time.perf_counter()
+
+    def audit(rows, prices):
+        if len(rows):
+            latency_ms = (time.perf_counter() - started) * 1000 / len(rows)
+            get_audit_log().record_many(rows, prices, loaded.version, latency_ms, 'batch')
+
+    results = predict_records(loaded, records, on_scored=audit)
+    return JsonResponse({
+        'model_version': loaded.version,
+        'count': len(results),
+        'errors': sum(1 for item in results if item['error']),
+        'results': results,
+    })
+
+
+@prediction_api
+@require_POST
+def predict_csv(request):
+    """Score an uploaded CSV (Housing.csv columns) and stream it back with predicted_price"""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'error': "Upload the CSV as the 'file' field"}, status=400)
+
+    max_bytes = getattr(settings, 'PREDICTION_CSV_MAX_BYTES', 50 * 1024 * 1024)
+    if upload.size > max_bytes:
+        return JsonResponse({'error': f"File too large: {upload.size} bytes, limit is {max_bytes}"}, status=413)
 
+    try:
+        loaded = model_holder.get()
+    except registry.ModelNotFound:
+        return JsonResponse({'error': "Model not found. Please train the model first."}, status=500)
 
+    chunk_size = getattr(settings, 'PREDICTION_CSV_CHUNK_SIZE', 10000)
+    lines = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
 
-    return HttpResponse("Invalid request method.", status=405)
+    response = StreamingHttpResponse(score_csv(lines, loaded, chunk_size), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="predictions.csv"'
+    response['X-Model-Version'] = loaded.version
+    return response
 
-def pridct(request):
-    return render(request, 'pridct.html')
\ No newline at end of file
+
+def model_status(request):
+    """Expose the in-process model, prediction cache and audit log counters"""
+    status = model_holder.stats()
+    status['prediction_cache'] = get_prediction_cache().stats()
+    status['audit_log'] = get_audit_log().stats()
+    return JsonResponse(status)
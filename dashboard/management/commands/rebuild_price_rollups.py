@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the location and day/week/month price rollups from every Property listing"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {rows} rollup rows in {(time.perf_counter() - started) * 1000:.0f} ms"
+        ))
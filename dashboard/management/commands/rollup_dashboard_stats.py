@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.models import SummaryCounter
+from dashboard.stats import rollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized dashboard counters from the source tables (run periodically)"
+
+    def handle(self, *args, **options):
+        before = dict(SummaryCounter.objects.values_list('name', 'value'))
+        for name, value in rollup().items():
+            drift = value - before[name] if name in before else None
+            note = "new" if drift is None else f"drift {drift:+,.0f}"
+            self.stdout.write(f"{name:>18}: {value:,.0f} ({note})")
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=10)),
+                ('bucket', models.CharField(max_length=200)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('price_sum', models.FloatField(default=0)),
+                ('min_price', models.FloatField(null=True)),
+                ('max_price', models.FloatField(null=True)),
+                ('sketch', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['dimension', 'bucket'],
+                'unique_together': {('dimension', 'bucket')},
+            },
+        ),
+    ]
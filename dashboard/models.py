@@ -1,3 +1,31 @@
 from django.db import models
 
-# Create your models here.
+
+
+class SummaryCounter(models.Model):
+    """One materialized dashboard figure, kept current by signals (see stats.py)"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class PriceRollup(models.Model):
+    """Property price statistics for one location or one day/week/month of created_at (see rollups.py)"""
+    dimension = models.CharField(max_length=10)  # 'location', 'day', 'week' or 'month'
+    bucket = models.CharField(max_length=200)  # location name, or ISO date the period starts on
+    count = models.PositiveIntegerField(default=0)
+    price_sum = models.FloatField(default=0)
+    min_price = models.FloatField(null=True)
+    max_price = models.FloatField(null=True)
+    sketch = models.JSONField(default=dict)  # log-bucketed price histogram for quantiles
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('dimension', 'bucket')
+        ordering = ['dimension', 'bucket']
+
+    def __str__(self):
+        return f"{self.dimension} {self.bucket}: {self.count}"
@@ -0,0 +1,170 @@
+"""
+Pre-aggregated Property price statistics for the dashboard charts.
+
+Each listing counts towards one PriceRollup row per dimension: its
+location, and the day, week (starting Monday) and month of created_at.
+A row keeps count, sum, min, max and a sparse log-bucketed histogram of
+prices. Bucket i covers [GAMMA**i, GAMMA**(i+1)), so quantiles read from
+it are within about 2.5% of the exact value, and a listing can be taken
+back out of the histogram exactly when it is edited or deleted.
+
+Rows are adjusted in place from Property signals, and once per batch
+after bulk imports. The min/max of a row is re-queried only when a
+removed price was its current min or max.
+`manage.py rebuild_price_rollups` recomputes everything from scratch.
+"""
+import math
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import PriceRollup
+
+DIMENSIONS = ('location', 'day', 'week', 'month')
+QUANTILES = (0.25, 0.5, 0.75, 0.9)
+GAMMA = 1.05
+_LOG_GAMMA = math.log(GAMMA)
+
+
+def sketch_index(price):
+    return int(math.floor(math.log(max(price, 1)) / _LOG_GAMMA))
+
+
+def bucket_keys(location, created_at):
+    """(dimension, bucket) pairs a listing belongs to"""
+    day = timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+    return [
+        ('location', location),
+        ('day', day.isoformat()),
+        ('week', (day - timedelta(days=day.weekday())).isoformat()),
+        ('month', day.replace(day=1).isoformat()),
+    ]
+
+
+def _bucket_listings(dimension, bucket):
+    from price_page.models import Property
+
+    if dimension == 'location':
+        return Property.objects.filter(location=bucket)
+
+    start = date.fromisoformat(bucket)
+    if dimension == 'day':
+        end = start + timedelta(days=1)
+    elif dimension == 'week':
+        end = start + timedelta(days=7)
+    else:
+        end = (start + timedelta(days=32)).replace(day=1)
+    tz = timezone.get_current_timezone()
+    return Property.objects.filter(
+        created_at__gte=datetime.combine(start, time.min, tzinfo=tz),
+        created_at__lt=datetime.combine(end, time.min, tzinfo=tz),
+    )
+
+
+def apply(location, created_at, price, sign=1):
+    """Fold one listing into (sign=1) or out of (sign=-1) every rollup it belongs to"""
+    apply_many([(location, created_at, price, sign)])
+
+
+def apply_many(changes):
+    """
+    Fold many (location, created_at, price, sign) changes in at once,
+    locking and writing each affected rollup row once; bulk imports
+    send no Property signals and call this instead.
+    """
+    deltas = {}
+    for location, created_at, price, sign in changes:
+        price = float(price)
+        index = str(sketch_index(price))
+        for key in bucket_keys(location, created_at):
+            delta = deltas.setdefault(key, {'count': 0, 'price_sum': 0.0, 'sketch': {}, 'added': [], 'removed': []})
+            delta['count'] += sign
+            delta['price_sum'] += sign * price
+            delta['sketch'][index] = delta['sketch'].get(index, 0) + sign
+            delta['added' if sign > 0 else 'removed'].append(price)
+
+    with transaction.atomic():
+        # A fixed lock order, so concurrent imports cannot deadlock on each other's rows
+        for (dimension, bucket), delta in sorted(deltas.items()):
+            row, _ = PriceRollup.objects.select_for_update().get_or_create(dimension=dimension, bucket=bucket)
+            row.count += delta['count']
+            if row.count <= 0:
+                row.delete()
+                continue
+
+            row.price_sum += delta['price_sum']
+            for index, change in delta['sketch'].items():
+                remaining = row.sketch.get(index, 0) + change
+                if remaining > 0:
+                    row.sketch[index] = remaining
+                else:
+                    row.sketch.pop(index, None)
+
+            if row.min_price is not None and any(
+                price <= row.min_price or price >= row.max_price for price in delta['removed']
+            ):
+                # The extreme may have left; the bucket's own rows say what it is now
+                bounds = _bucket_listings(dimension, bucket).aggregate(low=Min('price'), high=Max('price'))
+                row.min_price, row.max_price = bounds['low'], bounds['high']
+            elif delta['added']:
+                low, high = min(delta['added']), max(delta['added'])
+                row.min_price = low if row.min_price is None else min(row.min_price, low)
+                row.max_price = high if row.max_price is None else max(row.max_price, high)
+            row.save()
+
+
+def rebuild():
+    """Recompute every rollup from the listings; returns the number of rows written"""
+    from price_page.models import Property
+
+    rows = {}
+    listings = Property.objects.values_list('location', 'created_at', 'price')
+    for location, created_at, price in listings.iterator(chunk_size=2000):
+        price = float(price)
+        index = str(sketch_index(price))
+        for key in bucket_keys(location, created_at):
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = PriceRollup(
+                    dimension=key[0], bucket=key[1], min_price=price, max_price=price, sketch={},
+                )
+            row.count += 1
+            row.price_sum += price
+            row.min_price = min(row.min_price, price)
+            row.max_price = max(row.max_price, price)
+            row.sketch[index] = row.sketch.get(index, 0) + 1
+
+    with transaction.atomic():
+        PriceRollup.objects.all().delete()
+        PriceRollup.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
+
+
+def quantile(row, q):
+    """Approximate q-quantile of a rollup's prices from its histogram"""
+    if not row.count:
+        return None
+    target = q * (row.count - 1)
+    seen = 0
+    for index, count in sorted((int(i), c) for i, c in row.sketch.items()):
+        seen += count
+        if seen > target:
+            # Geometric midpoint of the bucket, clamped to the exact extremes
+            estimate = GAMMA ** (index + 0.5)
+            return round(min(max(estimate, row.min_price), row.max_price), 2)
+    return row.max_price
+
+
+def summarize(row):
+    summary = {
+        'bucket': row.bucket,
+        'count': row.count,
+        'mean': round(row.price_sum / row.count, 2),
+        'min': row.min_price,
+        'max': row.max_price,
+    }
+    for q in QUANTILES:
+        summary[f"p{round(q * 100)}"] = quantile(row, q)
+    return summary
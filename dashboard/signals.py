@@ -0,0 +1,65 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from HousePricePrediction.audit import predictions_logged
+from price_page.importer import listings_imported
+
+from . import rollups, stats
+
+
+@receiver(post_save, sender='accounts.UserProfile')
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        stats.increment(total_users=1)
+
+
+@receiver(post_delete, sender='accounts.UserProfile')
+def user_deleted(sender, instance, **kwargs):
+    stats.increment(total_users=-1)
+
+
+@receiver(pre_save, sender='price_page.Property')
+def remember_stored(sender, instance, **kwargs):
+    """Keep the stored price, location and created_at so post_save can apply the difference"""
+    instance._stored = None
+    if instance.pk is not None:
+        instance._stored = sender.objects.filter(pk=instance.pk).values('price', 'location', 'created_at').first()
+
+
+@receiver(post_save, sender='price_page.Property')
+def property_saved(sender, instance, created, **kwargs):
+    stored = getattr(instance, '_stored', None)
+    if created:
+        stats.increment(total_houses=1, price_sum=instance.price)
+        rollups.apply(instance.location, instance.created_at, instance.price)
+    elif stored is not None:
+        stats.increment(price_sum=instance.price - stored['price'])
+        if (stored['price'], stored['location']) != (instance.price, instance.location):
+            rollups.apply(stored['location'], stored['created_at'], stored['price'], sign=-1)
+            rollups.apply(instance.location, instance.created_at, instance.price)
+
+
+@receiver(post_delete, sender='price_page.Property')
+def property_deleted(sender, instance, **kwargs):
+    stats.increment(total_houses=-1, price_sum=-instance.price)
+    rollups.apply(instance.location, instance.created_at, instance.price, sign=-1)
+
+
+@receiver(listings_imported)
+def properties_imported(sender, created, updated, **kwargs):
+    stats.increment(
+        total_houses=len(created),
+        price_sum=sum(listing.price for listing in created)
+        + sum(listing.price - stored['price'] for listing, stored in updated),
+    )
+    changes = [(listing.location, listing.created_at, listing.price, 1) for listing in created]
+    for listing, stored in updated:
+        if (stored['price'], stored['location']) != (listing.price, listing.location):
+            changes.append((stored['location'], stored['created_at'], stored['price'], -1))
+            changes.append((listing.location, listing.created_at, listing.price, 1))
+    rollups.apply_many(changes)
+
+
+@receiver(predictions_logged)
+def predictions_written(sender, interactive, **kwargs):
+    stats.increment(total_predictions=interactive)
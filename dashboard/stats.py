@@ -0,0 +1,91 @@
+"""
+Materialized dashboard figures.
+
+Counters live in SummaryCounter rows and are adjusted in place by signal
+handlers (users and listings) and by the prediction audit flusher, so
+reading the dashboard costs a cache lookup, or at worst one small query,
+however large the underlying tables grow. Writes that bypass signals
+(queryset.update(), raw SQL) are corrected by `manage.py
+rollup_dashboard_stats`, which recomputes every counter from scratch.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import SummaryCounter
+
+CACHE_KEY = 'dashboard:stats'
+COUNTERS = ('total_users', 'total_houses', 'price_sum', 'total_predictions')
+
+
+def _cache_timeout():
+    return getattr(settings, 'DASHBOARD_STATS_CACHE_TTL', 30)
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
+
+
+def increment(**deltas):
+    """Add to counters atomically, e.g. increment(total_houses=1, price_sum=4500000)"""
+    now = timezone.now()
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        updated = SummaryCounter.objects.filter(name=name).update(value=F('value') + delta, updated_at=now)
+        if not updated:
+            # Never materialized: a full rollup already includes this change
+            rollup()
+            return
+    transaction.on_commit(invalidate)
+
+
+def compute():
+    """Every counter computed from the source tables (full scans; not for the request path)"""
+    from accounts.models import UserProfile
+    from HousePricePrediction.audit import BULK_SOURCES
+    from HousePricePrediction.models import PredictionLog
+    from price_page.models import Property
+
+    houses = Property.objects.aggregate(count=Count('id'), total=Sum('price'))
+    return {
+        'total_users': UserProfile.objects.count(),
+        'total_houses': houses['count'],
+        'price_sum': houses['total'] or 0,
+        'total_predictions': PredictionLog.objects.exclude(source__in=BULK_SOURCES).count(),
+    }
+
+
+def rollup():
+    """Recompute and store every counter; returns the stored values"""
+    values = compute()
+    with transaction.atomic():
+        for name, value in values.items():
+            SummaryCounter.objects.update_or_create(name=name, defaults={'value': value})
+    transaction.on_commit(invalidate)
+    return values
+
+
+def get_stats():
+    """Dashboard figures plus the time they were last changed, served from cache"""
+    stats = cache.get(CACHE_KEY)
+    if stats is not None:
+        return stats
+
+    rows = {row.name: row for row in SummaryCounter.objects.filter(name__in=COUNTERS)}
+    if len(rows) < len(COUNTERS):
+        rollup()
+        rows = {row.name: row for row in SummaryCounter.objects.filter(name__in=COUNTERS)}
+
+    houses = int(rows['total_houses'].value)
+    stats = {
+        'total_users': int(rows['total_users'].value),
+        'total_houses': houses,
+        'avg_price': rows['price_sum'].value / houses if houses else 0,
+        'total_predictions': int(rows['total_predictions'].value),
+        'updated_at': max(row.updated_at for row in rows.values()),
+    }
+    cache.set(CACHE_KEY, stats, _cache_timeout())
+    return stats
@@ -1,3 +1,81 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import UserProfile
+from HousePricePrediction.audit import AuditLog
+from price_page.models import Property
+
+from . import rollups, stats
+from .models import PriceRollup
+
+
+class DashboardStatsTests(TestCase):
+
+    def make_property(self, i, price):
+        return Property.objects.create(
+            title=f"House {i}", location="Lahore", price=price, bedrooms=3, bathrooms=2,
+            area=5000, year_built=2000, parking='1 car', slug=f"house-{i}",
+        )
+
+    def test_signals_keep_counters_equal_to_a_full_rollup(self):
+        stats.rollup()
+        houses = [self.make_property(i, 1000000 * (i + 1)) for i in range(4)]
+        houses[0].price = 7000000
+        houses[0].save()
+        houses[1].delete()
+        UserProfile.objects.create(full_name="A", email="a@example.com", phone="1", address="x", password="x")
+
+        audit = AuditLog(background=False)
+        audit.record_many([(3, 2, 2, 5000, 1, 0)] * 3, [4e6] * 3, '20260101', 0.5, 'batch')
+        # Bulk file scoring is audited but is not a served prediction
+        audit.record_many([(3, 2, 2, 5000, 1, 0)] * 2, [4e6] * 2, '20260101', 0.1, 'csv')
+        audit.flush()
+
+        stats.invalidate()
+        served = stats.get_stats()
+        expected = stats.compute()
+        self.assertEqual(served['total_houses'], expected['total_houses'])
+        self.assertEqual(served['total_users'], expected['total_users'])
+        self.assertEqual(served['total_predictions'], 3)
+        self.assertEqual(expected['total_predictions'], 3)
+        self.assertAlmostEqual(served['avg_price'], expected['price_sum'] / expected['total_houses'])
+
+    def test_served_from_cache(self):
+        stats.get_stats()
+        with self.assertNumQueries(0):
+            stats.get_stats()
+
+
+class PriceRollupTests(TestCase):
+
+    def make_property(self, i, price, location):
+        return Property.objects.create(
+            title=f"House {i}", location=location, price=price, bedrooms=3, bathrooms=2,
+            area=5000, year_built=2000, parking='1 car', slug=f"house-{i}",
+        )
+
+    def snapshot(self):
+        return {
+            (row.dimension, row.bucket): (row.count, round(row.price_sum), row.min_price, row.max_price, row.sketch)
+            for row in PriceRollup.objects.all()
+        }
+
+    def test_incremental_updates_match_rebuild(self):
+        houses = [self.make_property(i, 1000000 + i * 250000, ['Lahore', 'Karachi'][i % 2]) for i in range(8)]
+        houses[0].price = 9000000
+        houses[0].save()
+        houses[2].location = 'Islamabad'
+        houses[2].save()
+        houses[7].delete()  # the Karachi maximum
+
+        incremental = self.snapshot()
+        rollups.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_quantiles_are_close(self):
+        prices = [1000000 + i * 37000 for i in range(200)]
+        for i, price in enumerate(prices):
+            self.make_property(i, price, 'Lahore')
+        summary = rollups.summarize(PriceRollup.objects.get(dimension='location', bucket='Lahore'))
+        self.assertEqual(summary['count'], 200)
+        self.assertEqual(summary['max'], max(prices))
+        self.assertAlmostEqual(summary['p50'], sorted(prices)[100], delta=sorted(prices)[100] * 0.03)
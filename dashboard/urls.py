@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import dashboard
+from .views import dashboard, price_rollups
 
 urlpatterns = [
     path('', dashboard, name='dashboard'),
+    path('api/price-rollups/', price_rollups, name='price_rollups'),
 ]
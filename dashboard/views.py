@@ -1,17 +1,56 @@
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
-from accounts.models import UserProfile
+from .models import PriceRollup
+from .rollups import DIMENSIONS, rebuild, summarize
+from .stats import get_stats
 
 def dashboard(request):
     if not request.session.get('user_id'):
         return redirect('login')
 
-    total_users = UserProfile.objects.count()
+    # Materialized counters, not live aggregates (see stats.py)
+    stats = get_stats()
 
     context = {
-        'total_users': total_users,
-        'total_houses': 0,
-        'total_predictions': 0,
-        'avg_price': 0,
+        'total_users': stats['total_users'],
+        'total_houses': stats['total_houses'],
+        'total_predictions': stats['total_predictions'],
+        'avg_price': stats['avg_price'],
+        'stats_updated_at': stats['updated_at'],
     }
 
-    return render(request, 'dashboard/dashboard.html')
+    return render(request, 'dashboard/dashboard.html', context)
+
+
+def price_rollups(request):
+    """
+    Pre-aggregated listing prices for the dashboard charts.
+
+    ?dimension=location|day|week|month (default month) and ?limit=N: the
+    latest N periods oldest first, or the N locations with most listings.
+    """
+    if not request.session.get('user_id'):
+        return JsonResponse({'error': "Login required"}, status=403)
+
+    dimension = request.GET.get('dimension', 'month')
+    if dimension not in DIMENSIONS:
+        return JsonResponse({'error': f"dimension must be one of {', '.join(DIMENSIONS)}"}, status=400)
+    try:
+        limit = min(max(int(request.GET.get('limit', 366)), 1), 1000)
+    except ValueError:
+        return JsonResponse({'error': "limit must be an integer"}, status=400)
+
+    rows = PriceRollup.objects.filter(dimension=dimension)
+    if not rows.exists() and not PriceRollup.objects.exists():
+        rebuild()  # first use on a database that predates the rollups
+
+    if dimension == 'location':
+        rows = list(rows.order_by('-count', 'bucket')[:limit])
+    else:
+        rows = list(rows.order_by('-bucket')[:limit])[::-1]
+
+    return JsonResponse({
+        'dimension': dimension,
+        'updated_at': max((row.updated_at for row in rows), default=None),
+        'buckets': [summarize(row) for row in rows],
+    })
@@ -0,0 +1,99 @@
+"""
+Cached facet counts for the listing's filter sidebar.
+
+Counts are computed for the current filter set and cached under a key
+that includes a listing generation number. Any Property save or delete
+bumps the generation (see signals.py), which retires every cached facet
+set at once without having to know which filter combinations exist.
+
+The generation is a database row, not a cache entry: the default cache
+is per process, and a bump made by one worker or a management command
+must change the keys every other worker computes.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .forms import BEDROOM_CHOICES
+from .models import ListingGeneration
+
+# (label, min price, max price) quick ranges for the sidebar
+PRICE_BANDS = [
+    ('Under 3M', None, 3000000),
+    ('3M - 5M', 3000000, 5000000),
+    ('5M - 8M', 5000000, 8000000),
+    ('8M and above', 8000000, None),
+]
+
+
+def generation_state():
+    """(generation, when it was last bumped) in one query"""
+    row = ListingGeneration.objects.filter(pk=1).values_list('value', 'changed_at').first()
+    if row is None:
+        stored, _ = ListingGeneration.objects.get_or_create(pk=1)
+        row = (stored.value, stored.changed_at)
+    return row
+
+
+def generation():
+    return generation_state()[0]
+
+
+def bump_generation():
+    now = timezone.now()
+    if not ListingGeneration.objects.filter(pk=1).update(value=F('value') + 1, changed_at=now):
+        ListingGeneration.objects.get_or_create(pk=1, defaults={'value': 2, 'changed_at': now})
+
+
+def last_change():
+    """When any listing last changed, or None if nothing has been bumped yet"""
+    return generation_state()[1]
+
+
+def _band_filter(low, high):
+    condition = Q()
+    if low is not None:
+        condition &= Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+def compute_facets(queryset):
+    bands = queryset.aggregate(
+        total=Count('id'),
+        **{f"band_{i}": Count('id', filter=_band_filter(low, high)) for i, (_, low, high) in enumerate(PRICE_BANDS)},
+    )
+    bedrooms = dict(queryset.order_by().values_list('bedrooms').annotate(n=Count('id')))
+    return {
+        'total': bands['total'],
+        'locations': list(
+            queryset.order_by().values('location').annotate(count=Count('id')).order_by('-count', 'location')[:20]
+        ),
+        'bedrooms': [
+            {
+                'value': value, 'label': label,
+                'count': sum(n for beds, n in bedrooms.items() if beds >= 4) if value == '4+' else bedrooms.get(int(value), 0),
+            }
+            for value, label in BEDROOM_CHOICES
+        ],
+        'price_bands': [
+            {'label': label, 'min_price': low, 'max_price': high, 'count': bands[f"band_{i}"]}
+            for i, (label, low, high) in enumerate(PRICE_BANDS)
+        ],
+    }
+
+
+def facet_counts(queryset, filters):
+    """Facets of `queryset` (already narrowed by `filters`), cached until any listing changes"""
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"price_page:facets:{generation()}:{digest}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, getattr(settings, 'PROPERTY_FACET_CACHE_TTL', 600))
+    return facets
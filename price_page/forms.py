@@ -0,0 +1,81 @@
+from django import forms
+from django.db.models import Q
+
+# sort parameter -> (keyset column, descending)
+SORTS = {
+    'newest': ('created_at', True),
+    'oldest': ('created_at', False),
+    'price_asc': ('price', False),
+    'price_desc': ('price', True),
+    'price_per_sqft_asc': ('price_per_sqft', False),
+    'price_per_sqft_desc': ('price_per_sqft', True),
+    'area_desc': ('area', True),
+}
+
+SORT_CHOICES = [
+    ('newest', 'Newest first'),
+    ('oldest', 'Oldest first'),
+    ('price_asc', 'Price: low to high'),
+    ('price_desc', 'Price: high to low'),
+    ('price_per_sqft_asc', 'Price per sq.ft: low to high'),
+    ('price_per_sqft_desc', 'Price per sq.ft: high to low'),
+    ('area_desc', 'Largest first'),
+]
+
+BEDROOM_CHOICES = [('1', '1 Bedroom'), ('2', '2 Bedrooms'), ('3', '3 Bedrooms'), ('4+', '4+ Bedrooms')]
+
+
+class PropertyFilterForm(forms.Form):
+    """Listing filters and sort order, read from the query string"""
+    q = forms.CharField(required=False, max_length=200)
+    location = forms.CharField(required=False, max_length=200)
+    min_price = forms.IntegerField(required=False, min_value=0)
+    max_price = forms.IntegerField(required=False, min_value=0)
+    bedrooms = forms.MultipleChoiceField(required=False, choices=BEDROOM_CHOICES)
+    min_bathrooms = forms.IntegerField(required=False, min_value=0)
+    min_area = forms.IntegerField(required=False, min_value=0)
+    max_area = forms.IntegerField(required=False, min_value=0)
+    sort = forms.ChoiceField(required=False, choices=SORT_CHOICES)
+
+    def filters(self):
+        """Cleaned filter values that are set, in a stable order (invalid fields are ignored)"""
+        self.is_valid()
+        data = getattr(self, 'cleaned_data', {})
+        return {
+            name: data[name] for name in self.fields
+            if name not in ('sort', 'q') and data.get(name) not in (None, '', [])
+        }
+
+    def search_query(self):
+        self.is_valid()
+        return (getattr(self, 'cleaned_data', {}).get('q') or '').strip()
+
+    def sort_key(self):
+        self.is_valid()
+        return SORTS[getattr(self, 'cleaned_data', {}).get('sort') or 'newest']
+
+    def filter_queryset(self, queryset):
+        filters = self.filters()
+        if 'location' in filters:
+            queryset = queryset.filter(location=filters['location'])
+        if 'min_price' in filters:
+            queryset = queryset.filter(price__gte=filters['min_price'])
+        if 'max_price' in filters:
+            queryset = queryset.filter(price__lte=filters['max_price'])
+        if 'bedrooms' in filters:
+            exact = [int(value) for value in filters['bedrooms'] if value != '4+']
+            condition = Q(bedrooms__in=exact)
+            if '4+' in filters['bedrooms']:
+                condition |= Q(bedrooms__gte=4)
+            queryset = queryset.filter(condition)
+        if 'min_bathrooms' in filters:
+            queryset = queryset.filter(bathrooms__gte=filters['min_bathrooms'])
+        if 'min_area' in filters:
+            queryset = queryset.filter(area__gte=filters['min_area'])
+        if 'max_area' in filters:
+            queryset = queryset.filter(area__lte=filters['max_area'])
+
+        key, _ = self.sort_key()
+        if key == 'price_per_sqft':
+            queryset = queryset.filter(price_per_sqft__isnull=False)
+        return queryset
@@ -0,0 +1,261 @@
+"""
+Resized WebP/JPEG variants of uploaded images, for srcset.
+
+Each upload is read once and hashed. Its variants are written to
+variants/<aa>/<sha256>/<width>.<ext>, so identical uploads share files
+and a variant already on storage is never encoded again. ImageVariant
+rows map an upload's storage name to its variants, so templates can
+build srcset without touching the files.
+
+New uploads (Property.image and both UserProfile.profile_pic fields) are
+queued on commit to a per-worker daemon thread, so no request waits for
+Pillow. Listings that show an image get their variants_at set once the
+variants exist, which retires the cached card, the page and the ETag
+that still point at the original. updated_at is left alone: recording
+variants is not a listing edit, and the model refresh (see
+HousePricePrediction/refresh.py) folds in every row whose updated_at
+moves. The listing generation is bumped once per batch: when the
+worker's queue drains, or at the end of generate_image_variants, which
+backfills existing uploads across processes. Configured by
+settings.IMAGE_VARIANTS.
+"""
+import hashlib
+import io
+import logging
+import os
+import queue
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .facets import bump_generation
+from .models import ImageVariant, Property
+
+logger = logging.getLogger(__name__)
+
+# model label -> image field holding uploads that get variants
+IMAGE_FIELDS = {
+    'price_page.Property': 'image',
+    'accounts.UserProfile': 'profile_pic',
+    'HousePricePrediction.UserProfile': 'profile_pic',
+}
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def _config():
+    config = getattr(settings, 'IMAGE_VARIANTS', {})
+    return {
+        'widths': tuple(config.get('WIDTHS', (320, 640, 1280))),
+        'formats': tuple(config.get('FORMATS', ('webp', 'jpeg'))),
+        'quality': config.get('QUALITY', 80),
+        'background': config.get('BACKGROUND', True),
+    }
+
+
+def variant_name(digest, width, fmt):
+    return f"variants/{digest[:2]}/{digest}/{width}.{EXTENSIONS[fmt]}"
+
+
+def _encode(image, fmt, quality):
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        # JPEG has no alpha; flatten onto white rather than let transparency turn black
+        flat = Image.new('RGB', image.size, (255, 255, 255))
+        flat.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = flat
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=quality, optimize=fmt == 'jpeg')
+    return buffer.getvalue()
+
+
+def render_variants(source, storage=default_storage):
+    """
+    Write the variants of one upload (skipping files already on storage)
+    and return their descriptions. Touches storage only, no database, so
+    it can run in a worker process.
+    """
+    config = _config()
+    with storage.open(source, 'rb') as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    # Never upscale. The top candidate is the upload's own width, capped at the largest
+    # configured one, so a 1000px upload is not served at 640px on wide screens.
+    top = min(image.width, max(config['widths']))
+    widths = sorted({width for width in config['widths'] if width < top} | {top})
+    variants = []
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = None
+        for fmt in config['formats']:
+            name = variant_name(digest, width, fmt)
+            if not storage.exists(name):
+                if resized is None:
+                    resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                saved = storage.save(name, ContentFile(_encode(resized, fmt, config['quality'])))
+                if saved != name:
+                    # Another process wrote the same variant since exists(); its file is identical, keep that one
+                    storage.delete(saved)
+            variants.append({'digest': digest, 'format': fmt, 'width': width, 'height': height, 'name': name})
+    return variants
+
+
+def record_variants(source, variants):
+    """
+    Replace the ImageVariant rows of `source` and retire the cached cards
+    and detail pages showing the original. Returns how many listings show
+    it; the caller bumps the listing generation once for its whole batch.
+    """
+    with transaction.atomic():
+        ImageVariant.objects.filter(source=source).delete()
+        ImageVariant.objects.bulk_create(ImageVariant(source=source, **variant) for variant in variants)
+        return Property.objects.filter(image=source).update(variants_at=timezone.now())
+
+
+def has_variants(source):
+    return ImageVariant.objects.filter(source=source).exists()
+
+
+def process(source, force=False):
+    """
+    Generate and record the variants of one upload. Returns None if it
+    already had them, else how many listings show it.
+    """
+    if not force and has_variants(source):
+        return None
+    return record_variants(source, render_variants(source))
+
+
+def uploaded_sources():
+    """Storage names of every upload in IMAGE_FIELDS"""
+    sources = set()
+    for label, field in IMAGE_FIELDS.items():
+        model = apps.get_model(label)
+        sources.update(model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                       .values_list(field, flat=True).distinct())
+    return sources
+
+
+def pending_sources():
+    return uploaded_sources() - set(ImageVariant.objects.values_list('source', flat=True).distinct())
+
+
+def variants_for(sources):
+    """{source: {format: [(width, url), ...] narrowest first}} in one query"""
+    found = {}
+    sources = {source for source in sources if source}
+    if not sources:
+        return found
+    for variant in ImageVariant.objects.filter(source__in=sources).order_by('width'):
+        found.setdefault(variant.source, {}).setdefault(variant.format, []).append(
+            (variant.width, default_storage.url(variant.name))
+        )
+    return found
+
+
+class ImagePipeline:
+
+    def __init__(self, background=True):
+        self.background = background
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._listings_changed = False
+
+        self.submitted = 0
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='image-variants', daemon=True)
+            self._thread.start()
+
+    def submit(self, source):
+        """Queue an upload for variants; repeated submissions of a queued upload are ignored"""
+        if not source:
+            return
+        if not self.background:
+            self._process(source)
+            self._retire_listings()
+            return
+        with self._lock:
+            if source in self._queued:
+                return
+            self._queued.add(source)
+            self.submitted += 1
+        self._ensure_worker()
+        self._queue.put(source)
+
+    def _run(self):
+        while True:
+            source = self._queue.get()
+            with self._lock:
+                self._queued.discard(source)
+            # This thread's connection lives for the worker; drop it if the server closed it
+            close_old_connections()
+            self._process(source)
+            if self._queue.empty():
+                self._retire_listings()
+
+    def _retire_listings(self):
+        # One generation bump for everything processed since the last one
+        if self._listings_changed:
+            self._listings_changed = False
+            try:
+                bump_generation()
+            except DatabaseError as e:
+                logger.warning("Could not bump the listing generation: %s", e)
+
+    def _process(self, source):
+        try:
+            listings = process(source)
+            if listings is None:
+                self.skipped += 1
+            else:
+                self.processed += 1
+                self._listings_changed = self._listings_changed or listings > 0
+        except (OSError, UnidentifiedImageError, DatabaseError) as e:
+            self.failed += 1
+            logger.warning("Could not generate variants of %s: %s", source, e)
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'submitted': self.submitted,
+            'processed': self.processed,
+            'skipped': self.skipped,
+            'failed': self.failed,
+        }
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline():
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = ImagePipeline(background=_config()['background'])
+    return _pipeline
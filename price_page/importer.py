@@ -0,0 +1,198 @@
+"""
+Bulk import of Property listings from CSV or JSON Lines feeds.
+
+Rows are streamed from the file, validated field by field, and written
+BATCH_SIZE at a time with bulk_create/bulk_update, one transaction per
+batch. Slugs are generated from the title against an in-memory set of
+every stored slug, so no row needs its own uniqueness query. With
+upsert, a row whose slug already exists updates that listing instead.
+
+bulk_create and bulk_update send no post_save, so everything normally
+kept current by Property signals is updated per batch through
+`listings_imported`:
+- the search index
+- the dashboard counters and price rollups
+- the listing generation, a database row, so cached facets, listing
+  pages and their ETags are retired in every worker, not just this one
+
+Updated listings get a new updated_at, which is part of the key of
+their cached detail page and listing card, so those need no signal.
+
+Work that is normally scheduled a minute or two after a save (the model
+refresh and re-estimation) would never run in a short-lived import
+process. `import_finished` is sent once the whole feed is written, so
+receivers can do it there and then.
+
+price_per_sqft is set here, since it is normally set in Property.save().
+"""
+import csv
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Property
+
+# Sent inside each batch's transaction with created=[Property, ...] (pks set)
+# and updated=[(Property, {'price', 'location', 'created_at', 'slug'} as stored), ...]
+listings_imported = Signal()
+
+# Sent once after a whole import, with importer=<PropertyImporter>; receivers may return a summary dict
+import_finished = Signal()
+
+IMPORT_FIELDS = (
+    'title', 'location', 'price', 'bedrooms', 'bathrooms', 'area', 'year_built', 'parking', 'description',
+)
+REQUIRED_FIELDS = tuple(name for name in IMPORT_FIELDS if name != 'description')
+
+
+def read_rows(path, fmt=None):
+    """Yield (line number, dict) from a .csv or .jsonl file without loading it whole"""
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, newline='', encoding='utf-8') as fh:
+        if fmt == 'csv':
+            # Line 1 is the header
+            for number, row in enumerate(csv.DictReader(fh), start=2):
+                yield number, row
+            return
+        for number, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, ValidationError(f"invalid JSON: {e.msg}")
+                continue
+            yield number, row if isinstance(row, dict) else ValidationError("not a JSON object")
+
+
+def clean_row(row):
+    """Validated field values of one feed row, or ValidationError"""
+    if isinstance(row, ValidationError):
+        raise row
+    values, errors = {}, []
+    for name in IMPORT_FIELDS + ('slug',):
+        raw = row.get(name)
+        if isinstance(raw, str):
+            raw = raw.strip()
+        if raw in (None, ''):
+            if name in REQUIRED_FIELDS:
+                errors.append(f"{name}: required")
+            continue
+        field = Property._meta.get_field(name)
+        try:
+            values[name] = field.clean(raw, None)
+        except ValidationError as e:
+            errors.append(f"{name}: {' '.join(e.messages)}")
+    if errors:
+        raise ValidationError('; '.join(errors))
+    return values
+
+
+class SlugAllocator:
+    """Unique slugs from titles against every slug already taken, without a query per row"""
+
+    def __init__(self, taken, max_length=None):
+        self.taken = set(taken)
+        self.max_length = max_length or Property._meta.get_field('slug').max_length
+        self._next_suffix = {}
+
+    def allocate(self, title):
+        base = slugify(title)[:self.max_length].strip('-') or 'property'
+        if base not in self.taken:
+            self.taken.add(base)
+            return base
+        suffix = self._next_suffix.get(base, 2)
+        while True:
+            tail = f"-{suffix}"
+            slug = base[:self.max_length - len(tail)].strip('-') + tail
+            suffix += 1
+            if slug not in self.taken:
+                break
+        self._next_suffix[base] = suffix
+        self.taken.add(slug)
+        return slug
+
+
+class PropertyImporter:
+
+    def __init__(self, batch_size=1000, upsert=False):
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.slugs = SlugAllocator(Property.objects.values_list('slug', flat=True).iterator(chunk_size=10000))
+
+        self.read = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []  # (line number, message)
+        self.seconds = 0.0
+
+    def run(self, rows):
+        """Import (line number, row) pairs; returns self with counts filled in"""
+        started = time.perf_counter()
+        batch = {}
+        for number, row in rows:
+            self.read += 1
+            try:
+                values = clean_row(row)
+            except ValidationError as e:
+                self.errors.append((number, ' '.join(e.messages)))
+                continue
+
+            slug = values.pop('slug', None)
+            if slug is None:
+                slug = self.slugs.allocate(values['title'])
+            elif slug in self.slugs.taken and not self.upsert:
+                self.errors.append((number, f"slug: {slug} already exists"))
+                continue
+            self.slugs.taken.add(slug)
+            # With upsert, a later row for a slug in the same batch replaces the earlier one
+            batch[slug] = values
+
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch = {}
+        if batch:
+            self.write(batch)
+        self.seconds = time.perf_counter() - started
+        return self
+
+    def write(self, batch):
+        """Create or update one batch of slug -> values in a single transaction"""
+        now = timezone.now()
+        with transaction.atomic():
+            existing = Property.objects.in_bulk(list(batch), field_name='slug') if self.upsert else {}
+            created, updated = [], []
+            for slug, values in batch.items():
+                listing = existing.get(slug)
+                if listing is None:
+                    listing = Property(slug=slug, **values)
+                    created.append(listing)
+                else:
+                    stored = {
+                        'price': listing.price, 'location': listing.location,
+                        'created_at': listing.created_at, 'slug': slug,
+                    }
+                    for name, value in values.items():
+                        setattr(listing, name, value)
+                    # bulk_update does not apply auto_now
+                    listing.updated_at = now
+                    updated.append((listing, stored))
+                listing.update_price_per_sqft()
+
+            Property.objects.bulk_create(created, batch_size=self.batch_size)
+            if created and created[0].pk is None:
+                # Backends without RETURNING (MySQL) leave pks unset
+                ids = dict(Property.objects.filter(slug__in=[p.slug for p in created]).values_list('slug', 'id'))
+                for listing in created:
+                    listing.pk = ids[listing.slug]
+            fields = sorted({name for values in batch.values() for name in values} | {'price_per_sqft', 'updated_at'})
+            Property.objects.bulk_update([listing for listing, _ in updated], fields, batch_size=self.batch_size)
+
+            listings_imported.send(sender=Property, created=created, updated=updated)
+        self.created += len(created)
+        self.updated += len(updated)
@@ -0,0 +1,56 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from PIL import UnidentifiedImageError
+
+from price_page.facets import bump_generation
+from price_page.images import pending_sources, record_variants, render_variants, uploaded_sources
+
+
+def _init_worker():
+    # Workers started by spawn/forkserver import nothing of the parent's setup
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG variants of existing Property and profile images in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=0, help="Worker processes (default: all cores)")
+        parser.add_argument('--force', action='store_true', help="Regenerate uploads that already have variants")
+
+    def handle(self, *args, **options):
+        sources = sorted(uploaded_sources() if options['force'] else pending_sources())
+        if not sources:
+            self.stdout.write("Every uploaded image already has its variants")
+            return
+
+        jobs = options['jobs'] or os.cpu_count() or 1
+        started = time.perf_counter()
+        done = failed = files = listings = 0
+        # Workers decode, resize and write files; rows are recorded here on one connection
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+            futures = {pool.submit(render_variants, source): source for source in sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    variants = future.result()
+                except (OSError, UnidentifiedImageError) as e:
+                    failed += 1
+                    self.stderr.write(f"Skipped {source}: {e}")
+                    continue
+                listings += record_variants(source, variants)
+                done += 1
+                files += len(variants)
+        if listings:
+            bump_generation()  # once for the whole backfill
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {files} variants of {done} images in {elapsed:.1f}s "
+            f"({done / max(elapsed, 1e-9):,.1f} images/s, {jobs} workers)"
+            + (f"; {failed} could not be read" if failed else "")
+        ))
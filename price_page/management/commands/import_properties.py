@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from price_page.importer import PropertyImporter, import_finished, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import Property listings from a CSV or JSON Lines feed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Feed file; .jsonl/.ndjson is read as JSON Lines, anything else as CSV")
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help="Override the format guessed from the name")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per bulk write and transaction")
+        parser.add_argument('--upsert', action='store_true', help="Update listings whose slug already exists")
+        parser.add_argument('--show-errors', type=int, default=20, help="Rejected rows to print (all are counted)")
+        parser.add_argument(
+            '--no-refresh', action='store_true',
+            help="Skip the model refresh and re-estimation that normally follow an import",
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        try:
+            importer = PropertyImporter(batch_size=options['batch_size'], upsert=options['upsert'])
+            importer.run(read_rows(options['path'], options['format']))
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}")
+
+        for number, message in importer.errors[:options['show_errors']]:
+            self.stderr.write(f"line {number}: {message}")
+        if len(importer.errors) > options['show_errors']:
+            self.stderr.write(f"... and {len(importer.errors) - options['show_errors']} more rejected rows")
+
+        rate = importer.read / max(importer.seconds, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {importer.read} rows in {importer.seconds:.1f}s ({rate:,.0f} rows/s): "
+            f"{importer.created} created, {importer.updated} updated, {len(importer.errors)} rejected"
+        ))
+
+        if options['no_refresh'] or not (importer.created or importer.updated):
+            return
+        for _, summary in import_finished.send(sender=PropertyImporter, importer=importer):
+            for name, value in (summary or {}).items():
+                self.stdout.write(f"{name}: {value}")
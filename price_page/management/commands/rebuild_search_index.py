@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from price_page.search import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the listing search index from every Property (saves keep it current afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        indexed = rebuild(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} listings in {elapsed:.1f}s ({indexed / max(elapsed, 1e-9):,.0f} listings/s)"
+        ))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:26
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+
+def backfill_price_per_sqft(apps, schema_editor):
+    Property = apps.get_model('price_page', 'Property')
+    Property.objects.filter(area__gt=0).update(price_per_sqft=Cast(F('price'), FloatField()) / F('area'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('price_page', '0003_property_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='price_per_sqft',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_price_per_sqft, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price', 'id'], name='property_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price_per_sqft', 'id'], name='property_ppsf_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['area', 'id'], name='property_area_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['location', 'price'], name='property_location_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['bedrooms', 'bathrooms', 'price'], name='property_beds_baths_price_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('price_page', '0006_image_variant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='estimate_inputs',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='estimated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='estimated_price',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='model_version',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+    ]
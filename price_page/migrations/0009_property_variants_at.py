@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('price_page', '0008_listing_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='variants_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
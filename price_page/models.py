@@ -6,10 +6,107 @@ class Property(models.Model):
     price = models.IntegerField()
     bedrooms = models.IntegerField()
     bathrooms = models.IntegerField()
-    area = models.IntegerField()  # sq.ft
+    area = models.IntegerField(help_text='Area in sq.ft')
     year_built = models.IntegerField()
-    parking = models.CharField(max_length=50)
-    slug = models.SlugField(unique=True)
+    parking = models.CharField(max_length=50, help_text="E.g., '2 cars'")
+    slug = models.SlugField(unique=True, blank=True)
+    description = models.TextField(blank=True, null=True)
+    image = models.ImageField(upload_to='properties/', blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized price / area so listings can filter and sort on it with an index
+    price_per_sqft = models.FloatField(null=True, blank=True, editable=False)
+    # The active price model's estimate, written in bulk by HousePricePrediction/estimates.py
+    estimated_price = models.FloatField(null=True, blank=True, editable=False)
+    model_version = models.CharField(max_length=20, blank=True, editable=False)
+    estimate_inputs = models.CharField(max_length=16, blank=True, editable=False)  # hash of the scored features
+    estimated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # When resized variants of the image were last recorded (images.py); not a listing edit
+    variants_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Moments after which a rendered card or detail page of the listing is out of date
+    RENDER_STAMPS = ('updated_at', 'estimated_at', 'variants_at')
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Property'
+        verbose_name_plural = 'Properties'
+        indexes = [
+            # Keyset pagination of the listing (see pagination.py)
+            models.Index(fields=['created_at', 'id'], name='property_created_id_idx'),
+            # Listing sorts, each with id as the keyset tie-breaker
+            models.Index(fields=['price', 'id'], name='property_price_id_idx'),
+            models.Index(fields=['price_per_sqft', 'id'], name='property_ppsf_id_idx'),
+            models.Index(fields=['area', 'id'], name='property_area_id_idx'),
+            # Common filter combinations narrowed further by a price range
+            models.Index(fields=['location', 'price'], name='property_location_price_idx'),
+            models.Index(fields=['bedrooms', 'bathrooms', 'price'], name='property_beds_baths_price_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def update_price_per_sqft(self):
+        """Set the denormalized price_per_sqft; bulk writes must call this themselves"""
+        self.price_per_sqft = self.price / self.area if self.area else None
+
+    def save(self, *args, **kwargs):
+        self.update_price_per_sqft()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ({'price', 'area'} & set(update_fields)):
+            kwargs['update_fields'] = set(update_fields) | {'price_per_sqft'}
+        super().save(*args, **kwargs)
+
+
+class ListingGeneration(models.Model):
+    """Single row counting Property changes; listing cache keys and validators include it (see facets.py)"""
+    value = models.PositiveBigIntegerField(default=1)
+    changed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Listing generation {self.value}"
+
+
+class SearchTerm(models.Model):
+    """One posting of the listing search index: how strongly `term` describes a Property (see search.py)"""
+    term = models.CharField(max_length=64)
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='+')
+    weight = models.FloatField()
+
+    class Meta:
+        unique_together = ('property', 'term')
+        indexes = [
+            # Highest-weight postings of a term first, so a query reads a bounded prefix
+            models.Index(fields=['term', '-weight'], name='searchterm_term_weight_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.property_id} ({self.weight:.2f})"
+
+
+class SearchVocabulary(models.Model):
+    """Every indexed term with the number of listings containing it, for idf and autocomplete"""
+    term = models.CharField(max_length=64, unique=True)
+    doc_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'Search vocabulary'
+
+    def __str__(self):
+        return f"{self.term} ({self.doc_count})"
+
+
+class ImageVariant(models.Model):
+    """A resized copy of an uploaded image, stored under the hash of the original's bytes (see images.py)"""
+    source = models.CharField(max_length=255)  # storage name of the original upload
+    digest = models.CharField(max_length=64)
+    format = models.CharField(max_length=8)  # 'webp' or 'jpeg'
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    name = models.CharField(max_length=255)  # storage name of the variant file
+
+    class Meta:
+        unique_together = ('source', 'format', 'width')
+
+    def __str__(self):
+        return f"{self.source} {self.width}w {self.format}"
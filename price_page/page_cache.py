@@ -0,0 +1,94 @@
+"""
+Rendered-page caching for the listing and property detail pages.
+
+The page content (everything inside base.html's content block) is
+rendered once and kept in the cache. The shell is rendered per request,
+because it carries the per-user CSRF token.
+
+Nothing is ever deleted. Entries are keyed by values read from the
+database, so a change made by any worker or command changes the key the
+next request looks up in every worker. That holds even with a per-worker
+cache backend, where each worker keeps its own copy of the entries.
+
+- Listing entries are keyed by the listing generation (facets.py) plus
+  the query string (cursor, filters, search). Every page shows facet
+  counts and a total over all listings, so any Property change affects
+  every listing page. A generation bump retires them all at once.
+- Detail entries are keyed by slug and the listing's last modification
+  (Property.RENDER_STAMPS, already read for the conditional GET). A
+  renamed or deleted listing simply stops matching. The similar-homes
+  section depends on other listings, so it may be up to
+  PROPERTY_PAGE_CACHE_TTL seconds stale.
+- Each listing card is also a template fragment keyed by the Property's
+  id and render stamps. After a generation bump, a
+  re-rendered page reuses the cards that did not change.
+
+Hit and miss counts per page kind are kept per worker. They are shown
+by the cache status endpoint and in an X-Page-Cache response header.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from .facets import generation
+
+
+class PageCacheStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def record(self, kind, hit):
+        with self._lock:
+            hits, misses = self.counts.get(kind, (0, 0))
+            self.counts[kind] = (hits + hit, misses + (not hit))
+
+    def stats(self):
+        report = {}
+        for kind, (hits, misses) in sorted(self.counts.items()):
+            lookups = hits + misses
+            report[kind] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            }
+        return report
+
+
+page_stats = PageCacheStats()
+
+
+def _ttl():
+    return getattr(settings, 'PROPERTY_PAGE_CACHE_TTL', 300)
+
+
+def listing_key(params, current=None):
+    """Key of the listing page for `params` at generation `current` (default: read it now)"""
+    query = sorted((key, tuple(values)) for key, values in params.lists())
+    digest = hashlib.md5(repr(query).encode()).hexdigest()
+    return f"price_page:listing:{generation() if current is None else current}:{digest}"
+
+
+def detail_key(slug, modified):
+    stamp = modified.isoformat() if modified else ''
+    return f"price_page:detail:{slug}:{stamp}"
+
+
+def get_or_render(kind, key, render):
+    """
+    Return (entry, hit). `render()` builds the entry on a miss: a dict
+    whose 'content' is the rendered HTML, plus any fields the view needs
+    to build the response without the database.
+    """
+    entry = cache.get(key)
+    hit = entry is not None
+    page_stats.record(kind, hit)
+    if not hit:
+        entry = render()
+        cache.set(key, entry, _ttl())
+    entry = dict(entry, content=mark_safe(entry['content']))
+    return entry, hit
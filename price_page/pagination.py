@@ -0,0 +1,151 @@
+"""
+Keyset (cursor) pagination for the property listing.
+
+Pages are read with WHERE (key, id) < (last row seen) ORDER BY key DESC,
+id DESC LIMIT n+1 against a (key, id) index, so page 500 costs the same
+as page 1 and no COUNT(*) is needed. The key is created_at by default
+or any other sortable column (price, price_per_sqft, ...), ascending or
+descending. Cursor tokens are URL-safe base64 of the boundary row's key,
+prefixed with the direction: 'n' reads the page after it, 'p' the page
+before it. A bare 'p' token means the last page.
+"""
+import base64
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+
+
+def encode_cursor(direction, key=None):
+    if key is None:
+        return direction
+    payload = json.dumps(key, separators=(',', ':'), default=lambda value: value.isoformat())
+    return direction + base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, [key value, id] or None); raises ValueError for a malformed token"""
+    if not token or token[0] not in 'np':
+        raise ValueError("Unknown cursor")
+    direction, payload = token[0], token[1:]
+    if not payload:
+        return direction, None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except ValueError as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(key, list) or len(key) != 2:
+        raise ValueError("Malformed cursor")
+    return direction, key
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, has_next, has_previous, key_field):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.key_field = key_field
+
+    def _key(self, row):
+        return [getattr(row, self.key_field), row.pk]
+
+    @property
+    def next_cursor(self):
+        return encode_cursor('n', self._key(self.object_list[-1])) if self.has_next else None
+
+    @property
+    def previous_cursor(self):
+        return encode_cursor('p', self._key(self.object_list[0])) if self.has_previous else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Pages of a queryset ordered by (key, id), newest created_at first by default.
+
+    The tuple comparison is written as key <= x AND (key < x OR id < y) so
+    the leading range condition can seek in the index. The key column
+    must not be NULL.
+    """
+
+    def __init__(self, queryset, per_page, key='created_at', descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.key = key
+        self.descending = descending
+
+    def _after(self, rows, key, descending):
+        value, pk = key
+        strict, inclusive, id_op = ('lt', 'lte', 'id__lt') if descending else ('gt', 'gte', 'id__gt')
+        return rows.filter(
+            Q(**{f"{self.key}__{strict}": value}) | Q(**{id_op: pk}),
+            **{f"{self.key}__{inclusive}": value},
+        )
+
+    def _ordered(self, descending):
+        sign = '-' if descending else ''
+        return self.queryset.order_by(f"{sign}{self.key}", f"{sign}id")
+
+    def _parse(self, token):
+        if not token:
+            return 'n', None
+        direction, key = decode_cursor(token)
+        if key is not None:
+            field = self.queryset.model._meta.get_field(self.key)
+            try:
+                key = [field.to_python(key[0]), int(key[1])]
+            except (TypeError, ValueError, ValidationError) as e:
+                raise ValueError("Malformed cursor") from e
+        return direction, key
+
+    def get_page(self, token):
+        try:
+            direction, key = self._parse(token)
+        except ValueError:
+            direction, key = 'n', None
+
+        forward = direction == 'n'
+        descending = self.descending if forward else not self.descending
+        rows = self._ordered(descending)
+        if key is not None:
+            rows = self._after(rows, key, descending)
+        rows = list(rows[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if forward:
+            return KeysetPage(rows, more, key is not None, self.key)
+        return KeysetPage(rows[::-1], key is not None, more, self.key)
+
+
+def approximate_count(model, timeout=300):
+    """
+    Row count from the database's table statistics where it keeps them
+    (MySQL, PostgreSQL), otherwise an exact COUNT(*) cached for `timeout`.
+    """
+    table = model._meta.db_table
+    if connection.vendor in ('mysql', 'postgresql'):
+        if connection.vendor == 'mysql':
+            sql = "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+        else:
+            sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+        if row and row[0] is not None and row[0] >= 0:
+            return int(row[0])
+
+    key = f"approx_count:{table}"
+    count = cache.get(key)
+    if count is None:
+        count = model.objects.count()
+        cache.set(key, count, timeout)
+    return count
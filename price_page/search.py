@@ -0,0 +1,223 @@
+"""
+Ranked full-text search over Property title, location and description.
+
+The index is two tables kept in the database next to the listings:
+SearchTerm postings (term, property, weight) and SearchVocabulary with
+each term's document frequency. A listing's postings are rewritten on
+save and removed on delete, touching only the terms that changed, so
+the index never needs a full rebuild to stay current
+(`manage.py rebuild_search_index` builds it for existing rows).
+
+A term's weight in a listing is its field-weighted frequency passed
+through BM25 saturation. A query scores listings by the sum of
+idf(term) * weight, reading at most POSTINGS_PER_TERM of each term's
+highest-weight postings through the (term, -weight) index. Its cost is
+therefore bounded by the number of query terms, not by the number of
+listings. The last query term also matches as a prefix, which makes
+search-as-you-type and autocomplete work. `matching` selects every
+match, uncapped, as a subquery on the postings, for facets and totals.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import Property, SearchTerm, SearchVocabulary
+from .pagination import approximate_count
+
+FIELD_WEIGHTS = {'title': 3.0, 'location': 2.0, 'description': 1.0}
+K1 = 1.2
+POSTINGS_PER_TERM = 5000
+PREFIX_EXPANSIONS = 5
+MAX_TERM_LENGTH = 64
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or the this to with".split()
+)
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return [
+        token for token in _TOKEN.findall((text or '').lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def document_terms(listing):
+    """term -> weight for one listing"""
+    frequency = Counter()
+    for field, field_weight in FIELD_WEIGHTS.items():
+        for token in tokenize(getattr(listing, field)):
+            frequency[token[:MAX_TERM_LENGTH]] += field_weight
+    return {term: tf * (K1 + 1) / (tf + K1) for term, tf in frequency.items()}
+
+
+def _by_count(counts):
+    grouped = defaultdict(list)
+    for term, count in counts.items():
+        grouped[count].append(term)
+    return grouped.items()
+
+
+def _adjust_vocabulary(added, removed):
+    """`added`/`removed`: term -> number of listings that gained/lost it"""
+    if added:
+        SearchVocabulary.objects.bulk_create(
+            [SearchVocabulary(term=term) for term in added], ignore_conflicts=True,
+        )
+        for count, terms in _by_count(added):
+            SearchVocabulary.objects.filter(term__in=terms).update(doc_count=F('doc_count') + count)
+    for count, terms in _by_count(removed):
+        # Never below zero; MySQL rejects negative intermediates on unsigned columns
+        vocabulary = SearchVocabulary.objects.filter(term__in=terms)
+        vocabulary.filter(doc_count__lt=count).update(doc_count=0)
+        vocabulary.filter(doc_count__gte=count).update(doc_count=F('doc_count') - count)
+
+
+def index_listing(listing):
+    """Bring one listing's postings up to date, writing only what changed"""
+    index_listings([listing])
+
+
+def index_listings(listings, batch_size=2000):
+    """
+    Bring many listings' postings up to date with a fixed number of
+    queries (bulk imports send no post_save), writing only what changed.
+    """
+    wanted = {listing.pk: document_terms(listing) for listing in listings}
+    if not wanted:
+        return
+    with transaction.atomic():
+        stored = defaultdict(dict)
+        postings = SearchTerm.objects.filter(property_id__in=wanted).values_list('pk', 'property_id', 'term', 'weight')
+        for posting_id, property_id, term, weight in postings:
+            stored[property_id][term] = (posting_id, weight)
+
+        added, removed = Counter(), Counter()
+        created, stale, changed = [], [], []
+        for property_id, terms in wanted.items():
+            old = stored.get(property_id, {})
+            for term in terms.keys() - old.keys():
+                created.append(SearchTerm(term=term, property_id=property_id, weight=terms[term]))
+                added[term] += 1
+            for term in old.keys() - terms.keys():
+                stale.append(old[term][0])
+                removed[term] += 1
+            changed.extend(
+                SearchTerm(pk=old[term][0], weight=terms[term])
+                for term in terms.keys() & old.keys() if abs(terms[term] - old[term][1]) > 1e-9
+            )
+
+        for start in range(0, len(stale), batch_size):
+            SearchTerm.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+        SearchTerm.objects.bulk_create(created, batch_size=batch_size)
+        SearchTerm.objects.bulk_update(changed, ['weight'], batch_size=batch_size)
+        _adjust_vocabulary(added, removed)
+
+
+def unindex_listing(listing_id):
+    terms = list(SearchTerm.objects.filter(property_id=listing_id).values_list('term', flat=True))
+    SearchTerm.objects.filter(property_id=listing_id).delete()
+    _adjust_vocabulary({}, Counter(terms))
+
+
+def rebuild(batch_size=2000):
+    """Rebuild the whole index from the listings; returns the number of listings indexed"""
+    listings = Property.objects.only('id', *FIELD_WEIGHTS).order_by('pk')
+    document_frequency = Counter()
+    indexed = 0
+    with transaction.atomic():
+        SearchTerm.objects.all().delete()
+        SearchVocabulary.objects.all().delete()
+        postings = []
+        for listing in listings.iterator(chunk_size=batch_size):
+            terms = document_terms(listing)
+            document_frequency.update(terms.keys())
+            postings.extend(SearchTerm(term=term, property_id=listing.pk, weight=w) for term, w in terms.items())
+            indexed += 1
+            if len(postings) >= batch_size:
+                SearchTerm.objects.bulk_create(postings, batch_size=batch_size)
+                postings = []
+        SearchTerm.objects.bulk_create(postings, batch_size=batch_size)
+        SearchVocabulary.objects.bulk_create(
+            [SearchVocabulary(term=term, doc_count=count) for term, count in document_frequency.items()],
+            batch_size=batch_size,
+        )
+    return indexed
+
+
+def complete(prefix, limit=8):
+    """Indexed terms starting with `prefix`, most common first"""
+    tokens = tokenize(prefix)
+    if not tokens:
+        return []
+    return list(
+        SearchVocabulary.objects.filter(term__startswith=tokens[-1], doc_count__gt=0)
+        .order_by('-doc_count', 'term').values_list('term', flat=True)[:limit]
+    )
+
+
+def query_terms(query, prefix=True):
+    """One group of index terms per query word; with prefix=True the last also has its expansions"""
+    terms = tokenize(query)
+    groups = [[term] for term in dict.fromkeys(terms)]
+    if prefix and groups:
+        groups[-1] = groups[-1] + [t for t in complete(terms[-1], PREFIX_EXPANSIONS) if t != terms[-1]]
+    return groups
+
+
+def matching(query, prefix=True):
+    """
+    Filter for every listing the query matches, however many: a subquery
+    on the postings, so neither the ids nor the ranking reach Python.
+    """
+    terms = {term for group in query_terms(query, prefix) for term in group}
+    return Q(pk__in=SearchTerm.objects.filter(term__in=terms).values('property_id'))
+
+
+def search(query, limit=45, prefix=True, within=None):
+    """
+    Rank listings for a free-text query.
+
+    Returns [(property_id, score)], best first, at most `limit` of them
+    (None for every match). With prefix=True the last query term also
+    matches the most common terms it is a prefix of. `within`, a Property
+    queryset, restricts the postings read before anything is ranked, so
+    filtered-out listings never take a place in the limit.
+    """
+    groups = query_terms(query, prefix)
+    if not groups:
+        return []
+
+    vocabulary = dict(
+        SearchVocabulary.objects.filter(term__in={t for group in groups for t in group}, doc_count__gt=0)
+        .values_list('term', 'doc_count')
+    )
+    # The row count is an estimate; below a term's document count it would turn idf negative
+    total = max(approximate_count(Property), max(vocabulary.values(), default=0), 1)
+
+    scores = defaultdict(float)
+    for group in groups:
+        # A listing scores once per query word, by its best matching term
+        best = {}
+        for term in group:
+            df = vocabulary.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            postings = SearchTerm.objects.filter(term=term)
+            if within is not None:
+                postings = postings.filter(property_id__in=within.values('pk'))
+            postings = postings.order_by('-weight').values_list('property_id', 'weight')[:POSTINGS_PER_TERM]
+            for property_id, weight in postings:
+                score = idf * weight
+                if score > best.get(property_id, 0):
+                    best[property_id] = score
+        for property_id, score in best.items():
+            scores[property_id] += score
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    return ranked if limit is None else ranked[:limit]
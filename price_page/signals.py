@@ -0,0 +1,45 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import images, search
+from .facets import bump_generation
+from .importer import listings_imported
+from .models import Property
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def property_changed(sender, **kwargs):
+    """Cached facets and listing pages describe the old rows; retire them once the change is committed"""
+    transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=Property)
+def index_property(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_listing(instance)
+
+
+@receiver(listings_imported)
+def listings_imported_in_bulk(sender, created, updated, **kwargs):
+    """What the per-row receivers above do, once per imported batch"""
+    search.index_listings(created + [listing for listing, _ in updated])
+    transaction.on_commit(bump_generation)
+
+
+@receiver(pre_delete, sender=Property)
+def unindex_property(sender, instance, **kwargs):
+    # Before the cascade removes the postings, so the vocabulary counts can follow
+    search.unindex_listing(instance.pk)
+
+
+def queue_image_variants(sender, instance, raw=False, **kwargs):
+    source = getattr(instance, images.IMAGE_FIELDS[sender._meta.label]).name
+    if source and not raw:
+        transaction.on_commit(lambda: images.get_pipeline().submit(source))
+
+
+for label in images.IMAGE_FIELDS:
+    post_save.connect(queue_image_variants, sender=apps.get_model(label), dispatch_uid=f'image_variants:{label}')
@@ -0,0 +1,143 @@
+"""
+Comparable listings from a KD-tree over normalized Property features.
+
+Bedrooms, bathrooms, log(area) and log(price) are standardized so that
+each feature counts equally, and a scipy cKDTree is built over them.
+Each worker builds the tree once, on first use, and keeps it in memory.
+A top-k lookup is then a tree query plus one primary-key fetch.
+
+At most every SIMILAR_HOMES_REBUILD_INTERVAL seconds the holder checks
+the listings' latest updated_at and row count, one aggregate query, so
+changes made by any process are seen. When either moved, it rebuilds the
+tree in a background thread while the old tree keeps answering, then
+swaps the new one in with a single assignment.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+
+from .models import Property
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ('bedrooms', 'bathrooms', 'area', 'price')
+_LOG_COLUMNS = [FEATURES.index('area'), FEATURES.index('price')]
+
+
+def listing_state():
+    """(latest updated_at, row count) of the listings; changes whenever one is added, edited or removed"""
+    state = Property.objects.aggregate(changed=Max('updated_at'), count=Count('id'))
+    return state['changed'], state['count']
+
+
+def _transform(raw):
+    values = np.asarray(raw, dtype=np.float64).reshape(-1, len(FEATURES)).copy()
+    values[:, _LOG_COLUMNS] = np.log1p(np.clip(values[:, _LOG_COLUMNS], 0, None))
+    return values
+
+
+class SimilarHomesIndex:
+
+    def __init__(self, ids, raw, state=None):
+        from scipy.spatial import cKDTree
+
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.state = state
+        self.built_at = time.time()
+
+        values = _transform(raw)
+        self.mean = values.mean(axis=0) if len(values) else np.zeros(len(FEATURES))
+        scale = values.std(axis=0) if len(values) else np.ones(len(FEATURES))
+        self.scale = np.where(scale > 0, scale, 1.0)
+        self.tree = cKDTree((values - self.mean) / self.scale) if len(values) else None
+
+    @classmethod
+    def build(cls):
+        state = listing_state()
+        started = time.perf_counter()
+        rows = np.array(list(Property.objects.values_list('id', *FEATURES)), dtype=np.float64)
+        rows = rows.reshape(-1, len(FEATURES) + 1)
+        index = cls(rows[:, 0], rows[:, 1:], state)
+        logger.info("Built similar-homes index over %d listings in %.1f ms",
+                    len(index.ids), (time.perf_counter() - started) * 1000)
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, features, k=4, exclude=None):
+        """Ids of the k listings closest to `features` (FEATURES order), nearest first"""
+        if self.tree is None:
+            return []
+        point = (_transform(features)[0] - self.mean) / self.scale
+        wanted = min(k + (exclude is not None), len(self.ids))
+        _, positions = self.tree.query(point, k=wanted)
+        ids = [int(self.ids[i]) for i in np.atleast_1d(positions)]
+        return [i for i in ids if i != exclude][:k]
+
+
+class SimilarHomesHolder:
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._next_check = 0.0
+        self.build_count = 0
+
+    @property
+    def rebuild_interval(self):
+        return getattr(settings, 'SIMILAR_HOMES_REBUILD_INTERVAL', 300)
+
+    def _rebuild(self):
+        try:
+            self._index = SimilarHomesIndex.build()  # atomic swap
+            self.build_count += 1
+        except Exception:
+            logger.exception("Similar-homes index rebuild failed")
+        finally:
+            self._rebuilding = False
+            connection.close()  # this thread's connection
+
+    def get(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = SimilarHomesIndex.build()
+                    self.build_count += 1
+                    self._next_check = time.monotonic() + self.rebuild_interval
+                return self._index
+
+        now = time.monotonic()
+        if now >= self._next_check and not self._rebuilding:
+            with self._lock:
+                if now >= self._next_check and not self._rebuilding:
+                    self._next_check = now + self.rebuild_interval
+                    if listing_state() != index.state:
+                        self._rebuilding = True
+                        self._start_rebuild()
+        return index
+
+    def _start_rebuild(self):
+        threading.Thread(target=self._rebuild, name='similar-homes', daemon=True).start()
+
+
+holder = SimilarHomesHolder()
+
+
+def similar_homes(features, k=None, exclude=None):
+    """The k listings most like `features` (bedrooms, bathrooms, area, price), as Property objects"""
+    k = k or getattr(settings, 'SIMILAR_HOMES_COUNT', 4)
+    ids = holder.get().nearest(features, k, exclude)
+    found = Property.objects.in_bulk(ids)
+    return [found[i] for i in ids if i in found]
+
+
+def similar_to(listing, k=None):
+    return similar_homes([getattr(listing, name) for name in FEATURES], k, exclude=listing.pk)
@@ -0,0 +1,37 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from ..images import variants_for
+
+register = template.Library()
+
+
+def _srcset(candidates):
+    return ', '.join(f"{url} {width}w" for width, url in candidates)
+
+
+@register.simple_tag(takes_context=True)
+def responsive_image(context, image, sizes='100vw', **attrs):
+    """
+    <picture> with WebP and JPEG srcsets for an uploaded image, or a plain
+    <img> of the original while its variants are still being generated.
+
+    Views rendering many images pass `image_variants` (images.variants_for)
+    in the context so the lookup is one query per page, not per image.
+    """
+    if not image:
+        return ''
+    known = context.get('image_variants')
+    variants = (known if known is not None else variants_for([image.name])).get(image.name)
+    if not variants:
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+
+    fallback = variants.get('jpeg') or next(iter(variants.values()))
+    webp = ''
+    if 'webp' in variants and fallback is not variants['webp']:
+        webp = format_html('<source type="image/webp" srcset="{}" sizes="{}">', _srcset(variants['webp']), sizes)
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        webp, fallback[0][1], _srcset(fallback), sizes, flatatt(attrs),
+    )
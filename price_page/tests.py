@@ -1,3 +1,519 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+import numpy as np
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from HousePricePrediction import registry
+from HousePricePrediction.training import train_model
+from dashboard import rollups, stats
+from dashboard.models import PriceRollup
+
+from . import images, page_cache, search
+from .facets import facet_counts, generation
+from .forms import PropertyFilterForm
+from .models import ImageVariant, ListingGeneration, Property, SearchTerm, SearchVocabulary
+from .pagination import KeysetPaginator
+from .similar import FEATURES, SimilarHomesHolder, SimilarHomesIndex, _transform
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(23):
+            house = Property.objects.create(
+                title=f"House {i}", location="Lahore", price=3000000 + i, bedrooms=3, bathrooms=2,
+                area=5000, year_built=2000, parking='1 car', slug=f"house-{i}",
+            )
+            # Groups of three share a timestamp so ties are broken by id
+            Property.objects.filter(pk=house.pk).update(created_at=now - timedelta(minutes=i // 3))
+        cls.expected = list(Property.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def test_forward_and_back_cover_every_row_once(self):
+        paginator = KeysetPaginator(Property.objects.all(), 5)
+        pages, token = [], None
+        while True:
+            page = paginator.get_page(token)
+            pages.append([house.pk for house in page])
+            if not page.has_next:
+                break
+            token = page.next_cursor
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual([len(p) for p in pages], [5, 5, 5, 5, 3])
+
+        back = paginator.get_page(page.previous_cursor)
+        self.assertEqual([house.pk for house in back], pages[-2])
+        self.assertTrue(back.has_next)
+
+        last = paginator.get_page('p')
+        self.assertEqual([house.pk for house in last], self.expected[-5:])
+        self.assertFalse(last.has_next)
+
+    def test_deep_page_is_one_query_and_bad_cursor_is_first_page(self):
+        paginator = KeysetPaginator(Property.objects.all(), 5)
+        token = paginator.get_page(None).next_cursor
+        with self.assertNumQueries(1):
+            list(paginator.get_page(token))
+        self.assertEqual([house.pk for house in paginator.get_page('n!!bad')], self.expected[:5])
+
+
+class ListingFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(30):
+            Property.objects.create(
+                title=f"House {i}", location=['Lahore', 'Karachi', 'Islamabad'][i % 3],
+                price=2000000 + (i * 7919) % 30 * 250000, bedrooms=1 + i % 5, bathrooms=1 + i % 3,
+                area=2000 + (i * 31) % 17 * 300, year_built=2000, parking='1 car', slug=f"house-{i}",
+            )
+
+    def walk(self, params):
+        form = PropertyFilterForm(params)
+        key, descending = form.sort_key()
+        paginator = KeysetPaginator(form.filter_queryset(Property.objects.all()), 4, key=key, descending=descending)
+        seen, token = [], None
+        while True:
+            page = paginator.get_page(token)
+            seen.extend(house.pk for house in page)
+            if not page.has_next:
+                return seen
+            token = page.next_cursor
+
+    def test_filtered_sorted_pages_match_a_direct_query(self):
+        params = {'location': 'Lahore', 'min_price': '3000000', 'bedrooms': ['2', '4+'], 'sort': 'price_per_sqft_desc'}
+        expected = list(
+            Property.objects.filter(location='Lahore', price__gte=3000000, bedrooms__in=[2, 4, 5])
+            .order_by('-price_per_sqft', '-id').values_list('pk', flat=True)
+        )
+        self.assertTrue(expected)
+        self.assertEqual(self.walk(params), expected)
+
+    def test_price_per_sqft_is_kept_in_sync(self):
+        house = Property.objects.get(slug='house-0')
+        house.price, house.area = 3000000, 1500
+        house.save(update_fields=['price', 'area'])
+        house.refresh_from_db()
+        self.assertEqual(house.price_per_sqft, 2000)
+
+    def test_facets_are_invalidated_when_a_listing_changes(self):
+        form = PropertyFilterForm({'location': 'Karachi'})
+        listings = form.filter_queryset(Property.objects.all())
+        self.assertEqual(facet_counts(listings, form.filters())['total'], 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Property.objects.filter(location='Karachi').first().delete()
+        self.assertEqual(facet_counts(listings, form.filters())['total'], 9)
+
+    def test_a_bump_from_another_process_retires_this_workers_facets(self):
+        form = PropertyFilterForm({'location': 'Lahore'})
+        listings = form.filter_queryset(Property.objects.all())
+        self.assertEqual(facet_counts(listings, form.filters())['total'], 10)
+
+        # Another worker deletes a listing: its bump reaches this process only through the database
+        Property.objects.filter(pk=Property.objects.filter(location='Lahore').first().pk).delete()
+        ListingGeneration.objects.filter(pk=1).update(value=F('value') + 1)
+        self.assertEqual(facet_counts(listings, form.filters())['total'], 9)
+
+
+class PageCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            Property.objects.create(
+                title=f"Villa {i}", location='Lahore', price=5000000 + i, bedrooms=3, bathrooms=2,
+                area=3000, year_built=2010, parking='1 car', slug=f"villa-{i}",
+            )
+
+    def setUp(self):
+        cache.clear()
+        page_cache.page_stats.counts.clear()
+
+    def test_pages_are_served_from_cache_until_a_listing_changes(self):
+        listing = reverse('price_page') + '?location=Lahore'
+        detail = reverse('property_detail', args=['villa-0'])
+        for url in (listing, detail):
+            self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+            self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+
+        house = Property.objects.get(slug='villa-0')
+        house.title, house.slug = "Renamed villa", 'renamed-villa'
+        with self.captureOnCommitCallbacks(execute=True):
+            house.save()
+
+        response = self.client.get(listing)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, "Renamed villa")
+        self.assertEqual(self.client.get(detail).status_code, 404)
+
+        status = self.client.get(reverse('page_cache_status')).json()
+        self.assertEqual(status['detail']['hits'], 1)
+        self.assertEqual(status['listing']['misses'], 2)
+
+    def test_a_change_from_another_process_retires_the_detail_page(self):
+        detail = reverse('property_detail', args=['villa-2'])
+        self.assertEqual(self.client.get(detail)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(detail)['X-Page-Cache'], 'HIT')
+
+        # update() sends no signal, just as a write from another worker runs none here
+        Property.objects.filter(slug='villa-2').update(
+            title="Repainted villa", updated_at=timezone.now() + timedelta(seconds=1),
+        )
+        response = self.client.get(detail)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, "Repainted villa")
+
+    def test_unchanged_pages_answer_conditional_requests_with_304(self):
+        for url in (reverse('price_page') + '?sort=price_asc', reverse('property_detail', args=['villa-1'])):
+            first = self.client.get(url)
+            self.assertTrue(first['ETag'].startswith('W/'))
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Property.objects.get(slug='villa-1').save()
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_a_bump_from_another_process_changes_the_listing_etag(self):
+        url = reverse('price_page') + '?location=Lahore'
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        # What bump_generation() does in an import command or another worker: only the row changes here
+        ListingGeneration.objects.filter(pk=1).update(value=F('value') + 1, changed_at=timezone.now())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+
+class ImageVariantTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.addCleanup(setattr, images, '_pipeline', images._pipeline)
+        images._pipeline = images.ImagePipeline(background=False)
+        cache.clear()
+
+    def upload(self, title, size=(1600, 900)):
+        buffer = io.BytesIO()
+        Image.new('RGBA', size, (200, 120, 40, 255)).save(buffer, 'PNG')
+        with self.captureOnCommitCallbacks(execute=True):
+            return Property.objects.create(
+                title=title, location='Lahore', price=4000000, bedrooms=3, bathrooms=2, area=2500,
+                year_built=2015, parking='1 car', slug=title.lower(),
+                image=SimpleUploadedFile('house.png', buffer.getvalue(), content_type='image/png'),
+            )
+
+    def test_uploads_get_shared_content_addressed_variants_and_srcset(self):
+        first, second = self.upload("Alpha"), self.upload("Beta")
+        self.assertNotEqual(first.image.name, second.image.name)
+
+        variants = {
+            source: sorted(ImageVariant.objects.filter(source=source).values_list('format', 'width', 'name'))
+            for source in (first.image.name, second.image.name)
+        }
+        self.assertEqual([(fmt, width) for fmt, width, _ in variants[first.image.name]],
+                         [('jpeg', 320), ('jpeg', 640), ('jpeg', 1280), ('webp', 320), ('webp', 640), ('webp', 1280)])
+        # Identical bytes, identical files
+        self.assertEqual(variants[first.image.name], variants[second.image.name])
+        with default_storage.open(variants[first.image.name][0][2]) as fh:
+            self.assertEqual(Image.open(fh).size, (320, 180))
+
+        response = self.client.get(reverse('price_page'))
+        self.assertContains(response, 'type="image/webp"', count=2)
+        self.assertContains(response, '1280w', count=4)
+
+    def test_the_upload_width_is_the_top_candidate_up_to_the_largest_configured(self):
+        house = self.upload("Epsilon", size=(1000, 750))
+        widths = ImageVariant.objects.filter(source=house.image.name, format='jpeg').values_list('width', flat=True)
+        self.assertEqual(sorted(widths), [320, 640, 1000])
+
+        small = self.upload("Zeta", size=(200, 100))
+        self.assertEqual(list(ImageVariant.objects.filter(source=small.image.name).values_list('width', flat=True).distinct()), [200])
+
+    def test_a_variant_written_concurrently_is_not_duplicated(self):
+        house = self.upload("Delta")
+        expected = sorted(ImageVariant.objects.filter(source=house.image.name).values_list('name', flat=True))
+
+        class RacingStorage(type(default_storage)):
+            def exists(self, name):
+                return False  # another process writes every file between exists() and save()
+
+        variants = images.render_variants(house.image.name, storage=RacingStorage())
+        self.assertEqual(sorted(variant['name'] for variant in variants), expected)
+        folder = os.path.dirname(default_storage.path(expected[0]))
+        self.assertEqual(len(os.listdir(folder)), len(expected))
+
+    def test_backfill_generates_missing_variants(self):
+        house = self.upload("Gamma")
+        ImageVariant.objects.all().delete()
+        self.assertEqual(images.pending_sources(), {house.image.name})
+
+        call_command('generate_image_variants', jobs=2, stdout=io.StringIO())
+        self.assertEqual(ImageVariant.objects.filter(source=house.image.name).count(), 6)
+        self.assertEqual(images.pending_sources(), set())
+
+    def test_variants_are_not_a_listing_edit_and_bump_once_per_batch(self):
+        houses = [self.upload(title) for title in ("Eta", "Theta", "Iota")]
+        self.assertTrue(all(Property.objects.get(pk=house.pk).variants_at for house in houses))
+        edited = {house.pk: house.updated_at for house in houses}
+        ImageVariant.objects.all().delete()
+        before = generation()
+
+        call_command('generate_image_variants', stdout=io.StringIO())
+        # The model refresh reads updated_at as its watermark; only variants_at moves
+        self.assertEqual(dict(Property.objects.values_list('pk', 'updated_at')), edited)
+        self.assertEqual(generation(), before + 1)
+
+
+class PropertyImportTests(TestCase):
+
+    def setUp(self):
+        # An empty registry: imports find no model to refresh unless a test publishes one
+        registry_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(registry_dir.cleanup)
+        self.enterContext(override_settings(MODEL_REGISTRY_DIR=registry_dir.name))
+
+    def feed(self, suffix, text):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w') as fh:
+            fh.write(text)
+        return path
+
+    def run_import(self, path, **options):
+        out, err = io.StringIO(), io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_properties', path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_and_upsert_keep_everything_signals_would(self):
+        stats.rollup()
+        Property.objects.create(
+            title="Garden House", location='Lahore', price=3000000, bedrooms=2, bathrooms=1,
+            area=1500, year_built=2001, parking='none', slug='garden-house',
+        )
+        before = generation()
+        header = "title,location,price,bedrooms,bathrooms,area,year_built,parking,description\n"
+        rows = [
+            "Garden House,Karachi,4000000,3,2,2000,2010,1 car,Shaded lawn",
+            "Garden House,Karachi,5000000,4,3,2500,2012,2 cars,",
+            "Broken,Lahore,not a price,3,2,2000,2010,1 car,",
+            "Lakeside Villa,Islamabad,9000000,5,4,4500,2020,2 cars,Lake view",
+        ]
+        out, err = self.run_import(self.feed('.csv', header + "\n".join(rows)), batch_size=2)
+
+        self.assertIn("3 created, 0 updated, 1 rejected", out)
+        self.assertIn("line 4: price:", err)
+        self.assertEqual(
+            sorted(Property.objects.values_list('slug', flat=True)),
+            ['garden-house', 'garden-house-2', 'garden-house-3', 'lakeside-villa'],
+        )
+        self.assertEqual(Property.objects.get(slug='garden-house-2').price_per_sqft, 2000)
+        self.assertEqual(search.search("lake")[0][0], Property.objects.get(slug='lakeside-villa').pk)
+        self.assertGreater(generation(), before)
+
+        upsert = [
+            {'slug': 'garden-house-2', 'title': "Garden House", 'location': 'Lahore', 'price': 6000000,
+             'bedrooms': 3, 'bathrooms': 2, 'area': 2000, 'year_built': 2010, 'parking': '1 car'},
+            {'slug': 'riverside-flat', 'title': "Riverside Flat", 'location': 'Lahore', 'price': 2000000,
+             'bedrooms': 1, 'bathrooms': 1, 'area': 800, 'year_built': 2018, 'parking': 'none'},
+        ]
+        out, _ = self.run_import(self.feed('.jsonl', "\n".join(json.dumps(row) for row in upsert)), upsert=True)
+        self.assertIn("1 created, 1 updated, 0 rejected", out)
+        updated = Property.objects.get(slug='garden-house-2')
+        self.assertEqual((updated.location, updated.price_per_sqft), ('Lahore', 3000))
+
+        stats.invalidate()
+        self.assertEqual(stats.get_stats()['total_houses'], stats.compute()['total_houses'])
+        self.assertAlmostEqual(stats.get_stats()['avg_price'], stats.compute()['price_sum'] / 5)
+        incremental = {(r.dimension, r.bucket): (r.count, r.min_price, r.max_price) for r in PriceRollup.objects.all()}
+        rollups.rebuild()
+        self.assertEqual(
+            incremental, {(r.dimension, r.bucket): (r.count, r.min_price, r.max_price) for r in PriceRollup.objects.all()},
+        )
+
+    def test_import_refreshes_the_model_and_estimates(self):
+        model, encoder, metrics, stats = train_model()
+        first = registry.publish(model, encoder, metrics, stats=stats)
+        header = "title,location,price,bedrooms,bathrooms,area,year_built,parking\n"
+        rows = [f"House {i},Lahore,{3000000 + i * 250000},{2 + i % 3},{1 + i % 2},{3000 + i * 100},2000,1 car" for i in range(6)]
+        path = self.feed('.csv', header + "\n".join(rows))
+
+        out, _ = self.run_import(path)
+        version = registry.active_version()
+        self.assertNotEqual(version, first)
+        self.assertEqual(registry.load_meta(version)['metrics']['refreshed_rows'], 6)
+        self.assertIn(f"model version: {version} (refreshed)", out)
+        self.assertIn("estimates updated: 6", out)
+        self.assertEqual(set(Property.objects.values_list('model_version', flat=True)), {version})
+
+        self.run_import(path, no_refresh=True)
+        self.assertEqual(registry.active_version(), version)
+        self.assertEqual(Property.objects.exclude(model_version=version).count(), 6)
+
+    def test_upsert_retires_cached_pages(self):
+        cache.clear()
+        Property.objects.create(
+            title="Corner House", location='Lahore', price=3000000, bedrooms=2, bathrooms=1,
+            area=1500, year_built=2001, parking='none', slug='corner-house', description="Old kitchen",
+        )
+        detail = reverse('property_detail', args=['corner-house'])
+        listing = reverse('price_page')
+        for url in (detail, listing):
+            self.client.get(url)
+            self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+
+        row = {'slug': 'corner-house', 'title': "Corner House", 'location': 'Lahore', 'price': 3500000,
+               'bedrooms': 2, 'bathrooms': 1, 'area': 1500, 'year_built': 2001, 'parking': 'none',
+               'description': "New kitchen"}
+        self.run_import(self.feed('.jsonl', json.dumps(row)), upsert=True)
+
+        for url, shown in ((detail, "New kitchen"), (listing, "3500000")):
+            response = self.client.get(url)
+            self.assertEqual(response['X-Page-Cache'], 'MISS')
+            self.assertContains(response, shown)
+
+
+class SearchIndexTests(TestCase):
+
+    def make_property(self, i, title, location, description=''):
+        return Property.objects.create(
+            title=title, location=location, description=description, price=3000000, bedrooms=3,
+            bathrooms=2, area=5000, year_built=2000, parking='1 car', slug=f"house-{i}",
+        )
+
+    def test_ranked_results_and_incremental_updates(self):
+        villa = self.make_property(1, "Luxury villa", "Lahore", "Pool and garden")
+        flat = self.make_property(2, "Small flat", "Karachi", "Near a luxury mall")
+        self.make_property(3, "Family house", "Lahore", "Garden")
+
+        ranked = [property_id for property_id, _ in search.search("luxury")]
+        self.assertEqual(ranked, [villa.pk, flat.pk])  # the title outweighs the description
+
+        flat.title = "Small flat with a pool"
+        flat.save()
+        self.assertIn(flat.pk, [property_id for property_id, _ in search.search("pool")])
+
+        villa.delete()
+        self.assertEqual([property_id for property_id, _ in search.search("luxury")], [flat.pk])
+        self.assertFalse(SearchTerm.objects.filter(property_id=villa.pk).exists())
+
+        incremental = dict(SearchVocabulary.objects.filter(doc_count__gt=0).values_list('term', 'doc_count'))
+        search.rebuild()
+        self.assertEqual(incremental, dict(SearchVocabulary.objects.values_list('term', 'doc_count')))
+
+    def test_prefix_search_and_autocomplete(self):
+        self.make_property(1, "Garden villa", "Islamabad")
+        self.make_property(2, "Corner house", "Islamabad")
+        self.make_property(3, "Village cottage", "Multan")
+
+        self.assertEqual(search.complete("isl"), ["islamabad"])
+        self.assertEqual(sorted(search.complete("vil")), ["villa", "village"])
+        self.assertEqual(len(search.search("cottage vil")), 2)
+        self.assertEqual(len(search.search("vil", prefix=False)), 0)
+
+    @override_settings(PROPERTY_SEARCH_RESULTS=2)
+    def test_filters_apply_before_the_result_limit(self):
+        # The best matches are all in Lahore; the Karachi ones rank lower but must still be found
+        for i in range(4):
+            self.make_property(i, "Luxury villa with luxury pool", "Lahore", "Luxury finishes")
+        karachi = [self.make_property(10 + i, "Villa", "Karachi", "Luxury kitchen") for i in range(3)]
+
+        response = self.client.get(reverse('price_page'), {'q': 'luxury', 'location': 'Karachi'})
+        shown = [house.pk for house in response.context['properties']]
+        self.assertEqual(len(shown), 2)
+        self.assertTrue(set(shown) <= {house.pk for house in karachi})
+        self.assertEqual(response.context['approx_total'], 3)  # every match, not just the ones shown
+        self.assertEqual(response.context['facets']['total'], 3)
+
+        response = self.client.get(reverse('price_page'), {'q': 'luxury'})
+        self.assertEqual(response.context['approx_total'], 7)
+
+    @override_settings(PROPERTY_SEARCH_RESULTS=2)
+    def test_facets_count_matches_beyond_the_postings_ranked(self):
+        self.addCleanup(setattr, search, 'POSTINGS_PER_TERM', search.POSTINGS_PER_TERM)
+        search.POSTINGS_PER_TERM = 3
+        for i in range(5):
+            self.make_property(i, "Garden villa", "Lahore")
+        self.make_property(9, "Garden flat", "Karachi")
+        self.make_property(10, "Corner house", "Lahore")
+
+        response = self.client.get(reverse('price_page'), {'q': 'garden vil'})
+        self.assertEqual(len(response.context['properties']), 2)
+        self.assertEqual(response.context['facets']['total'], 6)
+        self.assertEqual(response.context['approx_total'], 6)
+
+
+class SimilarHomesTests(TestCase):
+
+    def test_nearest_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        raw = np.column_stack([
+            rng.integers(1, 7, 500), rng.integers(1, 5, 500),
+            rng.integers(1500, 16000, 500), rng.integers(1, 150, 500) * 100000,
+        ])
+        index = SimilarHomesIndex(np.arange(500), raw)
+
+        scaled = (_transform(raw) - index.mean) / index.scale
+        for query in raw[:20]:
+            distances = np.linalg.norm(scaled - (_transform(query)[0] - index.mean) / index.scale, axis=1)
+            expected = np.argsort(distances, kind='stable')[:5]
+            np.testing.assert_allclose(
+                np.sort(distances[index.nearest(query, k=5)]), np.sort(distances[expected]),
+            )
+
+    def test_excludes_the_listing_itself(self):
+        houses = [
+            Property.objects.create(
+                title=f"House {i}", location="Lahore", price=3000000 + i * 100000, bedrooms=3, bathrooms=2,
+                area=4000 + i * 100, year_built=2000, parking='1 car', slug=f"house-{i}",
+            )
+            for i in range(6)
+        ]
+        index = SimilarHomesIndex.build()
+        target = houses[2]
+        nearest = index.nearest([getattr(target, name) for name in FEATURES], k=2, exclude=target.pk)
+        self.assertEqual(sorted(nearest), sorted([houses[1].pk, houses[3].pk]))
+
+    @override_settings(SIMILAR_HOMES_REBUILD_INTERVAL=0)
+    def test_rebuilds_after_a_change_made_by_another_process(self):
+        class Holder(SimilarHomesHolder):
+            def _start_rebuild(self):
+                self._rebuild()  # inline: a rebuild thread would not see this test's transaction
+
+        for i in range(3):
+            Property.objects.create(
+                title=f"House {i}", location="Lahore", price=3000000, bedrooms=3, bathrooms=2,
+                area=4000, year_built=2000, parking='1 car', slug=f"house-{i}",
+            )
+        holder = Holder()
+        first = holder.get()
+        self.assertIs(holder.get(), first)  # nothing changed, nothing rebuilt
+        self.assertEqual(holder.build_count, 1)
+
+        # update() and delete() send no signal to this worker; the row check still sees them
+        Property.objects.filter(slug='house-0').update(bedrooms=5, updated_at=timezone.now() + timedelta(seconds=1))
+        holder.get()
+        self.assertEqual(holder.build_count, 2)
+        Property.objects.filter(slug='house-1').delete()
+        holder.get()  # the call that notices keeps answering from the old tree
+        self.assertEqual(len(holder.get()), 2)
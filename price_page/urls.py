@@ -8,4 +8,6 @@ urlpatterns = [
     path('', price_page_view, name='price_page'),  # This will map /price-page/ to the view
     #  path('properties/', views.properties_list, name='properties_list'),
     path('property/<slug:slug>/', views.property_detail, name='property_detail'),  # ✅ This is required
+    path('search/suggest/', views.search_suggestions, name='property_search_suggestions'),
+    path('cache/status/', views.page_cache_status, name='page_cache_status'),
 ]
@@ -1,26 +1,154 @@
+import hashlib
+
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.views.decorators.http import condition
+from . import images, page_cache, search
+from .facets import facet_counts, generation_state
+from .forms import PropertyFilterForm
 from .models import Property
+from .pagination import KeysetPaginator, approximate_count
+from .similar import similar_to
 
 
-def price_page_view(request):
-    # 🔥 Retrieve data from database
-    property_list = Property.objects.all().order_by('-id')
+def listing_page(form, property_list, cursor):
+    # 🔥 Cursor pagination (9 cards per page): deep pages cost the same as the first
+    key, descending = form.sort_key()
+    paginator = KeysetPaginator(property_list, 9, key=key, descending=descending)
+    return paginator.get_page(cursor)
+
+
+def listing_context(request):
+    # 🔥 Filters and sort order from the query string
+    form = PropertyFilterForm(request.GET)
+    filters = form.filters()
+    property_list = form.filter_queryset(Property.objects.all())
 
-    # 🔥 Pagination (12 cards per page)
-    paginator = Paginator(property_list, 9)
-    page_number = request.GET.get('page')
-    properties = paginator.get_page(page_number)
+    query = form.search_query()
+    if query:
+        # 🔥 Ranked search results within the filters, best match first (no paging past the top matches)
+        shown = search.search(query, limit=getattr(settings, 'PROPERTY_SEARCH_RESULTS', 45), within=property_list)
+        property_list = property_list.filter(search.matching(query))
+        filters = {**filters, 'q': query}
+        matches = property_list.in_bulk([property_id for property_id, _ in shown])
+        properties = [matches[property_id] for property_id, _ in shown if property_id in matches]
+    else:
+        properties = listing_page(form, property_list, request.GET.get('cursor'))
 
+    # With a query, facets and the total count every match, not just the ones shown
+    facets = facet_counts(property_list, filters)
     context = {
+        'properties': properties,
+        'form': form,
+        'facets': facets,
+        'search_query': query,
+        'image_variants': images.variants_for(house.image.name for house in properties if house.image),
+        'card_cache_ttl': getattr(settings, 'PROPERTY_CARD_CACHE_TTL', 3600),
+    }
+    if filters:
+        context['approx_total'] = facets['total']
+    elif getattr(settings, 'PROPERTY_LISTING_SHOW_TOTAL', True):
+        context['approx_total'] = approximate_count(Property)
+    return context
+
+
+def _viewer(request):
+    # Pages greet the logged-in user, so a login or logout must not be answered with 304
+    return request.session.session_key or ''
+
+
+def _weak_etag(*parts):
+    return 'W/"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def listing_generation(request):
+    """The listing generation row, read once per request for the validators and the cache key"""
+    if not hasattr(request, '_listing_generation'):
+        request._listing_generation = generation_state()
+    return request._listing_generation
+
+
+def listing_etag(request):
+    # Any Property change, from any process, bumps the stored generation, so it covers
+    # facets and totals as well as the rows
+    params = sorted((key, tuple(values)) for key, values in request.GET.lists())
+    return _weak_etag(listing_generation(request)[0], params, _viewer(request))
+
+
+def listing_last_modified(request):
+    """The newest render stamp (Property.RENDER_STAMPS) among the page's rows, or the last listing change if later"""
+    form = PropertyFilterForm(request.GET)
+    changed = [listing_generation(request)[1]]
+    if not form.search_query():
+        property_list = form.filter_queryset(Property.objects.all())
+        key, _ = form.sort_key()
+        rows = property_list.only('id', *Property.RENDER_STAMPS, key)
+        page = listing_page(form, rows, request.GET.get('cursor'))
+        changed.extend(getattr(house, name) for house in page for name in Property.RENDER_STAMPS)
+    changed = [moment for moment in changed if moment is not None]
+    return max(changed) if changed else None
+
+
+def detail_last_modified(request, slug):
+    """The latest of the listing's edit, model estimate and image variants"""
+    if not hasattr(request, '_detail_last_modified'):
+        stored = Property.objects.filter(slug=slug).values_list(*Property.RENDER_STAMPS).first()
+        request._detail_last_modified = max(moment for moment in stored if moment) if stored else None
+    return request._detail_last_modified
+
+
+def detail_etag(request, slug):
+    modified = detail_last_modified(request, slug)
+    return _weak_etag(slug, modified.isoformat(), _viewer(request)) if modified else None
+
+
+@condition(etag_func=listing_etag, last_modified_func=listing_last_modified)
+def price_page_view(request):
+    # 🔥 Rendered listing content is cached per query string until any listing changes
+    entry, hit = page_cache.get_or_render(
+        'listing', page_cache.listing_key(request.GET, listing_generation(request)[0]),
+        lambda: {'content': render_to_string('price_page/listing.html', listing_context(request), request)},
+    )
+    response = render(request, 'price_page/price_page.html', {
         'page_title': 'Price Page',
-        'properties': properties
+        'listing_content': entry['content'],
+    })
+    response['X-Page-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+def search_suggestions(request):
+    """Autocomplete for the listing search box: ?q=<text typed so far>"""
+    return JsonResponse({'suggestions': search.complete(request.GET.get('q', ''))})
+
+
+def render_detail(request, slug):
+    property = get_object_or_404(Property, slug=slug)
+    return {
+        'title': property.title,
+        'content': render_to_string('price_page/detail_content.html', {
+            'property': property,
+            'similar_homes': similar_to(property),
+        }, request),
     }
-    return render(request, 'price_page/price_page.html', context)
 
 
+@condition(etag_func=detail_etag, last_modified_func=detail_last_modified)
 def property_detail(request, slug):
-    property = get_object_or_404(Property, slug=slug)
-    return render(request, 'price_page/property_detail.html', {
-        'property': property
+    entry, hit = page_cache.get_or_render(
+        'detail', page_cache.detail_key(slug, detail_last_modified(request, slug)),
+        lambda: render_detail(request, slug),
+    )
+    response = render(request, 'price_page/property_detail.html', {
+        'page_title': entry['title'],
+        'detail_content': entry['content'],
     })
+    response['X-Page-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+def page_cache_status(request):
+    """Per-worker hit ratios of the listing and detail page caches"""
+    return JsonResponse(page_cache.page_stats.stats())